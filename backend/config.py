@@ -10,14 +10,40 @@ class Config:
     # Flask Configuration
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     UPLOAD_FOLDER = 'backend/uploads'
+    BLOB_FOLDER = 'backend/blobs'
+    MEDIA_FOLDER = 'backend/uploads/media'
+    BLOB_SWEEP_MIN_AGE = int(os.environ.get('BLOB_SWEEP_MIN_AGE', 3600))  # seconds before an unreferenced blob may be deleted
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max file size
+    MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 8 * 1024 * 1024 * 1024))  # chunked uploads, 8GB
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))  # recommended chunk size
+    UPLOAD_PARTIAL_MAX_AGE = int(os.environ.get('UPLOAD_PARTIAL_MAX_AGE', 24 * 3600))  # seconds idle before a partial upload is deleted
     ALLOWED_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'wmv', 'flv', 'webm'}
     
     # Background Processing Configuration
-    THREAD_POOL_SIZE = 4
+    THREAD_POOL_SIZE = int(os.environ.get('THREAD_POOL_SIZE', 4))
+    JOB_QUEUE_MAX_SIZE = int(os.environ.get('JOB_QUEUE_MAX_SIZE', 50))  # queued jobs beyond busy workers
+    JOB_DRAIN_TIMEOUT = int(os.environ.get('JOB_DRAIN_TIMEOUT', 30))  # seconds to finish jobs on shutdown
+    JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 60))  # orphaned jobs are recovered after this
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    REEL_CONCURRENCY_PER_TASK = int(os.environ.get('REEL_CONCURRENCY_PER_TASK', 4))  # parallel reels per job
+    REEL_CONCURRENCY_GLOBAL = int(os.environ.get('REEL_CONCURRENCY_GLOBAL', 8))  # parallel reels per process
     
     # Storage Configuration
     STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND') or 'local'
+    TASK_JOURNAL_COMPACT_THRESHOLD = int(os.environ.get('TASK_JOURNAL_COMPACT_THRESHOLD', 1000))  # records
+    TASK_JOURNAL_COMPACT_INTERVAL = int(os.environ.get('TASK_JOURNAL_COMPACT_INTERVAL', 60))  # seconds
+    # Set when several worker processes (gunicorn/uwsgi) share the local task store
+    TASK_STORE_MULTIPROCESS = os.environ.get('TASK_STORE_MULTIPROCESS', 'False').lower() == 'true'
+    PROGRESS_FLUSH_INTERVAL = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', 2.0))  # seconds
+    PROGRESS_FLUSH_MAX_DIRTY = int(os.environ.get('PROGRESS_FLUSH_MAX_DIRTY', 100))  # buffered tasks
+    
+    # Outbound HTTP (shared pooled sessions per provider)
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 10))  # seconds
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 180))  # seconds, GPT-4 articles are slow
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 3))  # idempotent requests only
+    HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', 0.5))  # seconds, doubled per attempt
+    HTTP_RETRY_BACKOFF_MAX = float(os.environ.get('HTTP_RETRY_BACKOFF_MAX', 10))  # seconds
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))  # keep-alive connections per provider
     
     # API Keys
     QUICKREEL_API_KEY = os.environ.get('QUICKREEL_API_KEY') or None
@@ -25,9 +51,32 @@ class Config:
     
     # AssemblyAI for transcript generation
     ASSEMBLYAI_API_KEY = os.environ.get('ASSEMBLYAI_API_KEY') or None
+    # Public URL of /api/webhook/assemblyai; when set, polling is only a fallback
+    ASSEMBLYAI_WEBHOOK_URL = os.environ.get('ASSEMBLYAI_WEBHOOK_URL') or None
+    ASSEMBLYAI_WEBHOOK_SECRET = os.environ.get('ASSEMBLYAI_WEBHOOK_SECRET') or None
+    
+    # Transcript polling (one poller thread for every outstanding transcript)
+    TRANSCRIPT_POLL_MIN_INTERVAL = float(os.environ.get('TRANSCRIPT_POLL_MIN_INTERVAL', 3))  # seconds
+    TRANSCRIPT_POLL_MAX_INTERVAL = float(os.environ.get('TRANSCRIPT_POLL_MAX_INTERVAL', 60))  # seconds
+    TRANSCRIPT_POLL_WEBHOOK_INTERVAL = float(os.environ.get('TRANSCRIPT_POLL_WEBHOOK_INTERVAL', 300))  # seconds, with webhooks
+    TRANSCRIPT_POLL_DURATION_RATIO = float(os.environ.get('TRANSCRIPT_POLL_DURATION_RATIO', 0.15))  # first check at this fraction of the audio length
+    TRANSCRIPT_POLL_BACKOFF = float(os.environ.get('TRANSCRIPT_POLL_BACKOFF', 1.5))  # interval multiplier per check
+    TRANSCRIPT_POLL_TIMEOUT = int(os.environ.get('TRANSCRIPT_POLL_TIMEOUT', 6 * 3600))  # seconds before giving up
+    TRANSCRIPT_POLL_READ_TIMEOUT = float(os.environ.get('TRANSCRIPT_POLL_READ_TIMEOUT', 30))  # seconds per status request
+    TRANSCRIPT_COMPLETION_WORKERS = int(os.environ.get('TRANSCRIPT_COMPLETION_WORKERS', 4))  # threads storing finished transcripts
+    TRANSCRIPT_WORDS_CACHE_SIZE = int(os.environ.get('TRANSCRIPT_WORDS_CACHE_SIZE', 32))  # decoded transcripts kept for time lookups
+    
+    # Full-text search over transcripts
+    SEARCH_INDEX_PATH = os.environ.get('SEARCH_INDEX_PATH') or 'backend/search_index.db'
+    SEARCH_RESULTS_LIMIT = int(os.environ.get('SEARCH_RESULTS_LIMIT', 20))
+    SEARCH_HITS_PER_RESULT = int(os.environ.get('SEARCH_HITS_PER_RESULT', 5))
     
     # OpenAI for blog and poster generation
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY') or None
+    # Longer transcripts are summarized in chunks (map) before the article is written (reduce)
+    BLOG_SINGLE_PASS_TOKENS = int(os.environ.get('BLOG_SINGLE_PASS_TOKENS', 6000))  # estimated transcript tokens
+    BLOG_CHUNK_TOKENS = int(os.environ.get('BLOG_CHUNK_TOKENS', 3000))  # token budget per summarized chunk
+    BLOG_SUMMARY_CONCURRENCY = int(os.environ.get('BLOG_SUMMARY_CONCURRENCY', 4))  # chunk summaries requested at once
     
     # RunwayML for enhanced poster generation
     RUNWAYML_API_KEY = os.environ.get('RUNWAYML_API_KEY') or None
@@ -51,6 +100,20 @@ class Config:
     # File Processing
     MAX_VIDEO_DURATION = 7200  # 2 hours in seconds
     REEL_DURATION_OPTIONS = [15, 30, 60]  # seconds
+    # Audio-only extraction before transcription upload (falls back to the full file without ffmpeg)
+    AUDIO_EXTRACTION_ENABLED = os.environ.get('AUDIO_EXTRACTION_ENABLED', 'True').lower() == 'true'
+    FFMPEG_PATH = os.environ.get('FFMPEG_PATH') or 'ffmpeg'
+    AUDIO_EXTRACT_BITRATE = os.environ.get('AUDIO_EXTRACT_BITRATE') or '48k'  # when transcoding
+    AUDIO_EXTRACT_TIMEOUT = int(os.environ.get('AUDIO_EXTRACT_TIMEOUT', 600))  # seconds
+    # Segmented transcription: long recordings are cut at silences and the pieces transcribed in parallel
+    SEGMENTED_TRANSCRIPTION_ENABLED = os.environ.get('SEGMENTED_TRANSCRIPTION_ENABLED', 'False').lower() == 'true'
+    TRANSCRIPT_SEGMENT_MIN_DURATION = int(os.environ.get('TRANSCRIPT_SEGMENT_MIN_DURATION', 1200))  # seconds, shorter recordings go whole
+    TRANSCRIPT_SEGMENT_SECONDS = int(os.environ.get('TRANSCRIPT_SEGMENT_SECONDS', 600))  # target segment length
+    TRANSCRIPT_SEGMENT_OVERLAP = float(os.environ.get('TRANSCRIPT_SEGMENT_OVERLAP', 15))  # seconds shared by neighbouring segments
+    TRANSCRIPT_SEGMENT_SEARCH_WINDOW = float(os.environ.get('TRANSCRIPT_SEGMENT_SEARCH_WINDOW', 60))  # seconds around a cut to look for silence
+    TRANSCRIPT_SEGMENT_UPLOADS = int(os.environ.get('TRANSCRIPT_SEGMENT_UPLOADS', 4))  # concurrent segment uploads
+    SILENCE_NOISE_DB = float(os.environ.get('SILENCE_NOISE_DB', -35))  # quieter than this counts as silence
+    SILENCE_MIN_SECONDS = float(os.environ.get('SILENCE_MIN_SECONDS', 0.4))
     
     # Development Settings
     DEBUG = os.environ.get('DEBUG', 'True').lower() == 'true'
@@ -3,44 +3,248 @@ Database connection module
 Handles database initialization and connection management
 """
 import os
-from typing import Optional
+import json
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional
 from config import Config
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    status TEXT,
+    created_at TEXT,
+    file_size_mb REAL NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+# Indexed task columns recomputed from the stored record, the SQL twin of put_task
+REINDEX_TASK = """
+UPDATE tasks SET
+    status = json_extract(data, '$.status'),
+    created_at = COALESCE(NULLIF(json_extract(data, '$.upload_time'), ''), NULLIF(json_extract(data, '$.created_at'), '')),
+    file_size_mb = COALESCE(json_extract(data, '$.video_info.file_size_mb'), 0)
+WHERE id = ?
+"""
+
 class DatabaseManager:
     def __init__(self):
         self.connection = None
         self.database_url = Config.DATABASE_URL
-        
+        self.database_path = self._parse_database_url(self.database_url)
+        # One pooled connection per thread; sqlite3 connections must not cross threads
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _parse_database_url(self, database_url: Optional[str]) -> Optional[str]:
+        """
+        Resolve DATABASE_URL into a SQLite file path
+        Returns: Path to the SQLite database file, or None if the URL is not SQLite
+        """
+        if not database_url:
+            return 'smartmeeting.db'
+        if database_url.startswith('sqlite:///'):
+            return database_url[len('sqlite:///'):]
+        return None
+
     def get_connection(self):
         """
         Initialize and return database connection
         Returns: Database connection object
         """
-        if not self.connection:
-            # For now, return None as we're using file-based storage
-            # This can be extended for actual database connections later
-            self.connection = None
-        return self.connection
-    
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if not self.database_path:
+                raise ValueError(f"Unsupported DATABASE_URL (only sqlite:/// is supported): {self.database_url}")
+            directory = os.path.dirname(self.database_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.database_path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._ensure_schema(connection)
+        self.connection = connection
+        return connection
+
+    def _ensure_schema(self, connection):
+        """
+        Create tables and indexes on first use
+        """
+        with self._schema_lock:
+            if not self._schema_ready:
+                connection.executescript(SCHEMA)
+                self._schema_ready = True
+
     def close_connection(self):
         """
         Close database connection
         """
-        if self.connection:
-            # Close connection logic here
-            self.connection = None
-    
+        connection = getattr(self._local, 'connection', None)
+        if connection:
+            connection.close()
+            self._local.connection = None
+        self.connection = None
+
     def test_connection(self) -> bool:
         """
         Test database connectivity
         Returns: True if connection successful, False otherwise
         """
         try:
-            # Test connection logic here
+            self.get_connection().execute('SELECT 1').fetchone()
             return True
         except Exception as e:
             print(f"Database connection test failed: {e}")
             return False
 
+    def put_task(self, task_id: str, task_data: Dict):
+        """
+        Insert or replace a task record
+        """
+        self.get_connection().execute(
+            'INSERT OR REPLACE INTO tasks (id, status, created_at, file_size_mb, data) VALUES (?, ?, ?, ?, ?)',
+            (
+                task_id,
+                task_data.get('status'),
+                task_data.get('upload_time') or task_data.get('created_at') or None,
+                (task_data.get('video_info') or {}).get('file_size_mb', 0) or 0,
+                json.dumps(task_data)
+            )
+        )
+
+    def get_task(self, task_id: str) -> Optional[Dict]:
+        """
+        Fetch a task record
+        Returns: Task data or None if not found
+        """
+        row = self.get_connection().execute('SELECT data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def update_task_fields(self, task_id: str, fields: Dict) -> bool:
+        """
+        Merge top-level fields into a task record without reading it back
+        Returns: True if the task exists
+        """
+        if not fields:
+            return self.get_task(task_id) is not None
+
+        paths = ', '.join('?, json(?)' for _ in fields)
+        params = []
+        for key, value in fields.items():
+            params.extend([f'$."{key}"', json.dumps(value)])
+        params.append(task_id)
+
+        # Any merged field may feed an indexed column, so they are all recomputed
+        connection = self.get_connection()
+        connection.execute('SAVEPOINT update_task_fields')
+        try:
+            cursor = connection.execute(f'UPDATE tasks SET data = json_set(data, {paths}) WHERE id = ?', params)
+            updated = cursor.rowcount > 0
+            if updated:
+                connection.execute(REINDEX_TASK, (task_id,))
+            connection.execute('RELEASE update_task_fields')
+            return updated
+        except Exception:
+            connection.execute('ROLLBACK TO update_task_fields')
+            connection.execute('RELEASE update_task_fields')
+            raise
+
+    def update_task_fields_if(self, task_id: str, fields: Dict, predicate: Callable[[Dict], bool]) -> bool:
+        """
+        Merge fields into a task only if predicate(current task) holds, atomically
+        Returns: True if the task was updated
+        """
+        connection = self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            task_data = self.get_task(task_id)
+            updated = bool(task_data) and predicate(task_data)
+            if updated:
+                self.update_task_fields(task_id, fields)
+            connection.execute('COMMIT')
+            return updated
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def delete_task(self, task_id: str):
+        """
+        Delete a task record
+        """
+        self.get_connection().execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+
+    def get_all_tasks(self) -> List[Dict]:
+        """
+        Fetch all task records ordered by creation time
+        """
+        rows = self.get_connection().execute('SELECT data FROM tasks ORDER BY created_at').fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def get_tasks_created_before(self, cutoff_iso: str) -> Dict[str, Dict]:
+        """
+        Fetch tasks created before the given ISO timestamp using the created_at index
+        """
+        # Kept index-friendly: COALESCE around created_at would force a full scan
+        rows = self.get_connection().execute(
+            'SELECT id, data FROM tasks WHERE created_at < ? OR created_at IS NULL',
+            (cutoff_iso,)
+        ).fetchall()
+        return {row['id']: json.loads(row['data']) for row in rows}
+
+    def get_task_stats(self) -> Dict:
+        """
+        Aggregate task counts and total size per status
+        """
+        rows = self.get_connection().execute(
+            'SELECT status, COUNT(*) AS count, SUM(file_size_mb) AS size_mb FROM tasks GROUP BY status'
+        ).fetchall()
+
+        status_counts = {}
+        total_files = 0
+        total_size_mb = 0
+        for row in rows:
+            status_counts[row['status'] or 'unknown'] = row['count']
+            total_files += row['count']
+            total_size_mb += row['size_mb'] or 0
+
+        return {
+            'total_files': total_files,
+            'total_size_mb': round(total_size_mb, 2),
+            'status_counts': status_counts
+        }
+
+    def put_file(self, file_id: str, file_data: Dict):
+        """
+        Insert or replace a file metadata record
+        """
+        self.get_connection().execute(
+            'INSERT OR REPLACE INTO files (id, data) VALUES (?, ?)',
+            (file_id, json.dumps(file_data))
+        )
+
+    def get_file(self, file_id: str) -> Optional[Dict]:
+        """
+        Fetch a file metadata record
+        """
+        row = self.get_connection().execute('SELECT data FROM files WHERE id = ?', (file_id,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def get_all_files(self) -> List[Dict]:
+        """
+        Fetch all file metadata records
+        """
+        rows = self.get_connection().execute('SELECT data FROM files').fetchall()
+        return [json.loads(row['data']) for row in rows]
+
 # Global database manager instance
-db_manager = DatabaseManager() 
\ No newline at end of file
+db_manager = DatabaseManager()
@@ -3,8 +3,8 @@ Main Flask application
 Handles all API route definitions with clean RESTful approach
 """
 import os
+import hmac
 import uuid
-import threading
 from datetime import datetime
 from pathlib import Path
 from flask import Flask, request, jsonify, render_template, send_from_directory
@@ -12,12 +12,17 @@ from werkzeug.utils import secure_filename
 
 # Import configuration and utilities
 from config import Config
-from utils.file_manager import FileManager
+from utils.file_manager import file_manager
 from utils.video_processor import VideoProcessor
-from utils.transcript_service import TranscriptService
+from utils.transcript_service import TranscriptService, TRANSCRIPT_ACTIVE_STATES
 from utils.poster_service import PosterService
 from utils.blog_service import BlogService
 from utils.reel_service import ReelService
+from utils.job_executor import job_executor, job_key, ACTIVE_JOB_STATES, PRIORITY_HIGH, PRIORITY_NORMAL
+from utils.upload_manager import upload_manager
+from utils.media_store import media_store
+from utils.transcript_poller import transcript_poller
+from utils.search_index import search_index
 
 # Initialize Flask app
 app = Flask(__name__, 
@@ -25,14 +30,25 @@ app = Flask(__name__,
            static_folder='../frontend/static')
 app.config.from_object(Config)
 
-# Initialize services
-file_manager = FileManager()
+# Initialize services (file_manager is the shared process-wide task store)
 video_processor = VideoProcessor()
 transcript_service = TranscriptService()
 poster_service = PosterService()
 blog_service = BlogService()
 reel_service = ReelService()
 
+# Durable background jobs, recovered after a crash or restart
+job_executor.register(
+    'generate_reels',
+    video_processor.process_video_thread,
+    on_give_up=lambda file_id, error: file_manager.update_task_status(file_id, 'failed', 0, f"Error: {error}")
+)
+job_executor.register('generate_transcript', transcript_service.run_transcript_job,
+                      on_give_up=transcript_service.mark_failed)
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    # Skip the debug reloader's parent process; only the process serving requests recovers jobs
+    job_executor.recover_jobs()
+
 # Ensure upload directory exists
 UPLOAD_FOLDER = Path(Config.UPLOAD_FOLDER)
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
@@ -62,34 +78,168 @@ def upload_video():
         if not file_manager.allowed_file(file.filename):
             return jsonify({'success': False, 'message': 'Invalid file type'}), 400
         
-        # Generate unique file ID and save file
+        # Generate unique file ID and stream the file into content-addressed storage
         file_id = str(uuid.uuid4())
         filename = secure_filename(file.filename)
-        file_path = UPLOAD_FOLDER / f"{file_id}_{filename}"
-        file.save(file_path)
+        stored = media_store.put_stream(file.stream, os.path.splitext(filename)[1])
+        
+        result = create_upload_task(file_id, filename, stored['file_path'], stored['content_hash'], stored['existed'])
+        if not result['success']:
+            return jsonify({'success': False, 'message': result['error']}), 400
+        
+        return jsonify({
+            'success': True,
+            'file_id': file_id,
+            'deduplicated': stored['existed'],
+            'message': 'Video uploaded successfully'
+        })
+        
+    except Exception as e:
+        app.logger.error(f"Upload error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Upload failed: {str(e)}'}), 500
+
+def create_upload_task(file_id, filename, file_path, content_hash, existed):
+    """
+    Create the task entry for a finished upload and link it to its content
+    Input: file_id, stored filename, media path, sha256 of the content and whether
+           the content was already stored before this upload
+    Output: Dict with success and task data, or error if the video is too long
+    """
+    try:
+        content = file_manager.get_content_data(content_hash)
+        cached = bool(content and content.get('media_path') == file_path and content.get('video_info'))
+        video_info = content['video_info'] if cached else file_manager.get_video_info(file_path)
+        
+        # Rejected videos are never recorded in the content index
+        duration_ms = video_info.get('duration_ms')
+        if duration_ms and duration_ms > Config.MAX_VIDEO_DURATION * 1000:
+            if not existed and os.path.exists(file_path):
+                os.remove(file_path)
+            return {
+                'success': False,
+                'error': f"Video is {duration_ms // 1000}s long, the limit is {Config.MAX_VIDEO_DURATION}s"
+            }
+        
+        if not cached:
+            file_manager.update_content_data(content_hash, {'media_path': file_path, 'video_info': video_info})
         
-        # Get video info and create task entry
-        video_info = file_manager.get_video_info(str(file_path))
         task_data = {
             'filename': filename,
-            'file_path': str(file_path),
+            'file_path': file_path,
+            'content_hash': content_hash,
             'status': 'uploaded',
             'created_at': datetime.now().isoformat(),
             'video_info': video_info,
             'reels': []
         }
-        
         file_manager.save_task_data(file_id, task_data)
+        return {'success': True, 'task': task_data}
+    finally:
+        # The saved task (or the deleted file) now decides whether cleanup may remove the media
+        media_store.release(file_path)
+
+@app.route('/api/upload/init', methods=['POST'])
+def init_chunked_upload():
+    """
+    Start a resumable chunked upload
+    Input: JSON with filename and optional size (bytes)
+    Output: JSON with upload_id, offset and recommended chunk_size
+    """
+    try:
+        data = request.get_json() or {}
+        filename = data.get('filename', '')
+        size = data.get('size')
+        
+        if not filename:
+            return jsonify({'success': False, 'message': 'Filename required'}), 400
+        
+        if not file_manager.allowed_file(filename):
+            return jsonify({'success': False, 'message': 'Invalid file type'}), 400
+        
+        if size is not None and (not isinstance(size, int) or size < 0 or size > Config.MAX_UPLOAD_SIZE):
+            return jsonify({'success': False, 'message': 'Invalid file size'}), 400
+        
+        return jsonify(upload_manager.init_upload(filename, size))
+        
+    except Exception as e:
+        app.logger.error(f"Upload init error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Upload init failed: {str(e)}'}), 500
+
+@app.route('/api/upload/<upload_id>', methods=['GET'])
+def chunked_upload_status(upload_id):
+    """
+    Get the acknowledged offset of a chunked upload, to resume after a dropped connection
+    Input: upload_id in URL path
+    Output: JSON with offset and declared size
+    """
+    upload = upload_manager.get_upload(upload_id)
+    if not upload:
+        return jsonify({'success': False, 'message': 'Upload not found'}), 404
+    
+    return jsonify({
+        'success': True,
+        'upload_id': upload_id,
+        'offset': upload['offset'],
+        'size': upload.get('total_size')
+    })
+
+@app.route('/api/upload/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    """
+    Append a chunk to a chunked upload
+    Input: Raw bytes in the body, offset query parameter (must equal the acknowledged offset)
+    Output: JSON with the new acknowledged offset (409 with the expected offset on mismatch)
+    """
+    try:
+        offset = request.args.get('offset', type=int)
+        if offset is None:
+            return jsonify({'success': False, 'message': 'Offset required'}), 400
+        
+        result = upload_manager.write_chunk(upload_id, offset, request.stream)
+        if result.get('not_found'):
+            return jsonify({'success': False, 'message': 'Upload not found'}), 404
+        if not result.get('success'):
+            return jsonify({'success': False, 'message': result.get('error'), 'offset': result.get('offset')}), 409
+        
+        return jsonify({'success': True, 'offset': result['offset']})
+        
+    except Exception as e:
+        app.logger.error(f"Chunk upload error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Chunk upload failed: {str(e)}'}), 500
+
+@app.route('/api/upload/<upload_id>/finalize', methods=['POST'])
+def finalize_chunked_upload(upload_id):
+    """
+    Finish a chunked upload and create its task
+    Input: Optional JSON with sha256 of the whole file to verify
+    Output: JSON with file_id and status, like /api/upload
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        file_id = str(uuid.uuid4())
+        
+        result = upload_manager.finalize_upload(upload_id, data.get('sha256'))
+        if result.get('not_found'):
+            return jsonify({'success': False, 'message': 'Upload not found'}), 404
+        if not result.get('success'):
+            return jsonify({'success': False, 'message': result.get('error'), 'offset': result.get('offset')}), 409
+        
+        task_result = create_upload_task(file_id, result['filename'], result['file_path'],
+                                         result['sha256'], result['existed'])
+        if not task_result['success']:
+            return jsonify({'success': False, 'message': task_result['error']}), 400
         
         return jsonify({
             'success': True,
             'file_id': file_id,
+            'sha256': result['sha256'],
+            'deduplicated': result['existed'],
             'message': 'Video uploaded successfully'
         })
         
     except Exception as e:
-        app.logger.error(f"Upload error: {str(e)}")
-        return jsonify({'success': False, 'message': f'Upload failed: {str(e)}'}), 500
+        app.logger.error(f"Upload finalize error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Upload finalize failed: {str(e)}'}), 500
 
 @app.route('/api/generate-reels', methods=['POST'])
 def generate_reels():
@@ -110,20 +260,47 @@ def generate_reels():
         if not task_data:
             return jsonify({'success': False, 'message': 'File not found'}), 404
         
-        # Update task status and start processing
-        task_data['status'] = 'processing'
-        task_data['configs'] = configs
-        task_data['reels'] = []
-        file_manager.save_task_data(file_id, task_data)
-        
-        # Start background thread for reel generation
-        thread = threading.Thread(target=video_processor.process_video_thread, args=(file_id, configs))
-        thread.daemon = True
-        thread.start()
+        # Mark the task queued; the worker flips it to processing when it picks the job up.
+        # One reel job per task at a time; repeated requests get the running job
+        previous_status = task_data.get('status')
+        claimed = file_manager.update_task_data_if(
+            file_id,
+            {
+                'status': 'queued',
+                'message': 'Waiting for a free worker...',
+                'configs': configs,
+                'reels': []
+            },
+            lambda task: task.get('status') != 'queued'
+            and (task.get(job_key('generate_reels')) or {}).get('state') not in ACTIVE_JOB_STATES
+        )
+        if not claimed:
+            current = file_manager.get_task_data(file_id)
+            if not current:
+                return jsonify({'success': False, 'message': 'File not found'}), 404
+            job = current.get(job_key('generate_reels')) or {}
+            return jsonify({
+                'success': True,
+                'job_id': job.get('job_id'),
+                'state': job.get('state', 'queued'),
+                'message': 'Reel generation already in progress'
+            }), 202
+        
+        submission = job_executor.submit_durable(
+            'generate_reels',
+            file_id,
+            {'configs': configs},
+            priority=PRIORITY_NORMAL
+        )
+        if not submission.get('success'):
+            file_manager.update_task_data(file_id, {'status': previous_status, 'message': submission.get('error')})
+            return jsonify({'success': False, 'message': submission.get('error')}), 429
         
         return jsonify({
             'success': True,
-            'message': 'Reel generation started'
+            'job_id': submission['job_id'],
+            'state': submission['state'],
+            'message': 'Reel generation started' if submission['state'] == 'running' else 'Reel generation queued'
         })
         
     except Exception as e:
@@ -150,13 +327,12 @@ def check_status(task_id):
                 status_result = reel_service.check_status(project_id)
                 
                 if status_result.get('success') and status_result.get('status') == 'completed':
-                    task_info.update({
+                    file_manager.update_task_data(task_id, {
                         'status': 'completed',
                         'video_url': status_result.get('video_url'),
                         'thumbnail_url': status_result.get('thumbnail_url'),
                         'completed_at': status_result.get('completed_at')
                     })
-                    file_manager.save_task_data(task_id, task_info)
                     
                     return jsonify({
                         'success': True,
@@ -166,11 +342,10 @@ def check_status(task_id):
                     })
                 
                 elif status_result.get('success') and status_result.get('status') == 'failed':
-                    task_info.update({
+                    file_manager.update_task_data(task_id, {
                         'status': 'failed',
                         'error': status_result.get('error', 'Unknown error')
                     })
-                    file_manager.save_task_data(task_id, task_info)
                     
                     return jsonify({
                         'success': False,
@@ -183,23 +358,59 @@ def check_status(task_id):
             'status': task_info.get('status'),
             'video_url': task_info.get('video_url'),
             'thumbnail_url': task_info.get('thumbnail_url'),
-            'error': task_info.get('error')
+            'error': task_info.get('error'),
+            'transcript_status': task_info.get('transcript_status'),
+            'transcript_error': task_info.get('transcript_error')
         })
         
     except Exception as e:
         print(f"Status check error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/stats')
+def storage_stats():
+    """
+    Live task storage statistics
+    Input: None
+    Output: JSON with task count, total size and per-status counts
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': file_manager.get_file_stats(),
+            'jobs': job_executor.get_metrics(),
+            'transcripts': transcript_poller.get_metrics(),
+            'search': search_index.get_metrics()
+        })
+    except Exception as e:
+        app.logger.error(f"Stats error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Stats failed: {str(e)}'}), 500
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Background job state and timing metrics
+    Input: job_id in URL path
+    Output: JSON with state, queue_wait and run_time in seconds
+    """
+    job = job_executor.get_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
 @app.route('/api/generate-transcript', methods=['POST'])
 def generate_transcript():
     """
-    Generate transcript from uploaded video
-    Input: JSON with file_id
-    Output: JSON with transcript data
+    Start transcript generation for an uploaded video
+    Input: JSON with file_id, optional options (transcription flags) and force_refresh
+    Output: JSON with the transcript if one is cached, otherwise 202 with the job_id
+            of a background transcription (progress in /api/status as transcript_status)
     """
     try:
         data = request.get_json()
         file_id = data.get('file_id')
+        options = data.get('options')
+        force_refresh = bool(data.get('force_refresh'))
         
         if not file_id:
             return jsonify({'success': False, 'message': 'File ID required'}), 400
@@ -212,28 +423,157 @@ def generate_transcript():
         if not video_path or not os.path.exists(video_path):
             return jsonify({'success': False, 'message': 'Video file not found'}), 404
         
-        # Generate transcript using service
-        transcript_result = transcript_service.generate_transcript(video_path)
+        if not force_refresh:
+            transcript_result = transcript_service.get_cached_transcript(task_data.get('content_hash'), options)
+            if transcript_result:
+                transcript_service.save_to_task(file_id, transcript_result)
+                transcript_result.pop('cached', None)
+                return jsonify({
+                    'success': True,
+                    'transcript': transcript_service.to_response(transcript_result),
+                    'cached': True,
+                    'message': 'Transcript loaded from cache'
+                })
         
-        if transcript_result.get('success'):
-            task_data['transcript'] = transcript_result
-            file_manager.save_task_data(file_id, task_data)
-            
+        # One transcription per task at a time; repeated requests get the running job
+        previous_status = task_data.get('transcript_status')
+        claimed = file_manager.update_task_data_if(
+            file_id,
+            {'transcript_status': 'queued', 'transcript_error': None},
+            lambda task: force_refresh or task.get('transcript_status') not in TRANSCRIPT_ACTIVE_STATES
+        )
+        if not claimed:
+            # The task may have been deleted since it was read
+            current = file_manager.get_task_data(file_id)
+            if not current:
+                return jsonify({'success': False, 'message': 'File not found'}), 404
+            job = current.get(job_key('generate_transcript')) or {}
             return jsonify({
                 'success': True,
-                'transcript': transcript_result,
-                'message': 'Transcript generated successfully'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': f'Transcript generation failed: {transcript_result.get("error", "Unknown error")}'
-            }), 500
+                'job_id': job.get('job_id'),
+                'state': job.get('state', 'queued'),
+                'message': 'Transcript generation already in progress'
+            }), 202
+        
+        submission = job_executor.submit_durable(
+            'generate_transcript',
+            file_id,
+            {'options': options, 'force_refresh': force_refresh},
+            priority=PRIORITY_HIGH
+        )
+        if not submission.get('success'):
+            file_manager.update_task_data(file_id, {'transcript_status': previous_status})
+            return jsonify({'success': False, 'message': submission.get('error')}), 429
+        
+        return jsonify({
+            'success': True,
+            'job_id': submission['job_id'],
+            'state': submission['state'],
+            'message': 'Transcript generation started' if submission['state'] == 'running' else 'Transcript generation queued'
+        }), 202
             
     except Exception as e:
         app.logger.error(f"Transcript generation error: {str(e)}")
         return jsonify({'success': False, 'message': f'Transcript generation failed: {str(e)}'}), 500
 
+@app.route('/api/transcript/<file_id>/window')
+def transcript_window(file_id):
+    """
+    Look up what was said in part of a meeting
+    Input: start and end query parameters in seconds
+    Output: JSON with the words, utterances and speakers in [start, end)
+    """
+    try:
+        try:
+            start = float(request.args['start'])
+            end = float(request.args['end'])
+        except (KeyError, ValueError):
+            return jsonify({'success': False, 'message': 'start and end (seconds) required'}), 400
+        if start < 0 or end <= start:
+            return jsonify({'success': False, 'message': 'end must be after start'}), 400
+        
+        task_data = file_manager.get_task_data(file_id)
+        if not task_data:
+            return jsonify({'success': False, 'message': 'File not found'}), 404
+        
+        words = transcript_service.get_task_words(task_data)
+        if words is None:
+            return jsonify({'success': False, 'message': 'Transcript not generated yet'}), 404
+        
+        window = transcript_service.get_window(words, int(start * 1000), int(end * 1000))
+        return jsonify({
+            'success': True,
+            'file_id': file_id,
+            'start': start,
+            'end': end,
+            **window
+        })
+        
+    except Exception as e:
+        app.logger.error(f"Transcript window error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Transcript lookup failed: {str(e)}'}), 500
+
+@app.route('/api/transcript/<file_id>/insights')
+def transcript_insights(file_id):
+    """
+    Get the meeting insights derived from a transcript
+    Output: JSON with holder, agenda, topics, decisions, action items, chapters,
+            highlights and speaker statistics
+    """
+    try:
+        task_data = file_manager.get_task_data(file_id)
+        if not task_data:
+            return jsonify({'success': False, 'message': 'File not found'}), 404
+        
+        insights = transcript_service.get_task_insights(file_id, task_data)
+        if insights is None:
+            return jsonify({'success': False, 'message': 'Transcript not generated yet'}), 404
+        
+        return jsonify({
+            'success': True,
+            'file_id': file_id,
+            'insights': insights
+        })
+        
+    except Exception as e:
+        app.logger.error(f"Transcript insights error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Insights lookup failed: {str(e)}'}), 500
+
+@app.route('/api/search')
+def search_transcripts():
+    """
+    Full-text search across meeting transcripts
+    Input: q query parameter (terms and "quoted phrases"), optional limit
+    Output: JSON with meetings ranked by BM25, each with timestamped hits
+    """
+    try:
+        query = (request.args.get('q') or '').strip()
+        if not query:
+            return jsonify({'success': False, 'message': 'Query (q) required'}), 400
+        try:
+            limit = min(int(request.args.get('limit', Config.SEARCH_RESULTS_LIMIT)), 100)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'limit must be a number'}), 400
+        
+        search_result = search_index.search(query, max(limit, 1))
+        for result in search_result['results']:
+            words = transcript_service.load_words({'words_blob': result.pop('words_blob')})
+            for hit in result['hits']:
+                # A few words either side of the hit, to show it in context
+                first = words.index_range(hit['start'], hit['start'] + 1).start
+                hit['snippet'] = ' '.join(words.text(index) for index in range(max(0, first - 6), min(len(words), first + 10)))
+        
+        return jsonify({
+            'success': True,
+            'query': query,
+            'total': search_result['total'],
+            'results': search_result['results']
+        })
+        
+    except Exception as e:
+        app.logger.error(f"Search error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Search failed: {str(e)}'}), 500
+
 @app.route('/api/generate-poster', methods=['POST'])
 def generate_poster():
     """
@@ -252,15 +592,25 @@ def generate_poster():
         if not task_data:
             return jsonify({'success': False, 'message': 'File not found'}), 404
         
-        transcript_data = task_data.get('transcript')
+        transcript_data = file_manager.load_artifact(task_data, 'transcript')
         if not transcript_data:
             return jsonify({'success': False, 'message': 'Transcript not found. Generate transcript first.'}), 400
         
+        poster_result = file_manager.reuse_content_artifact(file_id, task_data, 'poster')
+        if poster_result:
+            return jsonify({
+                'success': True,
+                'poster': poster_result,
+                'reused': True,
+                'message': 'Poster reused from an identical upload'
+            })
+        
         # Prepare meeting details
         meeting_details = {
             'title': task_data.get('filename', 'Business Meeting'),
             'date': task_data.get('created_at', 'Recent'),
-            'duration': transcript_data.get('audio_duration', 0)
+            'duration': transcript_data.get('audio_duration', 0),
+            'insights': transcript_service.get_task_insights(file_id, task_data)
         }
         
         # Generate poster using service
@@ -270,8 +620,9 @@ def generate_poster():
         )
         
         if poster_result.get('success'):
-            task_data['poster'] = poster_result
-            file_manager.save_task_data(file_id, task_data)
+            file_manager.save_artifact(file_id, 'poster', poster_result,
+                                       ('image_url', 'service', 'generated_at'),
+                                       task_data.get('content_hash'))
             
             return jsonify({
                 'success': True,
@@ -306,26 +657,39 @@ def generate_blog():
         if not task_data:
             return jsonify({'success': False, 'message': 'File not found'}), 404
         
-        transcript_data = task_data.get('transcript')
+        transcript_data = file_manager.load_artifact(task_data, 'transcript')
         if not transcript_data:
             return jsonify({'success': False, 'message': 'Transcript not found. Generate transcript first.'}), 400
         
+        blog_result = file_manager.reuse_content_artifact(file_id, task_data, 'blog')
+        if blog_result:
+            return jsonify({
+                'success': True,
+                'blog': blog_result,
+                'reused': True,
+                'message': 'Blog article reused from an identical upload'
+            })
+        
         # Prepare meeting details
         meeting_details = {
             'title': task_data.get('filename', 'Business Meeting'),
             'date': task_data.get('created_at', 'Recent'),
-            'duration': transcript_data.get('audio_duration', 0)
+            'duration': transcript_data.get('audio_duration', 0),
+            'insights': transcript_service.get_task_insights(file_id, task_data)
         }
         
         # Generate blog using service
         blog_result = blog_service.generate_blog_article(
             transcript_data.get('transcript', ''),
-            meeting_details
+            meeting_details,
+            words=transcript_service.load_words(transcript_data),
+            content_hash=task_data.get('content_hash')
         )
         
         if blog_result.get('success'):
-            task_data['blog'] = blog_result
-            file_manager.save_task_data(file_id, task_data)
+            file_manager.save_artifact(file_id, 'blog', blog_result,
+                                       ('word_count', 'service', 'generated_at'),
+                                       task_data.get('content_hash'))
             
             return jsonify({
                 'success': True,
@@ -374,6 +738,30 @@ def download_reel(file_id, reel_id):
         app.logger.error(f"Download error: {str(e)}")
         return jsonify({'success': False, 'message': f'Download failed: {str(e)}'}), 500
 
+@app.route('/api/webhook/assemblyai', methods=['POST'])
+def assemblyai_webhook():
+    """
+    Handle AssemblyAI transcript-finished callbacks
+    Input: JSON webhook data with transcript_id and status
+    Output: JSON confirmation
+    """
+    try:
+        secret = Config.ASSEMBLYAI_WEBHOOK_SECRET
+        if secret and not hmac.compare_digest(request.headers.get('X-Webhook-Secret', ''), secret):
+            return jsonify({'success': False, 'error': 'Invalid webhook secret'}), 401
+        
+        data = request.get_json(silent=True)
+        if not data or not data.get('transcript_id'):
+            return jsonify({'success': False, 'error': 'No transcript ID'}), 400
+        
+        # The poller fetches the result itself, so the payload is never trusted beyond the id
+        tracked = transcript_poller.notify(data['transcript_id'])
+        return jsonify({'success': True, 'tracked': tracked})
+        
+    except Exception as e:
+        app.logger.error(f"AssemblyAI webhook error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/webhook', methods=['POST'])
 def webhook():
     """
@@ -401,25 +789,19 @@ def webhook():
                 video_url = output.get('videoUrl')
                 thumbnail_url = output.get('thumbnailUrl')
                 
-                task_info = file_manager.get_task_data(project_id)
-                if task_info:
-                    task_info.update({
-                        'status': 'completed',
-                        'video_url': video_url,
-                        'thumbnail_url': thumbnail_url,
-                        'completed_at': datetime.now().isoformat()
-                    })
-                    file_manager.save_task_data(project_id, task_info)
+                file_manager.update_task_data(project_id, {
+                    'status': 'completed',
+                    'video_url': video_url,
+                    'thumbnail_url': thumbnail_url,
+                    'completed_at': datetime.now().isoformat()
+                })
         
         elif status == 'failed':
             error = data.get('error', 'Unknown error')
-            task_info = file_manager.get_task_data(project_id)
-            if task_info:
-                task_info.update({
-                    'status': 'failed',
-                    'error': error
-                })
-                file_manager.save_task_data(project_id, task_info)
+            file_manager.update_task_data(project_id, {
+                'status': 'failed',
+                'error': error
+            })
         
         return jsonify({'success': True}), 200
         
@@ -0,0 +1,29 @@
+"""
+Shared test setup: the backend package on sys.path, a scratch working
+directory for the module-level stores and no provider API keys
+"""
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Empty values win over backend/.env (load_dotenv doesn't override) and read as unset
+for key in ('ASSEMBLYAI_API_KEY', 'OPENAI_API_KEY', 'QUICKREEL_API_KEY', 'RUNWAYML_API_KEY',
+            'STABILITYAI_API_KEY', 'CANVA_API_KEY', 'STORAGE_BACKEND', 'DATABASE_URL',
+            'TASK_STORE_MULTIPROCESS', 'ASSEMBLYAI_WEBHOOK_URL'):
+    os.environ[key] = ''
+# Background compaction and flushing only run when a test asks for them
+os.environ['TASK_JOURNAL_COMPACT_INTERVAL'] = '3600'
+os.environ['PROGRESS_FLUSH_INTERVAL'] = '3600'
+
+# The module-level stores create their files relative to the working directory
+os.chdir(tempfile.mkdtemp(prefix='smartmeeting-tests-'))
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    """Run the test inside its own directory, where FileManager keeps tasks.json and its journal"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
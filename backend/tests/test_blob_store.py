@@ -0,0 +1,43 @@
+"""
+Blob store tests: concurrent writers and the unreferenced-blob sweep
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.blob_store import BlobStore
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+def test_concurrent_writers_publish_one_blob(tmp_path):
+    store = BlobStore(str(tmp_path))
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        blob_ids = set(pool.map(lambda _: store.put({'transcript': 'x' * 10000}), range(64)))
+
+    assert len(blob_ids) == 1
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == [f"{blob_ids.pop()}.json.z"]
+
+def test_sweep_removes_only_old_unreferenced_blobs(tmp_path):
+    store = BlobStore(str(tmp_path))
+    kept = store.put({'kept': 1})
+    words = store.put_bytes(b'words')
+    orphan = store.put({'orphan': 1})
+    fresh = store.put({'fresh': 1})
+    for blob_id, extension in ((kept, '.json.z'), (words, '.bin.z'), (orphan, '.json.z')):
+        age(store._blob_path(blob_id, extension), 7200)
+
+    assert store.sweep(lambda: {kept, words}, min_age=3600) == 1
+    assert store.exists(kept) and store.exists(fresh)
+    assert store.get_bytes(words) == b'words'
+    assert not store.exists(orphan)
+
+def test_storing_a_blob_again_protects_it_from_the_sweep(tmp_path):
+    store = BlobStore(str(tmp_path))
+    blob_id = store.put({'payload': 1})
+    age(store._blob_path(blob_id), 7200)
+    store.put({'payload': 1})
+
+    assert store.sweep(lambda: set(), min_age=3600) == 0
+    assert store.get(blob_id) == {'payload': 1}
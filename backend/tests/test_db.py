@@ -0,0 +1,43 @@
+"""
+SQLite task store tests: indexed columns and index use
+"""
+import pytest
+from config import Config
+from db import DatabaseManager
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{tmp_path / 'tasks.db'}")
+    manager = DatabaseManager()
+    yield manager
+    manager.close_connection()
+
+def indexed_columns(db, task_id):
+    row = db.get_connection().execute('SELECT status, created_at, file_size_mb FROM tasks WHERE id = ?', (task_id,)).fetchone()
+    return tuple(row)
+
+def test_put_task_accepts_null_video_info(db):
+    db.put_task('a', {'status': 'uploaded', 'created_at': '2026-01-01', 'video_info': None})
+    assert indexed_columns(db, 'a') == ('uploaded', '2026-01-01', 0)
+
+def test_field_updates_recompute_every_indexed_column(db):
+    db.put_task('a', {'status': 'uploaded', 'created_at': '2026-01-01'})
+    assert db.update_task_fields('a', {'video_info': {'file_size_mb': 12.5}, 'upload_time': '2025-05-05'})
+    assert db.update_task_fields_if('a', {'status': 'completed'}, lambda task: task['status'] == 'uploaded')
+    assert not db.update_task_fields_if('a', {'status': 'failed'}, lambda task: task['status'] == 'uploaded')
+
+    assert indexed_columns(db, 'a') == ('completed', '2025-05-05', 12.5)
+    assert db.get_task_stats() == {'total_files': 1, 'total_size_mb': 12.5, 'status_counts': {'completed': 1}}
+    assert not db.update_task_fields('missing', {'status': 'completed'})
+
+def test_expired_task_lookup_uses_the_created_at_index(db):
+    db.put_task('old', {'status': 'completed', 'created_at': '2020-01-01'})
+    db.put_task('undated', {'status': 'completed'})
+    db.put_task('new', {'status': 'completed', 'created_at': '2030-01-01'})
+
+    assert sorted(db.get_tasks_created_before('2025-01-01')) == ['old', 'undated']
+    plan = ' '.join(row[3] for row in db.get_connection().execute(
+        'EXPLAIN QUERY PLAN SELECT id, data FROM tasks WHERE created_at < ? OR created_at IS NULL', ('2025',)
+    ))
+    assert 'idx_tasks_created_at' in plan
+    assert 'SCAN tasks' not in plan
@@ -0,0 +1,133 @@
+"""
+Task store tests: journal replay, compaction and multi-process sync
+"""
+import os
+import multiprocessing
+import pytest
+from config import Config
+from db import DatabaseManager
+import utils.file_manager as file_manager_module
+from utils.file_manager import FileManager, fcntl
+
+def new_task(status='uploaded'):
+    return {'status': status, 'created_at': '2026-01-01T00:00:00', 'video_info': {'file_size_mb': 1.5}}
+
+def test_journal_replay_restores_every_mutation(store_dir):
+    store = FileManager()
+    store.save_task_data('a', new_task())
+    store.save_task_data('b', new_task())
+    store.update_task_data('a', {'filename': 'a.mp4'})
+    store.update_task_status('a', 'completed', 100)
+    store.update_task_data_if('b', {'status': 'failed'}, lambda task: task['status'] == 'uploaded')
+    store.update_task_data_if('b', {'status': 'completed'}, lambda task: task['status'] == 'uploaded')
+
+    reloaded = FileManager()
+    assert reloaded.get_task_data('a')['filename'] == 'a.mp4'
+    assert reloaded.get_task_data('a')['status'] == 'completed'
+    assert reloaded.get_task_data('b')['status'] == 'failed'
+    assert reloaded.get_file_stats() == {'total_files': 2, 'total_size_mb': 3.0,
+                                         'status_counts': {'completed': 1, 'failed': 1}}
+
+def test_torn_journal_record_is_dropped_and_appends_continue(store_dir):
+    store = FileManager()
+    store.save_task_data('a', new_task())
+    store._close_journal()
+    # A crash in the middle of an append
+    with open('tasks.journal', 'a') as f:
+        f.write('{"op": "patch", "id": "a", "fields": {"status": "proc')
+
+    reloaded = FileManager()
+    assert reloaded.get_task_data('a')['status'] == 'uploaded'
+    reloaded.update_task_data('a', {'status': 'processing'})
+    assert FileManager().get_task_data('a')['status'] == 'processing'
+
+def test_compaction_folds_the_journal_into_the_snapshot(store_dir):
+    store = FileManager()
+    store.save_task_data('a', new_task())
+    store.save_tasks()
+    assert os.path.exists('tasks.json')
+    assert not os.path.exists('tasks.journal.compacting')
+    store.update_task_data('a', {'status': 'processing'})
+
+    assert FileManager().get_task_data('a')['status'] == 'processing'
+
+def test_buffered_progress_is_flushed_before_a_full_record_write(store_dir):
+    store = FileManager()
+    store.save_task_data('a', new_task())
+    store.update_task_status('a', 'processing', 40)
+    assert store.get_task_data('a')['progress'] == 40
+    store.update_task_data('a', {'message': 'done'})
+
+    task = FileManager().get_task_data('a')
+    assert (task['status'], task['progress'], task['message']) == ('processing', 40, 'done')
+
+@pytest.fixture
+def multiprocess(store_dir, monkeypatch):
+    if fcntl is None:
+        pytest.skip('multi-process mode needs fcntl')
+    monkeypatch.setattr(Config, 'TASK_STORE_MULTIPROCESS', True)
+    return store_dir
+
+def test_stores_see_each_others_writes(multiprocess):
+    first, second = FileManager(), FileManager()
+    first.save_task_data('a', new_task())
+    assert second.get_task_data('a')['status'] == 'uploaded'
+
+    second.update_task_data('a', {'status': 'processing'})
+    assert first.get_task_data('a')['status'] == 'processing'
+
+    # A compaction by one process is picked up by the other
+    first.save_tasks()
+    second.update_task_data('a', {'progress': 50})
+    assert first.get_task_data('a')['progress'] == 50
+    assert first.get_file_stats()['status_counts'] == {'processing': 1}
+
+def test_buffered_progress_survives_another_process_compacting(multiprocess):
+    first, second, third = FileManager(), FileManager(), FileManager()
+    first.save_task_data('a', new_task())
+    first.update_task_status('a', 'processing', 10)
+    second.update_task_status('a', 'processing', 20)
+    third.save_tasks()
+    first.flush_progress()
+    first.save_tasks()
+
+    assert FileManager().get_task_data('a')['status'] == 'processing'
+    second.flush_progress()
+
+def _write_tasks(directory, worker, count):
+    os.chdir(directory)
+    store = FileManager()
+    for index in range(count):
+        file_id = f'{worker}-{index}'
+        store.save_task_data(file_id, new_task())
+        store.update_task_status(file_id, 'processing', 50)
+        if index % 7 == 0:
+            store.save_tasks()
+        store.update_task_status(file_id, 'completed', 100)
+    store.flush_progress()
+
+def test_concurrent_processes_keep_every_update(multiprocess):
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_write_tasks, args=(str(multiprocess), worker, 30)) for worker in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    tasks = FileManager().get_all_tasks()
+    assert len(tasks) == 90
+    assert {task['status'] for task in tasks} == {'completed'}
+
+def test_sqlite_backend_ignores_the_multiprocess_flag(store_dir, monkeypatch):
+    monkeypatch.setattr(Config, 'TASK_STORE_MULTIPROCESS', True)
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'sqlite')
+    monkeypatch.setattr(Config, 'DATABASE_URL', f"sqlite:///{store_dir / 'tasks.db'}")
+    monkeypatch.setattr(file_manager_module, 'db_manager', DatabaseManager())
+
+    store = FileManager()
+    assert not store.multiprocess
+    store.save_task_data('a', new_task())
+    store.update_task_status('a', 'processing', 10)
+    store.flush_progress()
+    assert store.get_task_data('a')['status'] == 'processing'
@@ -0,0 +1,91 @@
+"""
+Durable job tests: persistence, lease renewal and recovery after a restart
+"""
+import time
+import threading
+import pytest
+from config import Config
+import utils.job_executor as job_executor_module
+from utils.file_manager import FileManager
+from utils.job_executor import JobExecutor, job_key
+
+@pytest.fixture
+def store(store_dir, monkeypatch):
+    store = FileManager()
+    monkeypatch.setattr(job_executor_module, 'file_manager', store)
+    return store
+
+def orphan(store, file_id, attempts=1):
+    """A task whose job was running in a process that died"""
+    store.save_task_data(file_id, {
+        'status': 'processing',
+        job_key('work'): {
+            'job_id': f'job-{file_id}', 'name': 'work', 'file_id': file_id, 'params': {},
+            'priority': 5, 'state': 'running', 'attempts': attempts, 'submitted_at': 0,
+            'error': None, 'lease_owner': 'dead-host:1', 'lease_expires_at': 0
+        }
+    })
+
+def job_state(store, file_id):
+    return (store.get_task_data(file_id).get(job_key('work')) or {}).get('state')
+
+def test_recovery_runs_every_orphan_even_when_saturated(store):
+    executor = JobExecutor(max_workers=1, max_queue_size=0)
+    done = []
+    executor.register('work', lambda file_id: done.append(file_id))
+    for index in range(5):
+        orphan(store, f't{index}')
+
+    assert executor.recover_jobs() == 5
+    assert executor.shutdown(10)
+    assert sorted(done) == [f't{index}' for index in range(5)]
+    assert {job_state(store, f't{index}') for index in range(5)} == {'completed'}
+
+def test_recovery_gives_up_after_max_attempts(store):
+    executor = JobExecutor(max_workers=1, max_queue_size=0)
+    given_up = []
+    executor.register('work', lambda file_id: None, on_give_up=lambda file_id, error: given_up.append(file_id))
+    orphan(store, 'a', attempts=Config.JOB_MAX_ATTEMPTS)
+
+    assert executor.recover_jobs() == 0
+    assert job_state(store, 'a') == 'failed'
+    assert given_up == ['a']
+
+def test_live_lease_is_left_alone(store):
+    executor = JobExecutor(max_workers=1, max_queue_size=0)
+    executor.register('work', lambda file_id: None)
+    orphan(store, 'a')
+    store.update_task_data('a', {job_key('work'): dict(store.get_task_data('a')[job_key('work')],
+                                                       lease_expires_at=time.time() + 3600)})
+
+    assert executor.recover_jobs() == 0
+    assert job_state(store, 'a') == 'running'
+    executor.shutdown(1)
+
+def test_rejected_fresh_submission_clears_its_record(store):
+    executor = JobExecutor(max_workers=1, max_queue_size=0)
+    release = threading.Event()
+    executor.register('work', lambda file_id: release.wait(5))
+    store.save_task_data('a', {'status': 'uploaded'})
+    store.save_task_data('b', {'status': 'uploaded'})
+
+    assert executor.submit_durable('work', 'a', {})['success']
+    rejected = executor.submit_durable('work', 'b', {})
+    assert rejected['saturated']
+    assert store.get_task_data('b')[job_key('work')] is None
+
+    release.set()
+    assert executor.shutdown(10)
+    assert job_state(store, 'a') == 'completed'
+
+def test_stale_lease_renewal_does_not_reopen_a_finished_job(store):
+    executor = JobExecutor(max_workers=1, max_queue_size=0)
+    executor.register('work', lambda file_id: None)
+    store.save_task_data('a', {'status': 'uploaded'})
+    executor.submit_durable('work', 'a', {})
+    assert executor.shutdown(10)
+
+    finished = store.get_task_data('a')[job_key('work')]
+    assert finished['state'] == 'completed'
+    assert executor._persist(dict(finished, state='running'), renewal=True) is False
+    assert job_state(store, 'a') == 'completed'
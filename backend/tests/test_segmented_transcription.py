@@ -0,0 +1,107 @@
+"""
+Segmented transcription tests: cut-before-submit, partial failures and resume
+"""
+import os
+import json
+import threading
+from concurrent.futures import Future
+import pytest
+from config import Config
+import utils.assemblyai_service as assemblyai_module
+from utils.assemblyai_service import AssemblyAIService
+
+class ImmediatePoller:
+    """Resolves a tracked transcript with its current state right away"""
+    def track(self, transcript_id, fetch, audio_duration=None):
+        future = Future()
+        future.set_result(fetch(transcript_id))
+        return future
+
+class FakeProvider:
+    def __init__(self, failing_segments=(), failures=0):
+        self.lock = threading.Lock()
+        self.submitted = {}
+        self.failing_segments = set(failing_segments)
+        self.failures = failures
+
+    def submit(self, path, options=None):
+        with self.lock:
+            segment = os.path.basename(path)
+            if any(segment.startswith(f'segment{index:03d}') for index in self.failing_segments) and self.failures:
+                self.failures -= 1
+                return {'success': False, 'error': 'upload failed'}
+            transcript_id = f't{len(self.submitted)}'
+            self.submitted[transcript_id] = segment
+        return {'success': True, 'transcript_id': transcript_id}
+
+    def fetch(self, transcript_id):
+        return {'status': 'completed', 'text': transcript_id, 'confidence': 0.9, 'audio_duration': 600,
+                'words': [{'text': transcript_id, 'start': 20000, 'end': 20300, 'speaker': 'A', 'confidence': 0.9}]}
+
+@pytest.fixture
+def service(store_dir, monkeypatch):
+    monkeypatch.setattr(Config, 'SEGMENTED_TRANSCRIPTION_ENABLED', True)
+    monkeypatch.setattr(Config, 'HTTP_RETRY_BACKOFF', 0)
+    monkeypatch.setattr(assemblyai_module, 'transcript_poller', ImmediatePoller())
+    monkeypatch.setattr(assemblyai_module, 'probe_media', lambda path: {'duration_ms': 3000 * 1000})
+    extractor = assemblyai_module.audio_extractor
+    monkeypatch.setattr(extractor, 'extract_audio', lambda path: path)
+    monkeypatch.setattr(extractor, 'detect_silences', lambda path: {'duration': 3000, 'silences': []})
+
+    def cut(audio_path, start, duration, segment_path):
+        with open(segment_path + '.m4a', 'wb') as f:
+            f.write(b'audio')
+        return segment_path + '.m4a'
+    monkeypatch.setattr(extractor, 'cut_segment', cut)
+
+    open('meeting.mp4', 'wb').write(b'video')
+    service = AssemblyAIService()
+    service.api_key = 'test'
+    return service
+
+def use(service, provider):
+    service.submit_transcription = provider.submit
+    service.fetch_transcript = provider.fetch
+
+def test_failed_cut_submits_nothing_and_falls_back_to_the_whole_recording(service, monkeypatch):
+    provider = FakeProvider()
+    use(service, provider)
+    extractor = assemblyai_module.audio_extractor
+    monkeypatch.setattr(extractor, 'cut_segment', lambda audio_path, start, duration, segment_path: None)
+
+    result = service.transcribe_video_async('meeting.mp4', {}).result(timeout=10)
+    assert result['success']
+    assert list(provider.submitted.values()) == ['meeting.mp4']
+
+def test_failed_submission_is_retried_without_resubmitting_the_others(service):
+    provider = FakeProvider(failing_segments=[1], failures=1)
+    use(service, provider)
+    plans = []
+
+    result = service.transcribe_video_async('meeting.mp4', {}, on_submitted=plans.append).result(timeout=10)
+    assert result['success']
+    assert len(provider.submitted) == 5
+    assert all(segment.get('transcript_id') for segment in plans[-1]['segments'])
+
+def test_partial_plan_is_resumed_submitting_only_missing_segments(service):
+    provider = FakeProvider(failing_segments=[1], failures=100)
+    use(service, provider)
+    plans = []
+
+    failed = service.transcribe_video_async('meeting.mp4', {}, on_submitted=plans.append).result(timeout=10)
+    assert not failed['success'] and failed['resumable']
+    # The plan is persisted on the task as JSON
+    plan = json.loads(json.dumps(plans[-1]))
+    assert [bool(segment.get('transcript_id')) for segment in plan['segments']] == [True, False, True, True, True]
+
+    provider.failures = 0
+    submitted = len(provider.submitted)
+    result = service.transcribe_video_async('meeting.mp4', {}, transcript_id=plan,
+                                            on_submitted=plans.append).result(timeout=10)
+    assert result['success']
+    assert len(provider.submitted) - submitted == 1
+
+    # A fully submitted plan (a restart after submission) is only tracked
+    submitted = len(provider.submitted)
+    assert service.transcribe_video_async('meeting.mp4', {}, transcript_id=plans[-1]).result(timeout=10)['success']
+    assert len(provider.submitted) == submitted
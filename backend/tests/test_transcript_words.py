@@ -0,0 +1,36 @@
+"""
+Columnar transcript words tests: binary round trip and time slicing
+"""
+import pytest
+from utils.transcript_words import TranscriptWords
+
+WORDS = [
+    {'text': 'Hello', 'start': 0, 'end': 400, 'confidence': 0.9, 'speaker': 'A'},
+    {'text': 'there.', 'start': 450, 'end': 800, 'confidence': 0.8, 'speaker': 'A'},
+    {'text': 'Hi', 'start': 1000, 'end': 1200, 'confidence': 0.95, 'speaker': 'B'},
+    {'text': 'Hello', 'start': 1300, 'end': 1600, 'confidence': 0.7}
+]
+
+def test_binary_round_trip():
+    words = TranscriptWords.from_dicts(WORDS)
+    decoded = TranscriptWords.from_bytes(words.to_bytes())
+    assert decoded.to_dicts() == words.to_dicts()
+    assert decoded.vocabulary == ['Hello', 'there.', 'Hi']
+    assert decoded.speakers == ['A', 'B']
+
+def test_empty_speaker_label_survives_encoding():
+    words = TranscriptWords.from_dicts([{'text': 'a', 'start': 0, 'end': 1, 'speaker': ''}])
+    decoded = TranscriptWords.from_bytes(words.to_bytes())
+    assert decoded.speakers == ['']
+    assert decoded.speaker(0) == ''
+
+def test_slice_time_includes_words_still_being_spoken():
+    words = TranscriptWords.from_dicts(WORDS)
+    window = words.slice_time(600, 1250)
+    assert [window.text(index) for index in range(len(window))] == ['there.', 'Hi']
+    assert len(TranscriptWords.from_bytes(words.slice_time(5000, 6000).to_bytes())) == 0
+
+@pytest.mark.parametrize('data', [b'', b'TWC1', b'XXXX' + bytes(40)])
+def test_invalid_data_is_rejected(data):
+    with pytest.raises(ValueError):
+        TranscriptWords.from_bytes(data)
@@ -1,28 +1,208 @@
 import os
+import copy
+import math
 import time
-import requests
-from typing import Dict, Optional
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
 from config import Config
+from .http_client import get_http_client
+from .audio_extractor import audio_extractor
+from .media_probe import probe_media
+from .transcript_poller import transcript_poller
+from .single_flight import chain_future, gather_futures
+from .transcript_segmenter import plan_segments, stitch_segments
 
 class AssemblyAIService:
     def __init__(self):
         self.api_key = Config.ASSEMBLYAI_API_KEY
         self.base_url = "https://api.assemblyai.com/v2"
+        self.http = get_http_client('assemblyai')
         
-    def transcribe_video(self, video_path: str) -> Dict:
+    def transcribe_video(self, video_path: str, options: Optional[Dict] = None) -> Dict:
         """
-        Transcribe video using AssemblyAI
+        Transcribe video using AssemblyAI (blocks until the transcript is ready)
+        options: transcription request flags (speaker_labels, auto_chapters, language_code, ...)
+        """
+        try:
+            return self.transcribe_video_async(video_path, options).result()
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def transcribe_video_async(self, video_path: str, options: Optional[Dict] = None,
+                               transcript_id: Union[str, Dict] = None,
+                               on_submitted: Callable[[Union[str, Dict]], None] = None) -> Future:
+        """
+        Submit a video for transcription without waiting for it
+        transcript_id: resume an already submitted transcription instead of submitting again,
+                       either a provider transcript id or the segment plan of a segmented one
+        on_submitted: called with the provider transcript id once it is known (with the
+                      segment plan, each time one more segment is submitted)
+        Returns: Future resolving to the same dict transcribe_video returns
         """
         if not self.api_key:
-            return self._mock_transcribe(video_path)
-            
+            future = Future()
+            future.set_result(self._mock_transcribe(video_path))
+            return future
+        
+        probe = probe_media(video_path)
+        audio_duration = probe['duration_ms'] / 1000 if probe and probe.get('duration_ms') else None
+        
+        if isinstance(transcript_id, dict):
+            # A plan made for other options is not resumed
+            if transcript_id.get('options') == (options or {}):
+                return self._resume_segmented_async(video_path, transcript_id, options, on_submitted)
+            transcript_id = None
+        
+        if not transcript_id:
+            # Upload only the audio track when it can be extracted, the full video otherwise
+            audio_path = audio_extractor.extract_audio(video_path)
+            if Config.SEGMENTED_TRANSCRIPTION_ENABLED and (audio_duration or math.inf) > Config.TRANSCRIPT_SEGMENT_MIN_DURATION:
+                segmented = self.transcribe_segmented_async(audio_path, audio_duration, options, on_submitted)
+                if segmented is not None:
+                    return segmented
+            submission = self.submit_transcription(audio_path, options)
+            if not submission.get('success'):
+                future = Future()
+                future.set_result(submission)
+                return future
+            transcript_id = submission['transcript_id']
+        if on_submitted:
+            on_submitted(transcript_id)
+        
+        # Completion is detected by the shared poller (or a webhook), not a loop per transcript
+        return chain_future(
+            transcript_poller.track(transcript_id, self.fetch_transcript, audio_duration),
+            self.format_transcript
+        )
+    
+    def transcribe_segmented_async(self, audio_path: str, audio_duration: Optional[float] = None,
+                                   options: Optional[Dict] = None,
+                                   on_submitted: Callable[[Dict], None] = None) -> Optional[Future]:
+        """
+        Cut a long recording at silences and transcribe the segments in parallel
+        on_submitted: called with the segment plan each time a segment is submitted
+        Returns: Future resolving to the stitched transcript, or None when the recording
+                 can't or needn't be segmented (no ffmpeg, short, cutting failed)
+        """
+        detection = audio_extractor.detect_silences(audio_path)
+        if detection is None:
+            return None
+        duration = audio_duration or detection['duration']
+        if not duration or duration <= Config.TRANSCRIPT_SEGMENT_MIN_DURATION:
+            return None
+        
+        plan = {'options': options or {}, 'segments': plan_segments(duration, detection['silences'])}
+        work_dir = tempfile.mkdtemp(prefix='segments-')
+        try:
+            # Every segment is cut before any is submitted, so a failed cut costs nothing
+            paths = self._cut_segments(audio_path, plan['segments'], work_dir)
+            if paths is None:
+                return None
+            return self._submit_segments(plan, paths, options, on_submitted)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def _resume_segmented_async(self, video_path: str, plan: Dict, options: Optional[Dict],
+                                on_submitted: Callable[[Dict], None] = None) -> Future:
+        """Track the submitted segments of a plan and submit only the ones that are missing"""
+        plan = copy.deepcopy(plan)
+        pending = [segment for segment in plan['segments'] if not segment.get('transcript_id')]
+        if not pending:
+            return self._track_segments(plan)
+        
+        work_dir = tempfile.mkdtemp(prefix='segments-')
+        try:
+            paths = self._cut_segments(audio_extractor.extract_audio(video_path), pending, work_dir)
+            if paths is None:
+                future = Future()
+                future.set_result({'success': False, 'error': 'Could not cut the remaining segments'})
+                return future
+            return self._submit_segments(plan, paths, options, on_submitted)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def _cut_segments(self, audio_path: str, segments: List[Dict], work_dir: str) -> Optional[Dict[int, str]]:
+        """Cut segments to files in parallel; segment path by index, or None if any cut failed"""
+        def cut(segment: Dict) -> Optional[str]:
+            return audio_extractor.cut_segment(
+                audio_path, segment['start'], segment['end'] - segment['start'],
+                os.path.join(work_dir, f"segment{segment['index']:03d}")
+            )
+        
+        with ThreadPoolExecutor(max_workers=Config.TRANSCRIPT_SEGMENT_UPLOADS) as pool:
+            paths = list(pool.map(cut, segments))
+        if not all(paths):
+            return None
+        return {segment['index']: path for segment, path in zip(segments, paths)}
+    
+    def _submit_segments(self, plan: Dict, paths: Dict[int, str], options: Optional[Dict],
+                         on_submitted: Callable[[Dict], None] = None) -> Future:
+        """
+        Submit the segments of a plan that have no transcript id yet, then track them all
+        
+        Each accepted segment is recorded on the plan (and reported through on_submitted)
+        at once. Failed submissions are retried with backoff; accepted segments are never
+        submitted again, so a failure or restart doesn't pay for them twice.
+        """
+        lock = threading.Lock()
+        
+        def submit(segment: Dict) -> Dict:
+            submission = self.submit_transcription(paths[segment['index']], options)
+            if submission.get('success'):
+                with lock:
+                    segment['transcript_id'] = submission['transcript_id']
+                    if on_submitted:
+                        on_submitted(copy.deepcopy(plan))
+            return submission
+        
+        attempt = 0
+        while True:
+            pending = [segment for segment in plan['segments'] if not segment.get('transcript_id')]
+            with ThreadPoolExecutor(max_workers=Config.TRANSCRIPT_SEGMENT_UPLOADS) as pool:
+                submissions = list(pool.map(submit, pending))
+            failed = next((submission for submission in submissions if not submission.get('success')), None)
+            if not failed:
+                break
+            attempt += 1
+            if attempt >= Config.HTTP_MAX_RETRIES:
+                future = Future()
+                # resumable: the accepted segments stay on the task for the next attempt
+                future.set_result(dict(failed, resumable=any(segment.get('transcript_id') for segment in plan['segments'])))
+                return future
+            time.sleep(min(Config.HTTP_RETRY_BACKOFF * 2 ** (attempt - 1), Config.HTTP_RETRY_BACKOFF_MAX))
+        
+        return self._track_segments(plan)
+    
+    def _track_segments(self, plan: Dict) -> Future:
+        """Wait for every segment transcript and stitch them into one"""
+        segments = plan['segments']
+        # Every segment is tracked by the shared poller, so they all finish in about one segment's time
+        tracked = [
+            chain_future(
+                transcript_poller.track(segment['transcript_id'], self.fetch_transcript, segment['end'] - segment['start']),
+                self.format_transcript
+            )
+            for segment in segments
+        ]
+        return chain_future(gather_futures(tracked), lambda results: stitch_segments(segments, results))
+    
+    def submit_transcription(self, audio_path: str, options: Optional[Dict] = None) -> Dict:
+        """
+        Upload a media file and start its transcription
+        Returns: success and the provider transcript_id
+        """
         try:
-            # Upload the video file
             upload_url = f"{self.base_url}/upload"
             headers = {"authorization": self.api_key}
             
-            with open(video_path, "rb") as f:
-                response = requests.post(upload_url, headers=headers, data=f)
+            with open(audio_path, "rb") as f:
+                response = self.http.post(upload_url, headers=headers, data=f)
                 response.raise_for_status()
                 upload_url = response.json()["upload_url"]
             
@@ -35,36 +215,19 @@ class AssemblyAIService:
                 "entity_detection": True,
                 "auto_highlights": True
             }
+            transcript_request.update({key: value for key, value in (options or {}).items() if value is not None})
+            if Config.ASSEMBLYAI_WEBHOOK_URL:
+                transcript_request["webhook_url"] = Config.ASSEMBLYAI_WEBHOOK_URL
+                if Config.ASSEMBLYAI_WEBHOOK_SECRET:
+                    transcript_request["webhook_auth_header_name"] = "X-Webhook-Secret"
+                    transcript_request["webhook_auth_header_value"] = Config.ASSEMBLYAI_WEBHOOK_SECRET
             
-            response = requests.post(transcript_url, json=transcript_request, headers=headers)
+            response = self.http.post(transcript_url, json=transcript_request, headers=headers)
             response.raise_for_status()
-            transcript_id = response.json()["id"]
-            
-            # Poll for completion
-            polling_url = f"{self.base_url}/transcript/{transcript_id}"
-            while True:
-                polling_response = requests.get(polling_url, headers=headers)
-                polling_response.raise_for_status()
-                transcript = polling_response.json()
-                
-                if transcript["status"] == "completed":
-                    return {
-                        'success': True,
-                        'transcript': transcript.get('text', ''),
-                        'chapters': transcript.get('chapters', []),
-                        'highlights': transcript.get('auto_highlights_result', {}),
-                        'speakers': transcript.get('utterances', []),
-                        'entities': transcript.get('entities', []),
-                        'confidence': transcript.get('confidence', 0),
-                        'audio_duration': transcript.get('audio_duration', 0)
-                    }
-                elif transcript["status"] == "error":
-                    return {
-                        'success': False,
-                        'error': transcript.get('error', 'Transcription failed')
-                    }
-                
-                time.sleep(3)
+            return {
+                'success': True,
+                'transcript_id': response.json()["id"]
+            }
                 
         except Exception as e:
             return {
@@ -72,6 +235,37 @@ class AssemblyAIService:
                 'error': str(e)
             }
     
+    def fetch_transcript(self, transcript_id: str) -> Dict:
+        """
+        Fetch the current state of a transcript (used by the poller)
+        """
+        polling_url = f"{self.base_url}/transcript/{transcript_id}"
+        response = self.http.get(polling_url, headers={"authorization": self.api_key},
+                                 timeout=(Config.HTTP_CONNECT_TIMEOUT, Config.TRANSCRIPT_POLL_READ_TIMEOUT))
+        response.raise_for_status()
+        return response.json()
+    
+    def format_transcript(self, transcript: Dict) -> Dict:
+        """
+        Convert a finished provider transcript into the service result
+        """
+        if transcript["status"] == "completed":
+            return {
+                'success': True,
+                'transcript': transcript.get('text', ''),
+                'chapters': transcript.get('chapters', []),
+                'highlights': transcript.get('auto_highlights_result', {}),
+                'speakers': transcript.get('utterances', []),
+                'entities': transcript.get('entities', []),
+                'words': transcript.get('words', []),
+                'confidence': transcript.get('confidence', 0),
+                'audio_duration': transcript.get('audio_duration', 0)
+            }
+        return {
+            'success': False,
+            'error': transcript.get('error', 'Transcription failed')
+        }
+    
     def _mock_transcribe(self, video_path: str) -> Dict:
         """
         Mock transcription for testing without API key
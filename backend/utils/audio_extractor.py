@@ -0,0 +1,195 @@
+"""
+Audio extractor utility
+Pulls the audio track out of a recording with a local ffmpeg before it is
+uploaded for transcription, caching the result next to the upload, and finds
+silences to cut long recordings at
+"""
+import os
+import re
+import glob
+import shutil
+import threading
+import subprocess
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from .media_probe import probe_media
+
+# Audio codecs that can be copied out of the container as-is: codec -> (ffmpeg muxer, extension)
+COPY_FORMATS = {
+    'aac': ('mp4', '.m4a'),
+    'mp3': ('mp3', '.mp3'),
+    'opus': ('ogg', '.ogg'),
+    'vorbis': ('ogg', '.ogg'),
+    'flac': ('flac', '.flac')
+}
+# Everything else is transcoded to mono speech-quality AAC
+TRANSCODE_FORMAT = ('mp4', '.m4a')
+
+# ffmpeg stderr lines read when detecting silence
+DURATION_PATTERN = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+SILENCE_PATTERN = re.compile(r'silence_(start|end): (-?\d+(?:\.\d+)?)')
+
+class AudioExtractor:
+    def __init__(self, ffmpeg_path: str = None):
+        self.ffmpeg_path = ffmpeg_path or Config.FFMPEG_PATH
+        self._lock = threading.Lock()
+        # video path -> lock, so concurrent requests for one recording extract it once
+        self._path_locks = {}
+
+    def cache_paths(self, video_path: str) -> List[str]:
+        """Extracted audio files cached next to a recording"""
+        return [path for path in glob.glob(glob.escape(video_path) + '.audio.*') if not path.endswith('.tmp')]
+
+    def _path_lock(self, video_path: str) -> threading.Lock:
+        with self._lock:
+            lock = self._path_locks.get(video_path)
+            if lock is None:
+                lock = self._path_locks[video_path] = threading.Lock()
+            return lock
+
+    def _plans(self, video_path: str) -> List[Tuple[str, Dict]]:
+        """Extraction attempts in order of preference: (name, {args, muxer, extension})"""
+        probe = probe_media(video_path)
+        if probe is not None and not probe['audio_tracks']:
+            return []
+
+        plans = []
+        codec = probe['audio_tracks'][0]['codec'] if probe else None
+        if codec in COPY_FORMATS:
+            muxer, extension = COPY_FORMATS[codec]
+            plans.append(('copy', {'args': ['-c:a', 'copy'], 'muxer': muxer, 'extension': extension}))
+        muxer, extension = TRANSCODE_FORMAT
+        plans.append(('transcode', {
+            'args': ['-ac', '1', '-ar', '16000', '-c:a', 'aac', '-b:a', Config.AUDIO_EXTRACT_BITRATE],
+            'muxer': muxer,
+            'extension': extension
+        }))
+        return plans
+
+    def extract_audio(self, video_path: str) -> str:
+        """
+        Get a compact audio-only file for a recording
+
+        Input:
+            video_path (str): Path to the uploaded recording
+
+        Output:
+            str: Path to the extracted audio (cached as <video_path>.audio.<ext>), or
+                 video_path itself when ffmpeg is unavailable or extraction fails
+        """
+        if not Config.AUDIO_EXTRACTION_ENABLED:
+            return video_path
+
+        with self._path_lock(video_path):
+            cached = self.cache_paths(video_path)
+            if cached:
+                return cached[0]
+
+            if not shutil.which(self.ffmpeg_path):
+                return video_path
+
+            for name, plan in self._plans(video_path):
+                audio_path = f"{video_path}.audio{plan['extension']}"
+                # Keeping the original is better than a "compact" file that came out larger
+                if self._run_ffmpeg(video_path, plan, audio_path, max_size=os.path.getsize(video_path) - 1):
+                    return audio_path
+                print(f"Audio {name} failed for {video_path}")
+
+        return video_path
+
+    def detect_silences(self, audio_path: str) -> Optional[Dict]:
+        """
+        Find the silent stretches of a recording with ffmpeg's silencedetect filter
+
+        Input:
+            audio_path (str): Audio (or video) file
+
+        Output:
+            Optional[Dict]: duration (seconds, None if ffmpeg didn't report it) and
+                            silences [(start, end), ...], or None when ffmpeg is unavailable
+        """
+        if not shutil.which(self.ffmpeg_path):
+            return None
+
+        command = [
+            self.ffmpeg_path, '-nostdin', '-hide_banner', '-i', audio_path, '-map', '0:a:0', '-vn',
+            '-af', f"silencedetect=noise={Config.SILENCE_NOISE_DB}dB:d={Config.SILENCE_MIN_SECONDS}",
+            '-f', 'null', '-'
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, timeout=Config.AUDIO_EXTRACT_TIMEOUT)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"ffmpeg error: {e}")
+            return None
+        output = result.stderr.decode('utf-8', 'replace')
+        if result.returncode != 0:
+            print(f"ffmpeg error: {output.strip()[-500:]}")
+            return None
+
+        duration = None
+        match = DURATION_PATTERN.search(output)
+        if match:
+            hours, minutes, seconds = match.groups()
+            duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        silences = []
+        start = None
+        for kind, value in SILENCE_PATTERN.findall(output):
+            if kind == 'start':
+                start = max(float(value), 0.0)
+            elif start is not None:
+                silences.append((start, float(value)))
+                start = None
+        # Silence running to the end of the file has no silence_end line
+        if start is not None and duration:
+            silences.append((start, duration))
+
+        return {'duration': duration, 'silences': silences}
+
+    def cut_segment(self, audio_path: str, start: float, duration: float, segment_path: str) -> Optional[str]:
+        """
+        Write one time range of a recording as a standalone audio file
+
+        Input:
+            audio_path (str): Source audio (or video) file
+            start (float): Offset in seconds
+            duration (float): Length in seconds
+            segment_path (str): Output path without extension
+
+        Output:
+            Optional[str]: Path of the written segment, or None if ffmpeg failed
+        """
+        for name, plan in self._plans(audio_path):
+            output_path = segment_path + plan['extension']
+            if self._run_ffmpeg(audio_path, plan, output_path, input_args=['-ss', f"{start:.3f}", '-t', f"{duration:.3f}"]):
+                return output_path
+            print(f"Segment {name} failed for {audio_path} at {start:.1f}s")
+        return None
+
+    def _run_ffmpeg(self, input_path: str, plan: Dict, output_path: str, input_args: List[str] = (),
+                    max_size: int = None) -> bool:
+        """Run one extraction attempt into output_path; False if it failed or came out over max_size"""
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        command = [
+            self.ffmpeg_path, '-nostdin', '-y', '-loglevel', 'error',
+            *input_args, '-i', input_path, '-map', '0:a:0', '-vn', '-sn', '-dn',
+            *plan['args'], '-f', plan['muxer'], tmp_path
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, timeout=Config.AUDIO_EXTRACT_TIMEOUT)
+            if result.returncode != 0 or not os.path.getsize(tmp_path):
+                print(f"ffmpeg error: {result.stderr.decode('utf-8', 'replace').strip()[-500:]}")
+                return False
+            if max_size is not None and os.path.getsize(tmp_path) > max_size:
+                return False
+            os.replace(tmp_path, output_path)
+            return True
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"ffmpeg error: {e}")
+            return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+# Process-wide audio extractor
+audio_extractor = AudioExtractor()
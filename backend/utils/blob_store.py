@@ -0,0 +1,168 @@
+"""
+Blob store utility
+Stores large task artifacts (transcripts, blogs, posters) as compressed,
+content-addressed files so task records only carry a small reference.
+Blobs no longer referenced are removed by a mark-and-sweep from cleanup
+"""
+import os
+import json
+import time
+import zlib
+import hashlib
+import tempfile
+from typing import Callable, Dict, Optional, Set
+from config import Config
+
+class BlobStore:
+    def __init__(self, root: str = None):
+        self.root = root or Config.BLOB_FOLDER
+        os.makedirs(self.root, exist_ok=True)
+
+    def _blob_path(self, blob_id: str, extension: str = '.json.z') -> str:
+        """Fan blobs out over 256 subdirectories to keep directory listings small"""
+        return os.path.join(self.root, blob_id[:2], f"{blob_id}{extension}")
+
+    def put(self, payload: Dict) -> str:
+        """
+        Store a JSON-serializable payload
+
+        Input:
+            payload (Dict): Artifact to store
+
+        Output:
+            str: Blob id (sha256 of the canonical JSON), identical payloads share one blob
+        """
+        raw = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        return self._write(raw, '.json.z')
+
+    def put_bytes(self, data: bytes) -> str:
+        """
+        Store a binary payload (e.g. columnar transcript words)
+
+        Input:
+            data (bytes): Payload to store
+
+        Output:
+            str: Blob id (sha256 of the data)
+        """
+        return self._write(data, '.bin.z')
+
+    def _write(self, raw: bytes, extension: str) -> str:
+        blob_id = hashlib.sha256(raw).hexdigest()
+        blob_path = self._blob_path(blob_id, extension)
+
+        try:
+            # Already stored: refresh its age so a sweep running now leaves it alone
+            os.utime(blob_path)
+        except FileNotFoundError:
+            directory = os.path.dirname(blob_path)
+            os.makedirs(directory, exist_ok=True)
+            # Unique per writer: threads and processes may store the same blob at once
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{blob_id}.", suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(zlib.compress(raw, 6))
+                os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files
+                # Identical content, so whichever writer publishes last is as good as the first
+                os.replace(tmp_path, blob_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if not os.path.exists(blob_path):
+                    raise
+
+        return blob_id
+
+    def get(self, blob_id: str) -> Optional[Dict]:
+        """
+        Load a payload by blob id
+
+        Input:
+            blob_id (str): Id returned by put()
+
+        Output:
+            Optional[Dict]: Stored payload, or None if missing or unreadable
+        """
+        try:
+            with open(self._blob_path(blob_id), 'rb') as f:
+                return json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading blob {blob_id}: {e}")
+            return None
+
+    def get_bytes(self, blob_id: str) -> Optional[bytes]:
+        """
+        Load a binary payload stored with put_bytes
+
+        Output:
+            Optional[bytes]: Stored data, or None if missing or unreadable
+        """
+        try:
+            with open(self._blob_path(blob_id, '.bin.z'), 'rb') as f:
+                return zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading blob {blob_id}: {e}")
+            return None
+
+    def exists(self, blob_id: str) -> bool:
+        """Check whether a blob is stored"""
+        return os.path.exists(self._blob_path(blob_id))
+
+    def sweep(self, referenced: Callable[[], Set[str]], min_age: float = None) -> int:
+        """
+        Delete blobs that nothing references any more
+
+        Candidates are listed before the references are collected, and only blobs
+        untouched for min_age seconds are candidates, so a blob stored (or stored
+        again) while the sweep runs is never removed before its reference is saved.
+
+        Input:
+            referenced (Callable): Returns the ids of every blob still in use
+            min_age (float): Seconds since last write (defaults to BLOB_SWEEP_MIN_AGE)
+
+        Output:
+            int: Number of blobs removed
+        """
+        cutoff = time.time() - (Config.BLOB_SWEEP_MIN_AGE if min_age is None else min_age)
+        candidates = []
+        for directory in os.listdir(self.root):
+            directory = os.path.join(self.root, directory)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) >= cutoff:
+                        continue
+                    if name.endswith('.tmp'):
+                        # Left behind by a writer that crashed
+                        os.remove(path)
+                    elif name.endswith(('.json.z', '.bin.z')):
+                        candidates.append((name.split('.', 1)[0], path))
+                except FileNotFoundError:
+                    continue
+        if not candidates:
+            return 0
+
+        keep = referenced()
+        removed = 0
+        for blob_id, path in candidates:
+            if blob_id in keep:
+                continue
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Error deleting blob {blob_id}: {e}")
+        return removed
+
+# Process-wide blob store
+blob_store = BlobStore()
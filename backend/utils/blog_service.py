@@ -2,34 +2,56 @@
 Blog service utility
 Handles blog article generation from meeting transcripts using OpenAI
 """
+import json
 import time
-from typing import Dict
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from config import Config
 from .openai_service import OpenAIService
+from .meeting_extractor import extract_meeting_details
+from .file_manager import file_manager
+from .blob_store import blob_store
+from .transcript_chunker import chunk_transcript, estimate_tokens
+from .transcript_words import TranscriptWords
+
+# Part of the chunk summary cache key; bump when the summarization prompt changes
+CHUNK_SUMMARY_VERSION = 1
 
 class BlogService:
     def __init__(self):
         self.openai_service = OpenAIService()
     
-    def generate_blog_article(self, transcript: str, meeting_details: Dict) -> Dict:
+    def generate_blog_article(self, transcript: str, meeting_details: Dict,
+                              words: Optional[TranscriptWords] = None, content_hash: str = None) -> Dict:
         """
         Generate comprehensive blog article from meeting transcript
         
+        Transcripts longer than BLOG_SINGLE_PASS_TOKENS are split into chunks that are
+        summarized in parallel (map); the article is then written from the summaries (reduce).
+        
         Input:
             transcript (str): Meeting transcript text
             meeting_details (Dict): Meeting information including title, date, duration
+                                    (and insights, whose chapters guide the chunking)
+            words (TranscriptWords): Word timings, so chunks end between speaker turns
+            content_hash (str): sha256 of the recording; enables the per-chunk summary cache
             
         Output:
             Dict: Blog generation result with content and metadata
         """
         try:
-            # Generate blog using OpenAI service
-            blog_result = self.openai_service.generate_blog_article(transcript, meeting_details)
+            if estimate_tokens(transcript) <= Config.BLOG_SINGLE_PASS_TOKENS:
+                blog_result = self.openai_service.generate_blog_article(transcript, meeting_details)
+            else:
+                blog_result = self._generate_from_chunks(transcript, meeting_details, words, content_hash)
             
             if blog_result.get('success'):
                 return {
                     'success': True,
                     'blog_content': blog_result.get('blog_content'),
                     'word_count': blog_result.get('word_count', 0),
+                    'chunks': blog_result.get('chunks', 1),
                     'service': 'openai',
                     'generated_at': time.time()
                 }
@@ -45,6 +67,73 @@ class BlogService:
                 'error': str(e)
             }
     
+    def summarize_chunks(self, chunks: List[Dict], content_hash: str = None) -> List[Dict]:
+        """
+        Summarize transcript chunks concurrently, reusing summaries cached by earlier attempts
+        
+        Input:
+            chunks (List[Dict]): transcript_chunker.chunk_transcript output
+            content_hash (str): sha256 of the recording the cache is kept with
+            
+        Output:
+            List[Dict]: Per chunk, success and summary or error
+        """
+        results: List[Optional[Dict]] = [None] * len(chunks)
+        content = file_manager.get_content_data(content_hash)
+        artifacts = (content or {}).get('artifacts', {})
+        
+        pending = []
+        for chunk in chunks:
+            reference = artifacts.get(self._chunk_cache_key(chunk, len(chunks)))
+            cached = reference and blob_store.get(reference['blob_id'])
+            if cached:
+                results[chunk['index']] = {'success': True, 'summary': cached['summary'], 'cached': True}
+            else:
+                pending.append(chunk)
+        
+        def summarize(chunk):
+            try:
+                result = self.openai_service.summarize_transcript_chunk(chunk['text'], chunk['index'], len(chunks))
+                # Stored as soon as it succeeds, so a retry after any failure only redoes the failed chunks
+                if result.get('success') and content_hash and not result.get('mock'):
+                    file_manager.update_content_data(content_hash, {}, {
+                        self._chunk_cache_key(chunk, len(chunks)): {'blob_id': blob_store.put({'summary': result['summary']})}
+                    })
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            results[chunk['index']] = result
+        
+        if pending:
+            workers = max(1, min(Config.BLOG_SUMMARY_CONCURRENCY, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='blog-chunks') as pool:
+                list(pool.map(summarize, pending))
+        return results
+    
+    def _generate_from_chunks(self, transcript: str, meeting_details: Dict,
+                              words: Optional[TranscriptWords], content_hash: str) -> Dict:
+        """Map-reduce article generation for transcripts too long for one prompt"""
+        chapters = (meeting_details.get('insights') or {}).get('chapters') or []
+        chunks = chunk_transcript(transcript, words, chapters, Config.BLOG_CHUNK_TOKENS)
+        summaries = self.summarize_chunks(chunks, content_hash)
+        
+        failed = [result for result in summaries if not result.get('success')]
+        if failed:
+            return {
+                'success': False,
+                'error': f"{len(failed)} of {len(chunks)} transcript sections could not be summarized: {failed[0].get('error', 'Unknown error')}"
+            }
+        
+        blog_result = self.openai_service.generate_blog_article(
+            transcript, meeting_details, [result['summary'] for result in summaries]
+        )
+        blog_result['chunks'] = len(chunks)
+        return blog_result
+    
+    def _chunk_cache_key(self, chunk: Dict, count: int) -> str:
+        """Content-index artifact name for the summary of a chunk"""
+        canonical = json.dumps([CHUNK_SUMMARY_VERSION, chunk['index'], count, chunk['text']], separators=(',', ':'))
+        return f"blog_chunk:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]}"
+    
     def generate_blog_summary(self, transcript: str, meeting_details: Dict) -> Dict:
         """
         Generate a shorter blog summary from meeting transcript
@@ -121,41 +210,9 @@ class BlogService:
             if not transcript:
                 return key_points
             
-            # Extract main topics
-            lines = transcript.split('.')
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['discuss', 'review', 'plan', 'strategy', 'budget']):
-                    key_points['main_topics'].append(line.capitalize())
-            
-            # Extract decisions (simple heuristic)
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['decide', 'decision', 'agree', 'approve', 'vote']):
-                    key_points['decisions'].append(line.capitalize())
-            
-            # Extract action items
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['action', 'task', 'todo', 'follow up', 'next step']):
-                    key_points['action_items'].append(line.capitalize())
-            
-            # Extract insights
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['insight', 'learn', 'discover', 'find', 'realize']):
-                    key_points['insights'].append(line.capitalize())
-            
-            # Extract participants
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['i am', 'my name is', 'this is']):
-                    words = line.split()
-                    for i, word in enumerate(words):
-                        if word in ['am', 'is'] and i + 1 < len(words):
-                            name = words[i + 1].title()
-                            if name not in key_points['participants']:
-                                key_points['participants'].append(name)
+            details = extract_meeting_details(transcript)
+            for field in key_points:
+                key_points[field] = details[field]
             
             return key_points
             
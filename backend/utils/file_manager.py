@@ -1,18 +1,86 @@
 import os
+import copy
 import json
 import uuid
+import heapq
+import atexit
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+from config import Config
+from db import db_manager
+from .blob_store import blob_store
+from .media_probe import probe_media
+from .audio_extractor import audio_extractor
+from .media_store import media_store
+from .search_index import search_index
+from .upload_manager import upload_manager
+
+try:
+    import fcntl
+except ImportError:  # Windows: multi-process mode is unavailable
+    fcntl = None
+
+# Statuses that end a task; progress for these is written through immediately
+TERMINAL_STATUSES = {'completed', 'failed', 'error'}
+
+# Fields of task and content-index records that hold a blob id
+BLOB_REFERENCE_KEYS = ('blob_id', 'words_blob')
 
 class FileManager:
     def __init__(self):
         self.tasks_file = 'tasks.json'
+        self.journal_file = 'tasks.journal'
+        self.lock_file = 'tasks.lock'
         self.files_file = 'files.json'
-        self.load_tasks()
-        self.load_files()
+        # _lock guards the tasks dict and the journal handle; per-task locks serialize
+        # read-modify-write of a single task so unrelated tasks never wait on each other
+        self._lock = threading.RLock()
+        self._task_locks = {}
+        self._journal = None
+        self._journal_records = 0
+        self._compact_event = threading.Event()
+        # Write-behind buffer for update_task_status: file_id -> fields not yet persisted
+        self._pending_progress = {}
+        self._flush_event = threading.Event()
+        # Incrementally maintained stats and expiry index for the local backend:
+        # file_id -> (status, size_mb, created_at, timestamp), plus a heap of
+        # (timestamp, file_id) with lazy deletion of stale entries
+        self._task_index = {}
+        self._status_counts = {}
+        self._total_size_mb = 0.0
+        self._expiry_heap = []
+        # Multi-process mode: writers serialize on an flock'd lock file and every access
+        # first tails records other processes appended since _journal_offset
+        # STORAGE_BACKEND=sqlite keeps tasks in indexed tables instead of tasks.json
+        # (SQLite handles cross-process locking itself, so the lock file is not used)
+        self.db = db_manager if Config.STORAGE_BACKEND == 'sqlite' else None
+        self.multiprocess = Config.TASK_STORE_MULTIPROCESS and not self.db
+        if self.multiprocess and fcntl is None:
+            print("TASK_STORE_MULTIPROCESS requires fcntl, falling back to single-process mode")
+            self.multiprocess = False
+        self._lock_fd = None
+        self._store_lock_depth = 0
+        self._journal_offset = 0
+        self._disk_signature = None
+        if self.db:
+            self.tasks = {}
+            self.files = {}
+        else:
+            if self.multiprocess:
+                self.tasks = {}
+                self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                self._refresh()
+            else:
+                self.load_tasks()
+            self.load_files()
+            self._start_compactor()
+        self._start_progress_flusher()
+        atexit.register(self.flush_progress)
     
     def load_tasks(self):
-        """Load tasks from JSON file"""
+        """Load tasks from the JSON snapshot and replay the journal on top of it"""
         try:
             if os.path.exists(self.tasks_file):
                 with open(self.tasks_file, 'r') as f:
@@ -22,6 +90,152 @@ class FileManager:
         except Exception as e:
             print(f"Error loading tasks: {e}")
             self.tasks = {}
+        
+        self._rebuild_index()
+        
+        # A journal left behind by an interrupted compaction is older than the live one
+        self._journal_records = 0
+        self._replay_journal(self.journal_file + '.compacting')
+        self._journal_offset = self._replay_journal(self.journal_file)
+    
+    def _replay_journal(self, journal_path: str, offset: int = 0) -> int:
+        """Apply journal records from offset onwards, returns the offset after the last good record"""
+        if not os.path.exists(journal_path):
+            return 0
+        
+        good_offset = offset
+        try:
+            with open(journal_path, 'rb+') as f:
+                f.seek(offset)
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash mid-append; drop it so new records start on a clean line
+                        f.truncate(good_offset)
+                        break
+                    self._apply_record(record)
+                    good_offset += len(line)
+                    self._journal_records += 1
+        except Exception as e:
+            print(f"Error replaying journal {journal_path}: {e}")
+        return good_offset
+    
+    def _stat_signature(self, path: str):
+        """Identity of a file on disk, or None if it doesn't exist"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+    
+    def _sync_from_disk(self):
+        """
+        Catch up with writes made by other processes (caller holds the store lock)
+        
+        New journal records are tailed from the last consumed offset. Only a compaction,
+        which replaces the snapshot or rotates the journal, forces a full reload.
+        """
+        snapshot_signature = self._stat_signature(self.tasks_file)
+        journal_signature = self._stat_signature(self.journal_file)
+        journal_inode = journal_signature[0] if journal_signature else None
+        
+        previous = self._disk_signature
+        rotated = previous is not None and previous[1] is not None and previous[1] != journal_inode
+        if previous is None or previous[0] != snapshot_signature or rotated:
+            self._close_journal()
+            self.load_tasks()
+            # Progress buffered in this process isn't on disk yet, keep serving it
+            for file_id, fields in self._pending_progress.items():
+                if file_id in self.tasks:
+                    self.tasks[file_id].update(fields)
+                    self._reindex_task(file_id)
+        elif journal_inode is not None:
+            self._journal_offset = self._replay_journal(self.journal_file, self._journal_offset)
+        
+        self._disk_signature = (snapshot_signature, journal_inode)
+    
+    @contextmanager
+    def _store_guard(self):
+        """
+        Hold the cross-process store lock and sync with disk (caller holds _lock)
+        
+        Re-entrant within a process; a no-op unless TASK_STORE_MULTIPROCESS is enabled.
+        """
+        if not self.multiprocess or self._store_lock_depth:
+            self._store_lock_depth += 1
+            try:
+                yield
+            finally:
+                self._store_lock_depth -= 1
+            return
+        
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        self._store_lock_depth += 1
+        try:
+            self._sync_from_disk()
+            yield
+        finally:
+            self._store_lock_depth -= 1
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+    
+    def _refresh(self):
+        """Pick up other processes' writes before serving a read"""
+        if self.multiprocess:
+            with self._lock, self._store_guard():
+                pass
+    
+    def _apply_record(self, record: Dict):
+        """Apply a single journal record to the in-memory tasks"""
+        op = record.get('op')
+        file_id = record.get('id')
+        if op == 'put':
+            self.tasks[file_id] = record.get('data', {})
+        elif op == 'patch':
+            if file_id in self.tasks:
+                self.tasks[file_id].update(record.get('fields', {}))
+        elif op == 'delete':
+            self.tasks.pop(file_id, None)
+        self._reindex_task(file_id)
+    
+    def _rebuild_index(self):
+        """Rebuild stats and the expiry index from scratch (used after loading a snapshot)"""
+        self._task_index = {}
+        self._status_counts = {}
+        self._total_size_mb = 0.0
+        self._expiry_heap = []
+        for file_id in list(self.tasks):
+            self._reindex_task(file_id)
+    
+    def _reindex_task(self, file_id: str):
+        """Fold one task's change into the stats and expiry index (caller holds the lock)"""
+        previous = self._task_index.pop(file_id, None)
+        if previous:
+            status, size_mb, _, _ = previous
+            self._status_counts[status] -= 1
+            if not self._status_counts[status]:
+                del self._status_counts[status]
+            self._total_size_mb -= size_mb
+        
+        task_data = self.tasks.get(file_id)
+        if task_data is None:
+            return
+        
+        status = task_data.get('status', 'unknown')
+        size_mb = (task_data.get('video_info') or {}).get('file_size_mb', 0) or 0
+        created_at = self._task_created_at(task_data)
+        if previous and previous[2] == created_at:
+            timestamp = previous[3]
+        else:
+            try:
+                timestamp = datetime.fromisoformat(created_at).timestamp()
+            except (TypeError, ValueError):
+                timestamp = 0
+            heapq.heappush(self._expiry_heap, (timestamp, file_id))
+        
+        self._task_index[file_id] = (status, size_mb, created_at, timestamp)
+        self._status_counts[status] = self._status_counts.get(status, 0) + 1
+        self._total_size_mb += size_mb
     
     def load_files(self):
         """Load files metadata from JSON file"""
@@ -36,13 +250,75 @@ class FileManager:
             self.files = {}
     
     def save_tasks(self):
-        """Save tasks to JSON file"""
+        """Compact the journal into a fresh JSON snapshot"""
         try:
-            with open(self.tasks_file, 'w') as f:
-                json.dump(self.tasks, f, indent=2)
+            with self._lock, self._store_guard():
+                snapshot = json.dumps(self.tasks, indent=2)
+                # Rotate the journal so writers keep appending while the snapshot is written
+                self._close_journal()
+                if os.path.exists(self.journal_file):
+                    os.replace(self.journal_file, self.journal_file + '.compacting')
+                self._journal_records = 0
+                self._journal_offset = 0
+                if self.multiprocess:
+                    # Another process may compact next; finish before releasing the store lock
+                    # so rotations never interleave
+                    self._write_snapshot(snapshot)
+                    return
+            self._write_snapshot(snapshot)
         except Exception as e:
             print(f"Error saving tasks: {e}")
     
+    def _write_snapshot(self, snapshot: str):
+        """Atomically replace the snapshot and drop the journal it supersedes"""
+        tmp_file = self.tasks_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.tasks_file)
+        
+        if os.path.exists(self.journal_file + '.compacting'):
+            os.remove(self.journal_file + '.compacting')
+    
+    def _append_journal(self, record: Dict):
+        """Append one mutation record to the journal (caller holds the lock)"""
+        try:
+            with self._store_guard():
+                if self._journal is None:
+                    self._journal = open(self.journal_file, 'a')
+                self._journal.write(json.dumps(record) + '\n')
+                self._journal.flush()
+                self._journal_offset = self._journal.tell()
+            self._journal_records += 1
+            if self._journal_records >= Config.TASK_JOURNAL_COMPACT_THRESHOLD:
+                self._compact_event.set()
+        except Exception as e:
+            print(f"Error writing task journal: {e}")
+    
+    def _close_journal(self):
+        """Close the journal append handle"""
+        if self._journal is not None:
+            try:
+                self._journal.close()
+            except Exception as e:
+                print(f"Error closing task journal: {e}")
+            self._journal = None
+    
+    def _start_compactor(self):
+        """Start the background thread that folds the journal into the snapshot"""
+        thread = threading.Thread(target=self._compactor_loop, name='task-journal-compactor')
+        thread.daemon = True
+        thread.start()
+    
+    def _compactor_loop(self):
+        """Compact when the journal crosses its size threshold or on a fixed interval"""
+        while True:
+            self._compact_event.wait(Config.TASK_JOURNAL_COMPACT_INTERVAL)
+            self._compact_event.clear()
+            if self._journal_records:
+                self.save_tasks()
+    
     def save_files(self):
         """Save files metadata to JSON file"""
         try:
@@ -59,46 +335,320 @@ class FileManager:
     
     def save_file_data(self, file_id: str, file_data: Dict):
         """Save file metadata"""
+        if self.db:
+            self.db.put_file(file_id, file_data)
+            return
         self.files[file_id] = file_data
         self.save_files()
     
     def get_file_data(self, file_id: str) -> Optional[Dict]:
         """Get file metadata"""
+        if self.db:
+            return self.db.get_file(file_id)
         return self.files.get(file_id)
     
+    def get_content_data(self, content_hash: str) -> Optional[Dict]:
+        """
+        Get the content index entry for an uploaded recording
+        
+        Input:
+            content_hash (str): sha256 of the media
+            
+        Output:
+            Optional[Dict]: media_path, size and the artifacts computed for this content
+        """
+        if not content_hash:
+            return None
+        if self.db:
+            return self.db.get_file(content_hash)
+        with self._lock, self._store_guard():
+            if self.multiprocess:
+                self.load_files()
+            return copy.deepcopy(self.files.get(content_hash))
+    
+    def update_content_data(self, content_hash: str, updates: Dict, artifacts: Dict = None):
+        """
+        Merge fields into the content index entry, creating it if needed
+        
+        Input:
+            content_hash (str): sha256 of the media
+            updates (Dict): Top-level fields to set
+            artifacts (Dict): Artifact references to add, by name
+        """
+        def merge(entry):
+            entry = copy.deepcopy(entry) or {}
+            entry.update(copy.deepcopy(updates))
+            entry.setdefault('artifacts', {}).update(copy.deepcopy(artifacts or {}))
+            return entry
+        
+        with self._lock:
+            if self.db:
+                self.db.put_file(content_hash, merge(self.db.get_file(content_hash)))
+                return
+            with self._store_guard():
+                if self.multiprocess:
+                    self.load_files()
+                self.files[content_hash] = merge(self.files.get(content_hash))
+                self.save_files()
+    
+    def reuse_content_artifact(self, file_id: str, task_data: Dict, name: str) -> Optional[Dict]:
+        """
+        Link an artifact already computed for the same content onto this task
+        
+        Input:
+            file_id (str): Task identifier
+            task_data (Dict): Task record (must carry content_hash)
+            name (str): Artifact name (e.g. 'transcript')
+            
+        Output:
+            Optional[Dict]: The full artifact, or None if nothing reusable was found
+        """
+        content = self.get_content_data(task_data.get('content_hash'))
+        reference = content and content.get('artifacts', {}).get(name)
+        if not reference:
+            return None
+        payload = blob_store.get(reference['blob_id'])
+        if payload is None or not self.update_task_data(file_id, {name: reference}):
+            return None
+        return payload
+    
+    def _task_lock(self, file_id: str) -> threading.RLock:
+        """Get the lock serializing updates to a single task"""
+        with self._lock:
+            lock = self._task_locks.get(file_id)
+            if lock is None:
+                lock = self._task_locks[file_id] = threading.RLock()
+            return lock
+    
     def save_task_data(self, file_id: str, task_data: Dict):
-        """Save task data for a file"""
-        self.tasks[file_id] = task_data
-        self.save_tasks()
+        """Save task data for a file (replaces the whole record)"""
+        # Store a private copy so later mutations by the caller can't leak into the store
+        task_data = copy.deepcopy(task_data)
+        # One task-lock hold: progress buffered after the pop can't be flushed over this record
+        with self._task_lock(file_id):
+            # The full record supersedes any buffered progress for this task
+            with self._lock:
+                self._pending_progress.pop(file_id, None)
+            if self.db:
+                self.db.put_task(file_id, task_data)
+                return
+            with self._lock, self._store_guard():
+                self.tasks[file_id] = task_data
+                self._reindex_task(file_id)
+                self._append_journal({'op': 'put', 'id': file_id, 'data': task_data})
+    
+    def update_task_data(self, file_id: str, updates: Dict) -> bool:
+        """
+        Merge top-level fields into an existing task without touching the rest of the record
+        
+        Input:
+            file_id (str): Task identifier
+            updates (Dict): Fields to set on the task
+            
+        Output:
+            bool: True if the task exists and was updated
+        """
+        updates = copy.deepcopy(updates)
+        with self._task_lock(file_id):
+            # Persist buffered progress first so it can't land on top of these fields later
+            self._flush_task_progress(file_id)
+            if self.db:
+                return self.db.update_task_fields(file_id, updates)
+            with self._lock, self._store_guard():
+                if file_id not in self.tasks:
+                    return False
+                self.tasks[file_id].update(updates)
+                self._reindex_task(file_id)
+                self._append_journal({'op': 'patch', 'id': file_id, 'fields': updates})
+                return True
     
     def get_task_data(self, file_id: str) -> Optional[Dict]:
-        """Get task data for a file"""
-        return self.tasks.get(file_id)
+        """Get a snapshot copy of the task data for a file"""
+        if self.db:
+            task_data = self.db.get_task(file_id)
+            with self._lock:
+                pending = self._pending_progress.get(file_id)
+                if task_data and pending:
+                    task_data.update(pending)
+            return task_data
+        self._refresh()
+        if file_id not in self.tasks:
+            return None
+        with self._task_lock(file_id):
+            return copy.deepcopy(self.tasks.get(file_id))
+    
+    def update_task_data_if(self, file_id: str, updates: Dict, predicate: Callable[[Dict], bool]) -> bool:
+        """
+        Compare-and-set: merge fields into a task only if predicate(current task) holds
+        
+        Input:
+            file_id (str): Task identifier
+            updates (Dict): Fields to set on the task
+            predicate (Callable): Receives the current task data, return True to apply
+            
+        Output:
+            bool: True if the update was applied
+        """
+        updates = copy.deepcopy(updates)
+        with self._task_lock(file_id):
+            self._flush_task_progress(file_id)
+            if self.db:
+                return self.db.update_task_fields_if(file_id, updates, predicate)
+            with self._lock, self._store_guard():
+                task_data = self.tasks.get(file_id)
+                if task_data is None or not predicate(task_data):
+                    return False
+                task_data.update(updates)
+                self._reindex_task(file_id)
+                self._append_journal({'op': 'patch', 'id': file_id, 'fields': updates})
+                return True
+    
+    def save_artifact(self, file_id: str, name: str, payload: Dict, summary_fields: tuple = (),
+                      content_hash: str = None) -> Optional[Dict]:
+        """
+        Store a large artifact in the blob store and reference it from the task
+        
+        Input:
+            file_id (str): Task identifier
+            name (str): Task field holding the reference (e.g. 'transcript', 'blog')
+            payload (Dict): Full artifact
+            summary_fields (tuple): Small payload fields copied into the reference
+            content_hash (str): Media hash of the task; the artifact is also recorded
+                                there so later uploads of the same content can reuse it
+            
+        Output:
+            Optional[Dict]: The reference saved on the task, or None if the task is missing
+        """
+        reference = {'blob_id': blob_store.put(payload)}
+        for field in summary_fields:
+            if field in payload:
+                reference[field] = payload[field]
+        
+        if not self.update_task_data(file_id, {name: reference}):
+            return None
+        if content_hash:
+            self.update_content_data(content_hash, {}, {name: reference})
+        return reference
+    
+    def load_artifact(self, task_data: Dict, name: str) -> Optional[Dict]:
+        """
+        Load the full artifact referenced by a task field
+        
+        Input:
+            task_data (Dict): Task record
+            name (str): Task field holding the reference
+            
+        Output:
+            Optional[Dict]: Full artifact, or None if absent
+        """
+        reference = task_data.get(name)
+        if not reference:
+            return None
+        if 'blob_id' not in reference:
+            # Records written before artifacts moved to the blob store hold the payload inline
+            return reference
+        return blob_store.get(reference['blob_id'])
     
     def get_all_tasks(self) -> List[Dict]:
-        """Get all tasks"""
-        return list(self.tasks.values())
+        """Get snapshot copies of all tasks"""
+        if self.db:
+            self.flush_progress()
+            return self.db.get_all_tasks()
+        self._refresh()
+        with self._lock:
+            return copy.deepcopy(list(self.tasks.values()))
     
     def update_task_status(self, file_id: str, status: str, progress: int = 0, message: str = ""):
-        """Update task status"""
-        if file_id in self.tasks:
-            self.tasks[file_id]['status'] = status
-            self.tasks[file_id]['progress'] = progress
-            self.tasks[file_id]['message'] = message
-            self.tasks[file_id]['last_updated'] = datetime.now().isoformat()
-            self.save_tasks()
+        """
+        Update task status
+        
+        Readers see the new values immediately; persistence is batched by the progress
+        flusher (PROGRESS_FLUSH_INTERVAL / PROGRESS_FLUSH_MAX_DIRTY) except for terminal
+        statuses, which are written through.
+        """
+        fields = {
+            'status': status,
+            'progress': progress,
+            'message': message,
+            'last_updated': datetime.now().isoformat()
+        }
+        with self._task_lock(file_id):
+            with self._lock, self._store_guard():
+                if not self.db:
+                    if file_id not in self.tasks:
+                        return
+                    self.tasks[file_id].update(fields)
+                    self._reindex_task(file_id)
+                self._pending_progress.setdefault(file_id, {}).update(fields)
+                dirty = len(self._pending_progress)
+            
+            if status in TERMINAL_STATUSES:
+                self._flush_task_progress(file_id)
+                return
+        
+        if dirty >= Config.PROGRESS_FLUSH_MAX_DIRTY:
+            self._flush_event.set()
+    
+    def _flush_task_progress(self, file_id: str):
+        """Persist buffered progress for one task (caller holds the task lock)"""
+        if self.db:
+            with self._lock:
+                fields = self._pending_progress.pop(file_id, None)
+            if fields:
+                self.db.update_task_fields(file_id, fields)
+            return
+        
+        # Sync before popping: a reload after another process compacted re-applies only
+        # progress that is still buffered
+        with self._lock, self._store_guard():
+            fields = self._pending_progress.pop(file_id, None)
+            if fields and file_id in self.tasks:
+                self.tasks[file_id].update(fields)
+                self._reindex_task(file_id)
+                self._append_journal({'op': 'patch', 'id': file_id, 'fields': fields})
+    
+    def flush_progress(self):
+        """Persist all buffered progress updates"""
+        with self._lock:
+            file_ids = list(self._pending_progress)
+        for file_id in file_ids:
+            try:
+                with self._task_lock(file_id):
+                    self._flush_task_progress(file_id)
+            except Exception as e:
+                print(f"Error flushing progress for {file_id}: {e}")
+    
+    def _start_progress_flusher(self):
+        """Start the background thread that batches progress writes"""
+        thread = threading.Thread(target=self._progress_flusher_loop, name='task-progress-flusher')
+        thread.daemon = True
+        thread.start()
+    
+    def _progress_flusher_loop(self):
+        """Flush buffered progress on a fixed interval or when too many tasks are dirty"""
+        while True:
+            self._flush_event.wait(Config.PROGRESS_FLUSH_INTERVAL)
+            self._flush_event.clear()
+            self.flush_progress()
     
     def get_video_info(self, file_path: str) -> Dict:
-        """Get video file information (mock implementation for now)"""
+        """Get video file information from the container headers (see media_probe)"""
         try:
             file_size = os.path.getsize(file_path)
             file_size_mb = round(file_size / (1024 * 1024), 2)
             
-            # Mock video info - in real implementation, you'd use ffprobe or similar
+            probe = probe_media(file_path) or {}
+            duration_ms = probe.get('duration_ms')
+            width, height = probe.get('width'), probe.get('height')
             video_info = {
                 'file_size_mb': file_size_mb,
-                'duration': '00:05:30',  # Mock duration
-                'resolution': '1920x1080',  # Mock resolution
+                'duration': self._format_duration(duration_ms),
+                'duration_ms': duration_ms,
+                'resolution': f"{width}x{height}" if width and height else 'Unknown',
+                'width': width,
+                'height': height,
+                'video_codec': probe.get('video_codec'),
+                'audio_tracks': probe.get('audio_tracks', []),
                 'format': os.path.splitext(file_path)[1][1:].upper(),
                 'upload_time': datetime.now().isoformat()
             }
@@ -110,32 +660,45 @@ class FileManager:
             return {
                 'file_size_mb': 0,
                 'duration': '00:00:00',
+                'duration_ms': None,
                 'resolution': 'Unknown',
                 'format': 'Unknown',
                 'upload_time': datetime.now().isoformat()
             }
     
+    def _format_duration(self, duration_ms: Optional[int]) -> str:
+        """Milliseconds as HH:MM:SS ('00:00:00' when unknown)"""
+        seconds = (duration_ms or 0) // 1000
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    
     def cleanup_old_files(self, days_old: int = 7):
         """Clean up old files and tasks"""
         cutoff_date = datetime.now().timestamp() - (days_old * 24 * 60 * 60)
         
-        files_to_delete = []
-        for file_id, task_data in self.tasks.items():
-            upload_time = datetime.fromisoformat(task_data.get('upload_time', '1970-01-01'))
-            if upload_time.timestamp() < cutoff_date:
-                files_to_delete.append(file_id)
+        if self.db:
+            expired = self.db.get_tasks_created_before(datetime.fromtimestamp(cutoff_date).isoformat())
+        else:
+            # Pop only the tasks that are due; entries whose task changed or vanished are stale
+            expired = {}
+            self._refresh()
+            with self._lock:
+                while self._expiry_heap and self._expiry_heap[0][0] < cutoff_date:
+                    timestamp, file_id = heapq.heappop(self._expiry_heap)
+                    entry = self._task_index.get(file_id)
+                    if entry and entry[3] == timestamp:
+                        expired[file_id] = copy.deepcopy(self.tasks[file_id])
         
-        for file_id in files_to_delete:
-            # Delete file
-            file_path = self.tasks[file_id].get('file_path')
-            if file_path and os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    print(f"Error deleting file {file_path}: {e}")
+        media_paths = set()
+        for file_id, task_data in expired.items():
+            # Delete file (deduplicated media is shared, so it is removed below once unreferenced)
+            file_path = task_data.get('file_path')
+            if task_data.get('content_hash'):
+                media_paths.add(file_path)
+            elif file_path:
+                self._remove_media(file_path)
             
             # Delete reel if exists
-            reel_path = self.tasks[file_id].get('reel_path')
+            reel_path = task_data.get('reel_path')
             if reel_path and os.path.exists(reel_path):
                 try:
                     os.remove(reel_path)
@@ -143,23 +706,93 @@ class FileManager:
                     print(f"Error deleting reel {reel_path}: {e}")
             
             # Remove from tasks
-            del self.tasks[file_id]
+            if self.db:
+                self.db.delete_task(file_id)
+                continue
+            with self._task_lock(file_id), self._lock, self._store_guard():
+                self._pending_progress.pop(file_id, None)
+                self.tasks.pop(file_id, None)
+                self._reindex_task(file_id)
+                self._task_locks.pop(file_id, None)
+                self._append_journal({'op': 'delete', 'id': file_id})
+        
+        if media_paths:
+            # A concurrent upload of the same content either claims the file before
+            # this check or stores it again after the delete
+            with media_store.removal_guard() as claimed:
+                media_paths -= claimed
+                media_paths -= {task_data.get('file_path') for task_data in self.get_all_tasks()}
+                for file_path in media_paths:
+                    if file_path:
+                        self._remove_media(file_path)
+        
+        try:
+            search_index.remove_documents(list(expired))
+        except Exception as e:
+            print(f"Error removing tasks from search index: {e}")
+        
+        try:
+            upload_manager.expire_stale_uploads()
+        except Exception as e:
+            print(f"Error expiring partial uploads: {e}")
+        
+        try:
+            blob_store.sweep(self._referenced_blobs)
+        except Exception as e:
+            print(f"Error sweeping unreferenced blobs: {e}")
         
-        self.save_tasks()
-        return len(files_to_delete)
+        return len(expired)
+    
+    def _referenced_blobs(self) -> set:
+        """Ids of every blob referenced by a task or a content-index entry"""
+        referenced = set()
+        
+        def mark(value):
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    if key in BLOB_REFERENCE_KEYS and isinstance(item, str):
+                        referenced.add(item)
+                    else:
+                        mark(item)
+            elif isinstance(value, list):
+                for item in value:
+                    mark(item)
+        
+        mark(self.get_all_tasks())
+        if self.db:
+            mark(self.db.get_all_files())
+        else:
+            with self._lock, self._store_guard():
+                if self.multiprocess:
+                    self.load_files()
+                mark(self.files)
+        return referenced
+    
+    def _remove_media(self, file_path: str):
+        """Delete an uploaded recording and the audio extracted from it"""
+        for path in [file_path] + audio_extractor.cache_paths(file_path):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    print(f"Error deleting file {path}: {e}")
+    
+    def _task_created_at(self, task_data: Dict) -> str:
+        """Timestamp used for task expiry, tasks created by upload only carry created_at"""
+        return task_data.get('upload_time') or task_data.get('created_at') or '1970-01-01'
     
     def get_file_stats(self) -> Dict:
-        """Get file storage statistics"""
-        total_files = len(self.tasks)
-        total_size_mb = sum(task.get('video_info', {}).get('file_size_mb', 0) for task in self.tasks.values())
-        
-        status_counts = {}
-        for task in self.tasks.values():
-            status = task.get('status', 'unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
-        return {
-            'total_files': total_files,
-            'total_size_mb': round(total_size_mb, 2),
-            'status_counts': status_counts
-        } 
\ No newline at end of file
+        """Get file storage statistics (O(1) from the incrementally maintained counters)"""
+        if self.db:
+            return self.db.get_task_stats()
+        
+        self._refresh()
+        with self._lock:
+            return {
+                'total_files': len(self._task_index),
+                'total_size_mb': round(self._total_size_mb, 2),
+                'status_counts': dict(self._status_counts)
+            }
+
+# Process-wide task store shared by request handlers and background workers
+file_manager = FileManager()
@@ -0,0 +1,94 @@
+"""
+HTTP client utility
+One pooled keep-alive session per external provider, with default
+connect/read timeouts and jittered retries for idempotent requests
+"""
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict
+from config import Config
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HTTPClient:
+    def __init__(self, provider: str, connect_timeout: float = None, read_timeout: float = None,
+                 max_retries: int = None, pool_size: int = None):
+        self.provider = provider
+        self.timeout = (
+            connect_timeout or Config.HTTP_CONNECT_TIMEOUT,
+            read_timeout or Config.HTTP_READ_TIMEOUT
+        )
+        self.max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+
+        # Retries are handled in request() so they can be jittered and limited to idempotent calls
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or Config.HTTP_POOL_SIZE, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, retry: bool = None, **kwargs) -> requests.Response:
+        """
+        Send a request over the provider's pooled session
+
+        Input:
+            method (str): HTTP method
+            url (str): Request URL
+            retry (bool): Retry on connection errors and 429/5xx; defaults to True for idempotent methods
+            **kwargs: Passed to requests (timeout defaults to the client's connect/read timeouts)
+
+        Output:
+            requests.Response: Final response (callers still call raise_for_status)
+        """
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        kwargs.setdefault('timeout', self.timeout)
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not retry or attempt >= self.max_retries:
+                    raise
+            else:
+                if not retry or attempt >= self.max_retries or response.status_code not in RETRY_STATUSES:
+                    return response
+                response.close()
+
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff so retrying clients don't stampede together"""
+        ceiling = min(Config.HTTP_RETRY_BACKOFF_MAX, Config.HTTP_RETRY_BACKOFF * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+_clients: Dict[str, HTTPClient] = {}
+_clients_lock = threading.Lock()
+
+def get_http_client(provider: str) -> HTTPClient:
+    """
+    Get the shared client for a provider, creating it on first use
+
+    Input:
+        provider (str): Provider name (e.g. 'openai', 'assemblyai')
+
+    Output:
+        HTTPClient: Process-wide client with its own connection pool
+    """
+    with _clients_lock:
+        client = _clients.get(provider)
+        if client is None:
+            client = _clients[provider] = HTTPClient(provider)
+        return client
@@ -0,0 +1,460 @@
+"""
+Job executor utility
+Runs background jobs on a bounded worker pool with a priority queue,
+admission control, per-job timing metrics and graceful drain on shutdown.
+Durable jobs are also persisted on their task with a lease so they survive restarts.
+A job that returns a Future (e.g. waiting on a provider) frees its worker and
+finishes when the Future resolves.
+"""
+import os
+import copy
+import time
+import uuid
+import atexit
+import socket
+import itertools
+import threading
+from queue import PriorityQueue, Empty
+from concurrent.futures import Future
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from config import Config
+from .file_manager import file_manager
+
+# Lower value runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+# Finished job records kept for metrics lookups
+MAX_JOB_HISTORY = 1000
+
+# Durable job records live on their task under this prefix plus the job name
+JOB_KEY_PREFIX = 'job_'
+ACTIVE_JOB_STATES = ('queued', 'running')
+
+def job_key(name: str) -> str:
+    """Task field holding the durable record for a job kind"""
+    return f"{JOB_KEY_PREFIX}{name}"
+
+class JobExecutor:
+    def __init__(self, max_workers: int = None, max_queue_size: int = None):
+        self.max_workers = max_workers or Config.THREAD_POOL_SIZE
+        self.max_queue_size = Config.JOB_QUEUE_MAX_SIZE if max_queue_size is None else max_queue_size
+        self._queue = PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._jobs = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        # Jobs that returned a Future: still running, but not holding a worker
+        self._waiting = 0
+        self._accepting = True
+        self._workers = []
+        self._totals = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+        # Durable jobs: handlers by job name, and records this process holds a lease on
+        self._handlers = {}
+        self._give_up_handlers = {}
+        self._leased = {}
+        # Per-job locks so a record's copies are written in the order they were taken
+        self._persist_locks = {}
+        self._lease_thread = None
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _ensure_workers(self):
+        """Start worker threads lazily, up to max_workers (caller holds the lock)"""
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._worker_loop, name=f'job-worker-{len(self._workers) + 1}')
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, name: str, fn: Callable, *args, priority: int = PRIORITY_NORMAL,
+               job_id: str = None, bypass_admission: bool = False, **kwargs) -> Dict:
+        """
+        Submit a job for background execution
+
+        Input:
+            name (str): Job kind, used in metrics (e.g. 'generate_reels')
+            fn (Callable): Function to run on a worker thread
+            priority (int): Lower runs first (PRIORITY_HIGH / NORMAL / LOW)
+            job_id (str): Optional caller-chosen id
+            bypass_admission (bool): Queue even when the executor is full (work that
+                                     was already accepted, e.g. recovered durable jobs)
+
+        Output:
+            Dict: success, job_id and state ('running' or 'queued'), or
+                  success False with saturated=True when the executor is full
+        """
+        job_id = job_id or str(uuid.uuid4())
+        with self._lock:
+            if not self._accepting:
+                return {'success': False, 'error': 'Executor is shutting down', 'saturated': True}
+
+            if not bypass_admission and self._queued + self._running >= self.max_workers + self.max_queue_size:
+                self._totals['rejected'] += 1
+                return {
+                    'success': False,
+                    'error': 'Too many jobs in progress, try again later',
+                    'saturated': True
+                }
+
+            job = {
+                'job_id': job_id,
+                'name': name,
+                'priority': priority,
+                'state': 'queued',
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'queue_wait': None,
+                'run_time': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+            self._trim_history()
+            # Anything beyond the idle workers has to wait in the queue
+            state = 'running' if self._queued + self._running < self.max_workers else 'queued'
+            self._queued += 1
+            self._totals['submitted'] += 1
+            self._queue.put((priority, next(self._sequence), job_id, fn, args, kwargs))
+            self._ensure_workers()
+
+        return {'success': True, 'job_id': job_id, 'state': state}
+
+    def _trim_history(self):
+        """Forget the oldest finished jobs beyond MAX_JOB_HISTORY (caller holds the lock)"""
+        while len(self._jobs) > MAX_JOB_HISTORY:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest['state'] in ('queued', 'running'):
+                break
+            del self._jobs[oldest_id]
+
+    def _worker_loop(self):
+        """Pull jobs in priority order until shutdown"""
+        while True:
+            try:
+                _, _, job_id, fn, args, kwargs = self._queue.get(timeout=1)
+            except Empty:
+                with self._lock:
+                    if not self._accepting and not self._queued:
+                        return
+                continue
+
+            with self._lock:
+                job = self._jobs.get(job_id, {})
+                self._queued -= 1
+                self._running += 1
+                job['state'] = 'running'
+                job['started_at'] = time.time()
+                job['queue_wait'] = round(job['started_at'] - job.get('submitted_at', job['started_at']), 3)
+
+            try:
+                outcome = fn(*args, **kwargs)
+            except Exception as e:
+                self._finish_job(job_id, job, e, waiting=False)
+                continue
+
+            if isinstance(outcome, Future):
+                with self._lock:
+                    self._running -= 1
+                    self._waiting += 1
+                    self._idle.notify_all()
+                outcome.add_done_callback(
+                    lambda future, job_id=job_id, job=job: self._finish_job(job_id, job, future.exception(), waiting=True)
+                )
+            else:
+                self._finish_job(job_id, job, None, waiting=False)
+
+    def _finish_job(self, job_id: str, job: Dict, error: Optional[BaseException], waiting: bool):
+        """Record a job's outcome and release its slot"""
+        state = 'failed' if error else 'completed'
+        if error:
+            print(f"Job {job_id} ({job.get('name')}) failed: {error}")
+        with self._lock:
+            job['state'] = state
+            job['error'] = str(error) if error else None
+            job['finished_at'] = time.time()
+            job['run_time'] = round(job['finished_at'] - job['started_at'], 3)
+            if waiting:
+                self._waiting -= 1
+            else:
+                self._running -= 1
+            self._totals[state] += 1
+            self._idle.notify_all()
+
+    def register(self, name: str, handler: Callable, on_give_up: Callable = None):
+        """
+        Register the handler for a durable job kind
+
+        Input:
+            name (str): Job kind (e.g. 'generate_reels')
+            handler (Callable): Called as handler(file_id, **params); must be safe to re-run.
+                                May return a Future, the job then completes when it resolves
+            on_give_up (Callable): Called as on_give_up(file_id, error) when recovery
+                                   fails a job that ran out of attempts
+        """
+        self._handlers[name] = handler
+        if on_give_up:
+            self._give_up_handlers[name] = on_give_up
+
+    def submit_durable(self, name: str, file_id: str, params: Dict, priority: int = PRIORITY_NORMAL) -> Dict:
+        """
+        Submit a job that is persisted on its task and recovered after a restart
+
+        Input:
+            name (str): Registered job kind
+            file_id (str): Task the job works on
+            params (Dict): JSON-serializable keyword arguments for the handler
+            priority (int): Lower runs first
+
+        Output:
+            Dict: Same shape as submit()
+        """
+        if name not in self._handlers:
+            return {'success': False, 'error': f'Unknown job type: {name}'}
+
+        job_id = str(uuid.uuid4())
+        record = {
+            'job_id': job_id,
+            'name': name,
+            'file_id': file_id,
+            'params': params,
+            'priority': priority,
+            'state': 'queued',
+            'attempts': 0,
+            'submitted_at': time.time(),
+            'error': None
+        }
+        return self._enqueue_durable(record)
+
+    def _enqueue_durable(self, record: Dict, recovered: bool = False) -> Dict:
+        """
+        Take a lease on a durable record, persist it and queue it for execution
+
+        Recovered jobs were accepted before the restart, so admission control does not
+        apply to them and their record is never dropped; if the executor is shutting
+        down the record stays queued and is recovered once the lease expires.
+        """
+        job_id = record['job_id']
+        record['lease_owner'] = self.owner_id
+        record['lease_expires_at'] = time.time() + Config.JOB_LEASE_SECONDS
+        with self._lock:
+            self._leased[job_id] = record
+            self._ensure_lease_thread()
+        self._persist(record)
+
+        submission = self.submit(record['name'], self._run_durable, job_id,
+                                 priority=record['priority'], job_id=job_id, bypass_admission=recovered)
+        if not submission.get('success'):
+            with self._lock:
+                self._leased.pop(job_id, None)
+                self._persist_locks.pop(job_id, None)
+            if not recovered:
+                file_manager.update_task_data(record['file_id'], {job_key(record['name']): None})
+        return submission
+
+    def _persist(self, record: Dict, renewal: bool = False) -> bool:
+        """
+        Write a durable record back onto its task
+
+        Copy and write happen under the job's persist lock, so an older copy can never
+        land on top of a newer one. A renewal is only written while the stored record
+        is still this job and not finished, so it can't resurrect a completed job.
+        """
+        with self._lock:
+            if renewal and record['job_id'] not in self._leased:
+                return False
+            persist_lock = self._persist_locks.setdefault(record['job_id'], threading.Lock())
+        with persist_lock:
+            with self._lock:
+                snapshot = copy.deepcopy(record)
+            updates = {job_key(snapshot['name']): snapshot}
+            if not renewal:
+                return file_manager.update_task_data(snapshot['file_id'], updates)
+
+            def still_active(task: Dict) -> bool:
+                stored = task.get(job_key(snapshot['name'])) or {}
+                return stored.get('job_id') == snapshot['job_id'] and stored.get('state') in ACTIVE_JOB_STATES
+            return file_manager.update_task_data_if(snapshot['file_id'], updates, still_active)
+
+    def _run_durable(self, job_id: str):
+        """Worker entry point for durable jobs: track state and attempts around the handler"""
+        with self._lock:
+            record = self._leased[job_id]
+            record['state'] = 'running'
+            record['attempts'] += 1
+            record['started_at'] = time.time()
+        self._persist(record)
+
+        try:
+            outcome = self._handlers[record['name']](record['file_id'], **record['params'])
+        except Exception as e:
+            self._finish_durable(job_id, e)
+            raise
+
+        if not isinstance(outcome, Future):
+            self._finish_durable(job_id, None)
+            return None
+
+        # The record stays leased (and renewed) until the handler's Future resolves
+        done = Future()
+        def finish(future: Future):
+            error = future.exception()
+            self._finish_durable(job_id, error)
+            if error:
+                done.set_exception(error)
+            else:
+                done.set_result(None)
+        outcome.add_done_callback(finish)
+        return done
+
+    def _finish_durable(self, job_id: str, error: Optional[BaseException]):
+        """Persist a durable job's outcome and drop its lease"""
+        with self._lock:
+            record = self._leased.pop(job_id)
+            record['state'] = 'failed' if error else 'completed'
+            record['error'] = str(error) if error else None
+            record['finished_at'] = time.time()
+        self._persist(record)
+        with self._lock:
+            self._persist_locks.pop(job_id, None)
+
+    def _ensure_lease_thread(self):
+        """Start the lease renewal thread on first durable job (caller holds the lock)"""
+        if self._lease_thread is None:
+            self._lease_thread = threading.Thread(target=self._lease_loop, name='job-lease-renewer')
+            self._lease_thread.daemon = True
+            self._lease_thread.start()
+
+    def _lease_loop(self):
+        """Renew leases on queued and running durable jobs so other processes leave them alone"""
+        while True:
+            time.sleep(Config.JOB_LEASE_SECONDS / 3)
+            with self._lock:
+                records = list(self._leased.values())
+                for record in records:
+                    record['lease_expires_at'] = time.time() + Config.JOB_LEASE_SECONDS
+            for record in records:
+                try:
+                    self._persist(record, renewal=True)
+                except Exception as e:
+                    print(f"Error renewing lease for job {record['job_id']}: {e}")
+
+    def recover_jobs(self) -> int:
+        """
+        Re-enqueue durable jobs orphaned by a crash or restart
+
+        A job is orphaned when it is still queued or running but its lease has expired.
+        Jobs whose lease is still live (e.g. held by a process that just died) are
+        re-checked once that lease runs out.
+
+        Output:
+            int: Number of jobs re-enqueued
+        """
+        now = time.time()
+        recovered = 0
+        next_check = None
+
+        for task_data in file_manager.get_all_tasks():
+            for key, record in task_data.items():
+                if not key.startswith(JOB_KEY_PREFIX) or not isinstance(record, dict):
+                    continue
+                if record.get('state') not in ACTIVE_JOB_STATES or record.get('name') not in self._handlers:
+                    continue
+                with self._lock:
+                    if record.get('job_id') in self._leased:
+                        continue
+
+                lease_expires_at = record.get('lease_expires_at') or 0
+                if lease_expires_at > now:
+                    next_check = min(next_check or lease_expires_at, lease_expires_at)
+                    continue
+
+                if self._recover_job(key, record):
+                    recovered += 1
+
+        if next_check:
+            timer = threading.Timer(next_check - now + 1, self.recover_jobs)
+            timer.daemon = True
+            timer.start()
+
+        if recovered:
+            print(f"Recovered {recovered} orphaned job(s)")
+        return recovered
+
+    def _recover_job(self, key: str, record: Dict) -> bool:
+        """Claim an expired lease and re-enqueue the job (or fail it once out of attempts)"""
+        expired_lease = (record.get('lease_owner'), record.get('lease_expires_at'))
+        claimed = copy.deepcopy(record)
+        claimed['lease_owner'] = self.owner_id
+        claimed['lease_expires_at'] = time.time() + Config.JOB_LEASE_SECONDS
+        if claimed['attempts'] >= Config.JOB_MAX_ATTEMPTS:
+            claimed['state'] = 'failed'
+            claimed['error'] = f"Gave up after {claimed['attempts']} attempts"
+
+        def lease_unchanged(task_data):
+            current = task_data.get(key) or {}
+            return (current.get('lease_owner'), current.get('lease_expires_at')) == expired_lease
+
+        # Another process may be recovering the same job; only one compare-and-set wins
+        if not file_manager.update_task_data_if(record['file_id'], {key: claimed}, lease_unchanged):
+            return False
+
+        if claimed['state'] == 'failed':
+            on_give_up = self._give_up_handlers.get(claimed['name'])
+            if on_give_up:
+                on_give_up(record['file_id'], claimed['error'])
+            return False
+
+        claimed['state'] = 'queued'
+        return self._enqueue_durable(claimed, recovered=True).get('success', False)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Get state and timing metrics for a job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def get_metrics(self) -> Dict:
+        """Get executor-wide load and timing metrics"""
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job['run_time'] is not None]
+            return {
+                'max_workers': self.max_workers,
+                'max_queue_size': self.max_queue_size,
+                'running': self._running,
+                'waiting': self._waiting,
+                'queued': self._queued,
+                'accepting': self._accepting,
+                'totals': dict(self._totals),
+                'avg_queue_wait': round(sum(job['queue_wait'] for job in finished) / len(finished), 3) if finished else 0,
+                'avg_run_time': round(sum(job['run_time'] for job in finished) / len(finished), 3) if finished else 0
+            }
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """
+        Stop accepting jobs and wait for queued and running jobs to finish
+
+        Input:
+            timeout (float): Seconds to wait, defaults to Config.JOB_DRAIN_TIMEOUT
+
+        Output:
+            bool: True if the executor drained within the timeout
+        """
+        timeout = Config.JOB_DRAIN_TIMEOUT if timeout is None else timeout
+        deadline = time.time() + timeout
+        with self._lock:
+            self._accepting = False
+            while self._queued or self._running:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    print(f"Job executor drain timed out with {self._queued} queued and {self._running} running jobs")
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+# Process-wide executor for background jobs
+job_executor = JobExecutor()
+atexit.register(job_executor.shutdown)
@@ -0,0 +1,328 @@
+"""
+Media probe utility
+Reads duration, resolution, codecs and audio tracks from MP4/MOV atoms and
+Matroska/WebM EBML headers. The file is memory-mapped and only the header
+structures are read, so probing a two hour recording touches a few pages
+"""
+import mmap
+import struct
+from typing import Dict, Iterator, Optional, Tuple
+
+# MP4 boxes that may start a file; anything else is not an ISO media file
+MP4_TOP_LEVEL = {b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pnot'}
+
+# EBML element ids
+EBML_HEADER = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+MKV_SEGMENT = 0x18538067
+MKV_SEEKHEAD = 0x114D9B74
+MKV_SEEK = 0x4DBB
+MKV_SEEK_ID = 0x53AB
+MKV_SEEK_POSITION = 0x53AC
+MKV_INFO = 0x1549A966
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_TRACKS = 0x1654AE6B
+MKV_TRACK_ENTRY = 0xAE
+MKV_TRACK_TYPE = 0x83
+MKV_CODEC_ID = 0x86
+MKV_VIDEO = 0xE0
+MKV_PIXEL_WIDTH = 0xB0
+MKV_PIXEL_HEIGHT = 0xBA
+MKV_AUDIO = 0xE1
+MKV_SAMPLING_FREQUENCY = 0xB5
+MKV_CHANNELS = 0x9F
+MKV_CLUSTER = 0x1F43B675
+
+# Sample entry fourccs / Matroska codec ids -> common codec names
+CODEC_NAMES = {
+    'avc1': 'h264', 'avc3': 'h264', 'hvc1': 'hevc', 'hev1': 'hevc', 'av01': 'av1',
+    'vp08': 'vp8', 'vp09': 'vp9', 'mp4v': 'mpeg4', 'mp4a': 'aac', 'ac-3': 'ac3',
+    'ec-3': 'eac3', 'opus': 'opus', 'flac': 'flac', '.mp3': 'mp3', 'alac': 'alac',
+    'V_MPEG4/ISO/AVC': 'h264', 'V_MPEGH/ISO/HEVC': 'hevc', 'V_VP8': 'vp8', 'V_VP9': 'vp9',
+    'V_AV1': 'av1', 'A_OPUS': 'opus', 'A_VORBIS': 'vorbis', 'A_AAC': 'aac', 'A_AC3': 'ac3',
+    'A_EAC3': 'eac3', 'A_FLAC': 'flac', 'A_MPEG/L3': 'mp3', 'A_PCM/INT/LIT': 'pcm'
+}
+
+def _codec_name(codec: str) -> str:
+    return CODEC_NAMES.get(codec) or CODEC_NAMES.get(codec.lower()) or codec.strip().lower()
+
+def probe_media(file_path: str) -> Optional[Dict]:
+    """
+    Read container metadata without decoding any media
+
+    Input:
+        file_path (str): Path to an MP4, MOV, MKV or WebM file
+
+    Output:
+        Optional[Dict]: container, duration_ms (None if the container doesn't record it),
+                        width, height, video_codec and audio_tracks
+                        [{codec, sample_rate, channels}], or None if the file isn't
+                        a supported container or is truncated
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if not f.seek(0, 2):
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if len(buf) >= 8 and buf[4:8] in MP4_TOP_LEVEL:
+                    return _probe_mp4(buf)
+                if len(buf) >= 4 and struct.unpack_from('>I', buf, 0)[0] == EBML_HEADER:
+                    return _probe_matroska(buf)
+                return None
+    except (OSError, ValueError, IndexError, struct.error) as e:
+        print(f"Error probing media {file_path}: {e}")
+        return None
+
+def _empty_info(container: str) -> Dict:
+    return {
+        'container': container,
+        'duration_ms': None,
+        'width': None,
+        'height': None,
+        'video_codec': None,
+        'audio_tracks': []
+    }
+
+# MP4 / MOV
+
+def _mp4_boxes(buf, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payload start, box end) for each box in buf[start:end], skipping payloads"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', buf, offset)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', buf, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+def _mp4_find(buf, start: int, end: int, path: Tuple[bytes, ...]) -> Optional[Tuple[int, int]]:
+    """Find a nested box by its type path, returning its payload range"""
+    for box_type, box_start, box_end in _mp4_boxes(buf, start, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return box_start, box_end
+            return _mp4_find(buf, box_start, box_end, path[1:])
+    return None
+
+def _mp4_timing(buf, start: int) -> Tuple[int, int]:
+    """(timescale, duration) from an mvhd or mdhd payload"""
+    if buf[start] == 1:
+        return struct.unpack_from('>IQ', buf, start + 20)
+    return struct.unpack_from('>II', buf, start + 12)
+
+def _probe_mp4(buf) -> Optional[Dict]:
+    info = _empty_info('mp4')
+    moov = None
+    # Top-level boxes are skipped by size, so a trailing moov costs one header read per box
+    for box_type, start, end in _mp4_boxes(buf, 0, len(buf)):
+        if box_type == b'ftyp' and buf[start:start + 4] == b'qt  ':
+            info['container'] = 'mov'
+        elif box_type == b'moov':
+            moov = (start, end)
+            break
+    if moov is None:
+        return None
+
+    track_duration_ms = 0
+    for box_type, start, end in _mp4_boxes(buf, *moov):
+        if box_type == b'mvhd':
+            timescale, duration = _mp4_timing(buf, start)
+            if timescale and duration and duration != 0xFFFFFFFF:
+                info['duration_ms'] = duration * 1000 // timescale
+        elif box_type == b'mvex':
+            # Fragmented files record the total duration in mehd
+            mehd = _mp4_find(buf, start, end, (b'mehd',))
+            if mehd and not info['duration_ms']:
+                fmt = '>Q' if buf[mehd[0]] == 1 else '>I'
+                duration = struct.unpack_from(fmt, buf, mehd[0] + 4)[0]
+                mvhd = _mp4_find(buf, moov[0], moov[1], (b'mvhd',))
+                timescale = _mp4_timing(buf, mvhd[0])[0] if mvhd else 0
+                if timescale and duration:
+                    info['duration_ms'] = duration * 1000 // timescale
+        elif box_type == b'trak':
+            track_duration_ms = max(track_duration_ms, _mp4_track(buf, start, end, info))
+
+    if not info['duration_ms'] and track_duration_ms:
+        info['duration_ms'] = track_duration_ms
+    return info
+
+def _mp4_track(buf, start: int, end: int, info: Dict) -> int:
+    """Add a trak's video/audio details to info, returning the track duration in ms"""
+    hdlr = _mp4_find(buf, start, end, (b'mdia', b'hdlr'))
+    handler = buf[hdlr[0] + 8:hdlr[0] + 12] if hdlr else b''
+
+    duration_ms = 0
+    mdhd = _mp4_find(buf, start, end, (b'mdia', b'mdhd'))
+    if mdhd:
+        timescale, duration = _mp4_timing(buf, mdhd[0])
+        if timescale and duration != 0xFFFFFFFF:
+            duration_ms = duration * 1000 // timescale
+
+    # First sample description: fourcc at +12, the sample entry body starts at +24
+    stsd = _mp4_find(buf, start, end, (b'mdia', b'minf', b'stbl', b'stsd'))
+    codec = None
+    if stsd and struct.unpack_from('>I', buf, stsd[0] + 4)[0]:
+        codec = _codec_name(buf[stsd[0] + 12:stsd[0] + 16].decode('latin-1'))
+
+    if handler == b'vide' and info['video_codec'] is None:
+        info['video_codec'] = codec
+        tkhd = _mp4_find(buf, start, end, (b'tkhd',))
+        if tkhd:
+            offset = tkhd[0] + (36 if buf[tkhd[0]] == 1 else 24) + 52
+            width, height = struct.unpack_from('>II', buf, offset)
+            info['width'], info['height'] = width >> 16, height >> 16
+        if not info['width'] and stsd:
+            info['width'], info['height'] = struct.unpack_from('>HH', buf, stsd[0] + 40)
+    elif handler == b'soun':
+        track = {'codec': codec, 'sample_rate': None, 'channels': None}
+        if stsd:
+            track['channels'] = struct.unpack_from('>H', buf, stsd[0] + 32)[0]
+            track['sample_rate'] = struct.unpack_from('>I', buf, stsd[0] + 40)[0] >> 16
+        info['audio_tracks'].append(track)
+    return duration_ms
+
+# Matroska / WebM
+
+def _ebml_vint(buf, offset: int, keep_marker: bool) -> Tuple[int, int, bool]:
+    """Decode a variable-length integer: (value, next offset, all data bits set)"""
+    first = buf[offset]
+    if not first:
+        raise ValueError(f"Invalid EBML length at offset {offset}")
+    length = 9 - first.bit_length()
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for byte in buf[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    all_ones = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, offset + length, all_ones
+
+def _ebml_elements(buf, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yield (id, data start, data end) for each element in buf[start:end], skipping payloads.
+    An element of unknown size (live recordings) runs to `end` and ends the iteration.
+    """
+    offset = start
+    while offset < end:
+        element_id, offset, _ = _ebml_vint(buf, offset, True)
+        size, data_start, unknown = _ebml_vint(buf, offset, False)
+        data_end = end if unknown else min(data_start + size, end)
+        yield element_id, data_start, data_end
+        if unknown:
+            return
+        offset = data_end
+
+def _ebml_uint(buf, start: int, end: int) -> int:
+    return int.from_bytes(buf[start:end], 'big')
+
+def _ebml_float(buf, start: int, end: int) -> float:
+    if end - start == 4:
+        return struct.unpack_from('>f', buf, start)[0]
+    if end - start == 8:
+        return struct.unpack_from('>d', buf, start)[0]
+    return 0.0
+
+def _ebml_string(buf, start: int, end: int) -> str:
+    return buf[start:end].rstrip(b'\x00').decode('utf-8', 'replace')
+
+def _probe_matroska(buf) -> Optional[Dict]:
+    elements = _ebml_elements(buf, 0, len(buf))
+    element_id, start, end = next(elements)
+    doctype = 'matroska'
+    for child_id, child_start, child_end in _ebml_elements(buf, start, end):
+        if child_id == EBML_DOCTYPE:
+            doctype = _ebml_string(buf, child_start, child_end)
+    info = _empty_info('webm' if doctype == 'webm' else 'matroska')
+
+    segment = next(((s, e) for i, s, e in elements if i == MKV_SEGMENT), None)
+    if segment is None:
+        return None
+
+    # Info and Tracks normally precede the first Cluster; when a muxer wrote them after
+    # the media, the SeekHead says where they are
+    seek_positions = {}
+    found = set()
+    for element_id, start, end in _ebml_elements(buf, *segment):
+        if element_id == MKV_SEEKHEAD:
+            seek_positions = _mkv_seek_positions(buf, start, end)
+        elif element_id in (MKV_INFO, MKV_TRACKS):
+            _mkv_parse(buf, element_id, start, end, info)
+            found.add(element_id)
+        elif element_id == MKV_CLUSTER:
+            break
+        if found == {MKV_INFO, MKV_TRACKS}:
+            return info
+
+    for element_id in (MKV_INFO, MKV_TRACKS):
+        position = seek_positions.get(element_id)
+        if element_id in found or position is None:
+            continue
+        for target_id, start, end in _ebml_elements(buf, segment[0] + position, segment[1]):
+            if target_id == element_id:
+                _mkv_parse(buf, element_id, start, end, info)
+            break
+    return info
+
+def _mkv_seek_positions(buf, start: int, end: int) -> Dict[int, int]:
+    """SeekHead entries: element id -> position relative to the segment data"""
+    positions = {}
+    for element_id, seek_start, seek_end in _ebml_elements(buf, start, end):
+        if element_id != MKV_SEEK:
+            continue
+        target, position = None, None
+        for child_id, child_start, child_end in _ebml_elements(buf, seek_start, seek_end):
+            if child_id == MKV_SEEK_ID:
+                target = _ebml_uint(buf, child_start, child_end)
+            elif child_id == MKV_SEEK_POSITION:
+                position = _ebml_uint(buf, child_start, child_end)
+        if target is not None and position is not None:
+            positions.setdefault(target, position)
+    return positions
+
+def _mkv_parse(buf, element_id: int, start: int, end: int, info: Dict):
+    """Fill info from a segment Info or Tracks element"""
+    if element_id == MKV_INFO:
+        timecode_scale, duration = 1000000, None
+        for child_id, child_start, child_end in _ebml_elements(buf, start, end):
+            if child_id == MKV_TIMECODE_SCALE:
+                timecode_scale = _ebml_uint(buf, child_start, child_end)
+            elif child_id == MKV_DURATION:
+                duration = _ebml_float(buf, child_start, child_end)
+        if duration:
+            info['duration_ms'] = int(duration * timecode_scale / 1000000)
+        return
+
+    for entry_id, entry_start, entry_end in _ebml_elements(buf, start, end):
+        if entry_id != MKV_TRACK_ENTRY:
+            continue
+        track_type, codec, video, audio = None, None, None, None
+        for child_id, child_start, child_end in _ebml_elements(buf, entry_start, entry_end):
+            if child_id == MKV_TRACK_TYPE:
+                track_type = _ebml_uint(buf, child_start, child_end)
+            elif child_id == MKV_CODEC_ID:
+                codec = _codec_name(_ebml_string(buf, child_start, child_end))
+            elif child_id == MKV_VIDEO:
+                video = (child_start, child_end)
+            elif child_id == MKV_AUDIO:
+                audio = (child_start, child_end)
+
+        if track_type == 1 and info['video_codec'] is None:
+            info['video_codec'] = codec
+            for child_id, child_start, child_end in _ebml_elements(buf, *(video or (0, 0))):
+                if child_id == MKV_PIXEL_WIDTH:
+                    info['width'] = _ebml_uint(buf, child_start, child_end)
+                elif child_id == MKV_PIXEL_HEIGHT:
+                    info['height'] = _ebml_uint(buf, child_start, child_end)
+        elif track_type == 2:
+            track = {'codec': codec, 'sample_rate': 8000, 'channels': 1}
+            for child_id, child_start, child_end in _ebml_elements(buf, *(audio or (0, 0))):
+                if child_id == MKV_SAMPLING_FREQUENCY:
+                    track['sample_rate'] = int(_ebml_float(buf, child_start, child_end))
+                elif child_id == MKV_CHANNELS:
+                    track['channels'] = _ebml_uint(buf, child_start, child_end)
+            info['audio_tracks'].append(track)
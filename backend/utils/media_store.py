@@ -0,0 +1,118 @@
+"""
+Media store utility
+Stores uploaded recordings once per content hash, so re-uploads of the same
+meeting share a single file on disk
+"""
+import os
+import uuid
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Dict
+from config import Config
+
+# Bytes read from an upload stream per write
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+class MediaStore:
+    def __init__(self, root: str = None):
+        self.root = root or Config.MEDIA_FOLDER
+        os.makedirs(self.root, exist_ok=True)
+        # file_path -> uploads stored by put_file whose task is not saved yet;
+        # cleanup must not delete shared media while a claim is outstanding
+        self._lock = threading.Lock()
+        self._claims = {}
+
+    def path_for(self, content_hash: str, extension: str) -> str:
+        """Path of the stored media for a content hash, fanned out like the blob store"""
+        return os.path.join(self.root, content_hash[:2], f"{content_hash}{extension.lower()}")
+
+    def hash_file(self, path: str) -> str:
+        """sha256 of a file already on disk (uploads stored before content addressing)"""
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(STREAM_BLOCK_SIZE), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def put_stream(self, stream: BinaryIO, extension: str) -> Dict:
+        """
+        Stream an upload to disk, hashing it on the way, and store it by content hash
+
+        Input:
+            stream (BinaryIO): Upload stream
+            extension (str): File extension including the dot (e.g. '.mp4')
+
+        Output:
+            Dict: content_hash, file_path, size and existed (True if the content was already stored)
+        """
+        tmp_path = os.path.join(self.root, f".{uuid.uuid4()}.tmp")
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    block = stream.read(STREAM_BLOCK_SIZE)
+                    if not block:
+                        break
+                    f.write(block)
+                    hasher.update(block)
+                    size += len(block)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        result = self.put_file(tmp_path, hasher.hexdigest(), extension)
+        result['size'] = size
+        return result
+
+    def put_file(self, path: str, content_hash: str, extension: str) -> Dict:
+        """
+        Move an already hashed file into the store (the source is consumed)
+
+        The stored file is claimed until release() is called for it, once the
+        task referencing it has been saved.
+
+        Input:
+            path (str): File to store
+            content_hash (str): sha256 of the file
+            extension (str): File extension including the dot
+
+        Output:
+            Dict: content_hash, file_path and existed
+        """
+        file_path = self.path_for(content_hash, extension)
+        with self._lock:
+            existed = os.path.exists(file_path)
+            if existed:
+                os.remove(path)
+            else:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                os.replace(path, file_path)
+            self._claims[file_path] = self._claims.get(file_path, 0) + 1
+
+        return {'content_hash': content_hash, 'file_path': file_path, 'existed': existed}
+
+    def release(self, file_path: str):
+        """Drop the claim put_file took on a stored file"""
+        with self._lock:
+            count = self._claims.get(file_path, 0) - 1
+            if count > 0:
+                self._claims[file_path] = count
+            else:
+                self._claims.pop(file_path, None)
+
+    @contextmanager
+    def removal_guard(self):
+        """
+        Block put_file while shared media is checked for references and deleted
+
+        Output:
+            Set[str]: Paths claimed by uploads whose task is not saved yet
+        """
+        with self._lock:
+            yield set(self._claims)
+
+# Process-wide media store
+media_store = MediaStore()
@@ -0,0 +1,207 @@
+"""
+Meeting extractor utility
+Heuristic meeting-info extraction shared by the transcript, blog and poster
+services. Every keyword category is compiled into one regular expression, so
+a transcript is scanned once however many categories there are, and each
+sentence is classified into all the categories it matches in that pass
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+# Sentence categories: a sentence belongs to a category if it contains any of its keywords
+SENTENCE_CATEGORIES = {
+    'topics': ('discuss', 'review', 'plan', 'update', 'present', 'meeting'),
+    'main_topics': ('discuss', 'review', 'plan', 'strategy', 'budget'),
+    'agenda_items': ('discuss', 'review', 'plan', 'update', 'present'),
+    'decisions': ('decide', 'decision', 'agree', 'approve', 'vote'),
+    'action_items': ('action', 'task', 'todo', 'follow up', 'next step'),
+    'insights': ('insight', 'learn', 'discover', 'find', 'realize'),
+    'key_points': ('important', 'key', 'critical', 'decision'),
+    'introductions': ('i am', 'my name is', 'this is')
+}
+
+# Whole-transcript classifications, first match wins
+MEETING_TYPES = (
+    ('quarterly_review', ('quarterly', 'quarter')),
+    ('strategic_planning', ('strategy', 'strategic')),
+    ('performance_review', ('performance', 'review')),
+    ('project_planning', ('project', 'planning'))
+)
+AGENDA_THEMES = (
+    ('quarterly', 'Quarterly review and planning'),
+    ('strategy', 'Strategic planning session'),
+    ('performance', 'Performance review and discussion'),
+    ('project', 'Project planning and updates'),
+    ('budget', 'Budget review and planning'),
+    ('team', 'Team meeting and updates')
+)
+
+# Phrases that introduce the person leading the meeting, in order of preference
+HOLDER_PATTERNS = (
+    'i am', 'my name is', 'this is', 'hello everyone, i\'m',
+    'good morning, i\'m', 'good afternoon, i\'m', 'hi, i\'m',
+    'welcome everyone, i\'m', 'thank you for joining, i\'m'
+)
+
+# Defaults used by poster generation when nothing better is found
+DEFAULT_POSTER_INFO = {
+    'holder': 'Business Team',
+    'agenda': 'Business discussion and planning',
+    'topics': 'Strategic planning and team updates',
+    'participants': 'Team members and stakeholders',
+    'location': 'Conference Room / Virtual Meeting',
+    'timing': 'To be scheduled'
+}
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of a set of keywords in one left-to-right scan
+
+    The keywords are compiled into a single lookahead alternation (longest
+    first), which reports the longest keyword starting at each position.
+    Shorter keywords inside a reported match are credited from a table built
+    at compile time, so overlapping and nested keywords are all found, as an
+    Aho-Corasick automaton would.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], keywords: Iterable[str] = ()):
+        self.categories_by_keyword: Dict[str, set] = {}
+        for category, category_keywords in categories.items():
+            for keyword in category_keywords:
+                self.categories_by_keyword.setdefault(keyword, set()).add(category)
+        for keyword in keywords:
+            self.categories_by_keyword.setdefault(keyword, set())
+
+        ordered = sorted(self.categories_by_keyword, key=len, reverse=True)
+        self.pattern = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in ordered) + '))')
+        # keyword -> [(keyword found inside it, offset), ...] including itself
+        self.contained: Dict[str, List[Tuple[str, int]]] = {
+            keyword: [
+                (inner, offset)
+                for inner in ordered
+                for offset in self._offsets(keyword, inner)
+            ]
+            for keyword in ordered
+        }
+
+    def _offsets(self, text: str, keyword: str) -> List[int]:
+        return [index for index in range(len(text) - len(keyword) + 1) if text.startswith(keyword, index)]
+
+    def scan(self, text: str, separator: str = '.') -> Tuple[Dict[str, List[int]], Dict[str, int]]:
+        """
+        Classify the separator-delimited sentences of a text
+
+        Input:
+            text (str): Lowercased text
+            separator (str): Sentence separator (keywords must not contain it)
+
+        Output:
+            Tuple: ({category: [sentence index, ...]} in sentence order,
+                    {keyword: position of its first occurrence})
+        """
+        boundaries = [index for index, char in enumerate(text) if char == separator] if separator in text else []
+        sentences: Dict[str, List[int]] = {category: [] for keywords in self.categories_by_keyword.values() for category in keywords}
+        first_seen: Dict[str, int] = {}
+
+        for match in self.pattern.finditer(text):
+            position = match.start()
+            sentence = bisect_right(boundaries, position)
+            for keyword, offset in self.contained[match.group(1)]:
+                if keyword not in first_seen:
+                    first_seen[keyword] = position + offset
+                for category in self.categories_by_keyword[keyword]:
+                    found = sentences[category]
+                    if not found or found[-1] != sentence:
+                        found.append(sentence)
+
+        return sentences, first_seen
+
+_matcher = KeywordMatcher(
+    SENTENCE_CATEGORIES,
+    [keyword for _, keywords in MEETING_TYPES for keyword in keywords]
+    + [keyword for keyword, _ in AGENDA_THEMES]
+    + list(HOLDER_PATTERNS)
+)
+
+def extract_meeting_details(transcript: str) -> Dict:
+    """
+    Extract everything the services need from a transcript in one pass
+
+    Input:
+        transcript (str): Meeting transcript text
+
+    Output:
+        Dict: Sentences per category (topics, main_topics, agenda_items, decisions,
+              action_items, insights; stripped and capitalized), key_points (original
+              case), participants, meeting_type, agenda_theme and holder
+    """
+    transcript = transcript or ''
+    transcript_lower = transcript.lower()
+    sentences, first_seen = _matcher.scan(transcript_lower)
+    lower_lines = transcript_lower.split('.')
+
+    details = {
+        category: [lower_lines[index].strip().capitalize() for index in sentences[category]]
+        for category in ('topics', 'main_topics', 'agenda_items', 'decisions', 'action_items', 'insights')
+    }
+
+    original_lines = transcript.split('.')
+    details['key_points'] = [
+        original_lines[index].strip() for index in sentences['key_points']
+        if len(original_lines[index].strip()) > 20
+    ]
+
+    participants = []
+    for index in sentences['introductions']:
+        words = lower_lines[index].strip().split()
+        for position, word in enumerate(words):
+            if word in ('am', 'is') and position + 1 < len(words):
+                name = words[position + 1].title()
+                if name not in participants:
+                    participants.append(name)
+    details['participants'] = participants
+
+    details['meeting_type'] = next(
+        (meeting_type for meeting_type, keywords in MEETING_TYPES if any(keyword in first_seen for keyword in keywords)),
+        'general'
+    )
+    details['agenda_theme'] = next((theme for keyword, theme in AGENDA_THEMES if keyword in first_seen), None)
+
+    details['holder'] = None
+    for pattern in HOLDER_PATTERNS:
+        if pattern in first_seen:
+            # The name is the word after the first occurrence of the pattern
+            start_index = first_seen[pattern] + len(pattern)
+            end_index = transcript_lower.find(' ', start_index + 1)
+            if end_index > start_index:
+                holder_name = transcript[start_index:end_index].strip()
+                if len(holder_name) > 2:
+                    details['holder'] = holder_name.title()
+                    break
+
+    return details
+
+def poster_meeting_info(transcript: str, details: Dict = None) -> Dict:
+    """
+    Meeting information for poster generation (holder and agenda over defaults)
+
+    Input:
+        transcript (str): Meeting transcript text
+        details (Dict): extract_meeting_details result, if already computed
+
+    Output:
+        Dict: holder, agenda, topics, participants, location and timing
+    """
+    info = dict(DEFAULT_POSTER_INFO)
+    if not transcript:
+        return info
+
+    details = details or extract_meeting_details(transcript)
+    if details['holder']:
+        info['holder'] = details['holder']
+    if details['agenda_items']:
+        info['agenda'] = '; '.join(details['agenda_items'][:2])
+    elif details['agenda_theme']:
+        info['agenda'] = details['agenda_theme']
+    return info
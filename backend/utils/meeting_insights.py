@@ -0,0 +1,95 @@
+"""
+Meeting insights utility
+Derives everything the content generators need from a finished transcript:
+holder, agenda, topics, decisions, action items, chapters, highlights and
+per-speaker statistics. Built once when a transcript is stored and kept with
+the task, so poster and blog generation never re-parse the transcript
+"""
+import time
+from typing import Dict, List
+from .meeting_extractor import extract_meeting_details, poster_meeting_info
+from .transcript_words import TranscriptWords, NO_SPEAKER
+
+# Bump when the derivation changes so stored insights are rebuilt on next use
+INSIGHTS_VERSION = 1
+
+def build_insights(transcript: Dict, words: TranscriptWords) -> Dict:
+    """
+    Compute the insights of one transcript
+
+    Input:
+        transcript (Dict): Transcript result (transcript text, chapters, highlights, audio_duration)
+        words (TranscriptWords): Its word timings
+
+    Output:
+        Dict: holder, agenda, meeting_type, topics, decisions, action_items, key_points,
+              participants, chapters, highlights, speakers and version / generated_at
+    """
+    text = transcript.get('transcript') or ''
+    details = extract_meeting_details(text)
+    poster_info = poster_meeting_info(text, details)
+
+    return {
+        'version': INSIGHTS_VERSION,
+        'holder': poster_info['holder'],
+        'agenda': poster_info['agenda'],
+        'meeting_type': details['meeting_type'],
+        'topics': details['main_topics'],
+        'decisions': details['decisions'],
+        'action_items': details['action_items'],
+        'key_points': details['key_points'],
+        'participants': details['participants'],
+        'chapters': [
+            {
+                'headline': chapter.get('headline', ''),
+                'gist': chapter.get('gist', ''),
+                'summary': chapter.get('summary', ''),
+                'start': chapter.get('start'),
+                'end': chapter.get('end')
+            }
+            for chapter in transcript.get('chapters') or []
+        ],
+        'highlights': [
+            {
+                'text': highlight.get('text', ''),
+                'rank': highlight.get('rank', 0),
+                'count': highlight.get('count', 0)
+            }
+            for highlight in (transcript.get('highlights') or {}).get('results') or []
+        ],
+        'speakers': speaker_stats(words),
+        'audio_duration': transcript.get('audio_duration', 0),
+        'generated_at': time.time()
+    }
+
+def speaker_stats(words: TranscriptWords) -> List[Dict]:
+    """
+    Talk time, word count and number of turns per speaker
+
+    Input:
+        words (TranscriptWords): Transcript words with speaker labels
+
+    Output:
+        List[Dict]: speaker, words, turns, talk_time_ms and share of the total
+                    talk time, most talkative first (empty without speaker labels)
+    """
+    stats = {}
+    previous = NO_SPEAKER
+    starts, ends, speaker_ids = words.starts, words.ends, words.speaker_ids
+    for index in range(len(words)):
+        speaker_id = speaker_ids[index]
+        if speaker_id == NO_SPEAKER:
+            continue
+        entry = stats.get(speaker_id)
+        if entry is None:
+            entry = stats[speaker_id] = {'speaker': words.speakers[speaker_id], 'words': 0, 'turns': 0, 'talk_time_ms': 0}
+        entry['words'] += 1
+        entry['talk_time_ms'] += max(0, ends[index] - starts[index])
+        if speaker_id != previous:
+            entry['turns'] += 1
+        previous = speaker_id
+
+    total = sum(entry['talk_time_ms'] for entry in stats.values())
+    for entry in stats.values():
+        entry['share'] = round(entry['talk_time_ms'] / total, 4) if total else 0
+    return sorted(stats.values(), key=lambda entry: entry['talk_time_ms'], reverse=True)
@@ -1,17 +1,24 @@
 import os
 import time
-import requests
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from config import Config
+from .http_client import get_http_client
+from .meeting_extractor import poster_meeting_info
 
 class OpenAIService:
     def __init__(self):
         self.api_key = Config.OPENAI_API_KEY
         self.base_url = "https://api.openai.com/v1"
+        self.http = get_http_client('openai')
         
-    def generate_blog_article(self, transcript: str, meeting_details: Dict) -> Dict:
+    def generate_blog_article(self, transcript: str, meeting_details: Dict,
+                              section_summaries: List[str] = None) -> Dict:
         """
         Generate a comprehensive blog article from meeting transcript
+        
+        For transcripts too long for one prompt, pass section_summaries (the
+        summarize_transcript_chunk results, in meeting order) to write the
+        article from those instead of the transcript text
         """
         if not self.api_key:
             return self._mock_generate_blog(transcript, meeting_details)
@@ -31,8 +38,8 @@ class OpenAIService:
             - Date: {meeting_details.get('date', 'Recent')}
             - Duration: {meeting_details.get('duration', 'Unknown')} minutes
 
-            TRANSCRIPT CONTENT:
-            {transcript}
+            {self._format_content(transcript, section_summaries)}
+            {self._format_insights(meeting_details.get('insights'))}
 
             REQUIREMENTS FOR THE BLOG ARTICLE:
 
@@ -95,7 +102,7 @@ class OpenAIService:
                 "temperature": 0.7
             }
             
-            response = requests.post(f"{self.base_url}/chat/completions", headers=headers, json=data)
+            response = self.http.post(f"{self.base_url}/chat/completions", headers=headers, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -123,8 +130,8 @@ class OpenAIService:
         date = meeting_details.get('date', 'Recent')
         duration = meeting_details.get('duration', 0)
         
-        # Extract meeting details from transcript
-        meeting_info = self._extract_meeting_info(transcript)
+        # Insights stored with the transcript; parse the raw transcript only if the caller has none
+        meeting_info = meeting_details.get('insights') or self._extract_meeting_info(transcript)
         
         # Create a simplified visual prompt for DALL-E
         prompt = f"""
@@ -175,7 +182,7 @@ class OpenAIService:
                 "style": "natural"
             }
             
-            response = requests.post(f"{self.base_url}/images/generations", headers=headers, json=data)
+            response = self.http.post(f"{self.base_url}/images/generations", headers=headers, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -342,6 +349,19 @@ This strategic transformation journey will require commitment, collaboration, an
             'generated_at': time.time()
         }
     
+    def _mock_summarize_chunk(self, chunk_text: str, index: int, count: int) -> Dict:
+        """
+        Mock chunk summary for testing without API key
+        """
+        print(f"Mock: Summarizing transcript part {index + 1}/{count}")
+        time.sleep(0.5)  # Simulate processing time
+        
+        return {
+            'success': True,
+            'summary': ' '.join(chunk_text.split()[:60]),
+            'mock': True
+        }
+    
     def _mock_generate_poster(self, transcript: str, meeting_details: Dict) -> Dict:
         """
         Mock poster generation for testing without API key
@@ -367,65 +387,96 @@ This strategic transformation journey will require commitment, collaboration, an
             'generated_at': time.time()
         } 
 
-    def _extract_meeting_info(self, transcript: str) -> Dict:
-        """
-        Extract meeting information from transcript for poster generation
+    def summarize_transcript_chunk(self, chunk_text: str, index: int, count: int) -> Dict:
         """
-        info = {
-            'holder': 'Business Team',
-            'agenda': 'Business discussion and planning',
-            'topics': 'Strategic planning and team updates',
-            'participants': 'Team members and stakeholders',
-            'location': 'Conference Room / Virtual Meeting',
-            'timing': 'To be scheduled'
-        }
+        Summarize one part of a long meeting transcript (the map step of blog generation)
         
-        # Extract meeting holder and topics from transcript
-        if transcript:
-            # Look for meeting holder (person leading the meeting)
-            transcript_lower = transcript.lower()
+        Input:
+            chunk_text (str): Consecutive speaker turns of the transcript
+            index (int): Position of the part (0-based)
+            count (int): Number of parts
+            
+        Output:
+            Dict: success and summary, or error
+        """
+        if not self.api_key:
+            return self._mock_summarize_chunk(chunk_text, index, count)
             
-            # Common patterns for meeting holder identification
-            holder_patterns = [
-                'i am', 'my name is', 'this is', 'hello everyone, i\'m',
-                'good morning, i\'m', 'good afternoon, i\'m', 'hi, i\'m',
-                'welcome everyone, i\'m', 'thank you for joining, i\'m'
-            ]
+        try:
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
             
-            for pattern in holder_patterns:
-                if pattern in transcript_lower:
-                    # Extract the name after the pattern
-                    start_idx = transcript_lower.find(pattern) + len(pattern)
-                    end_idx = transcript_lower.find(' ', start_idx + 1)
-                    if end_idx > start_idx:
-                        holder_name = transcript[start_idx:end_idx].strip()
-                        if len(holder_name) > 2:  # Valid name length
-                            info['holder'] = holder_name.title()
-                            break
+            prompt = f"""
+            This is part {index + 1} of {count} of a meeting transcript, in order.
+            Summarize it in 150-300 words for someone who will write an article about the whole meeting.
+            Keep every topic discussed, decision made, action item (with owner if stated), figure and
+            notable opinion, attributed to the speaker where it matters. Do not add anything that is not in the text.
+
+            TRANSCRIPT PART:
+            {chunk_text}
+            """
+            
+            data = {
+                "model": "gpt-4",
+                "messages": [
+                    {"role": "system", "content": "You summarize meeting transcripts accurately and concisely."},
+                    {"role": "user", "content": prompt}
+                ],
+                "max_tokens": 600,
+                "temperature": 0.2
+            }
             
-            # Look for common meeting phrases for agenda
-            if 'quarterly' in transcript_lower:
-                info['agenda'] = 'Quarterly review and planning'
-            elif 'strategy' in transcript_lower:
-                info['agenda'] = 'Strategic planning session'
-            elif 'performance' in transcript_lower:
-                info['agenda'] = 'Performance review and discussion'
-            elif 'project' in transcript_lower:
-                info['agenda'] = 'Project planning and updates'
-            elif 'budget' in transcript_lower:
-                info['agenda'] = 'Budget review and planning'
-            elif 'team' in transcript_lower:
-                info['agenda'] = 'Team meeting and updates'
+            # Summaries have no side effects, so rate-limited calls from parallel chunks are retried
+            response = self.http.post(f"{self.base_url}/chat/completions", headers=headers, json=data, retry=True)
+            response.raise_for_status()
             
-            # Extract agenda items
-            agenda_items = []
-            lines = transcript.split('.')
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['discuss', 'review', 'plan', 'update', 'present']):
-                    agenda_items.append(line.capitalize())
+            result = response.json()
+            return {
+                'success': True,
+                'summary': result['choices'][0]['message']['content'].strip()
+            }
             
-            if agenda_items:
-                info['agenda'] = '; '.join(agenda_items[:2])  # Take first 2 items
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _format_content(self, transcript: str, section_summaries: Optional[List[str]]) -> str:
+        """
+        Prompt section carrying the meeting content: the transcript, or its section summaries
+        """
+        if not section_summaries:
+            return f"TRANSCRIPT CONTENT:\n            {transcript}"
         
-        return info 
\ No newline at end of file
+        sections = '\n            '.join(f"{index}. {summary}" for index, summary in enumerate(section_summaries, 1))
+        return ("TRANSCRIPT CONTENT (summarized section by section, in meeting order; the full transcript is too long to include):\n"
+                f"            {sections}")
+    
+    def _format_insights(self, insights: Optional[Dict]) -> str:
+        """
+        Prompt section listing the insights already extracted from the transcript
+        """
+        if not insights:
+            return ''
+        
+        lines = ['', 'EXTRACTED MEETING INSIGHTS:', f"- Led by: {insights.get('holder', 'Business Team')}",
+                 f"- Agenda: {insights.get('agenda', 'Business discussion and planning')}"]
+        for label, field in (('Topics', 'topics'), ('Decisions', 'decisions'), ('Action items', 'action_items')):
+            if insights.get(field):
+                lines.append(f"- {label}: " + '; '.join(insights[field][:5]))
+        chapters = [chapter['headline'] for chapter in insights.get('chapters') or [] if chapter.get('headline')]
+        if chapters:
+            lines.append('- Chapters: ' + '; '.join(chapters))
+        speakers = insights.get('speakers') or []
+        if speakers:
+            lines.append('- Speakers: ' + ', '.join(f"{entry['speaker']} ({round(entry['share'] * 100)}% of talk time)" for entry in speakers))
+        return '\n            '.join(lines)
+    
+    def _extract_meeting_info(self, transcript: str) -> Dict:
+        """
+        Extract meeting information from transcript for poster generation
+        """
+        return poster_meeting_info(transcript) 
\ No newline at end of file
@@ -7,6 +7,7 @@ import time
 from typing import Dict
 from .openai_service import OpenAIService
 from .runwayml_service import RunwayMLService
+from .meeting_extractor import poster_meeting_info
 
 class PosterService:
     def __init__(self):
@@ -112,62 +113,4 @@ class PosterService:
         Output:
             Dict: Meeting information optimized for poster generation
         """
-        info = {
-            'holder': 'Business Team',
-            'agenda': 'Business discussion and planning',
-            'topics': 'Strategic planning and team updates',
-            'participants': 'Team members and stakeholders',
-            'location': 'Conference Room / Virtual Meeting',
-            'timing': 'To be scheduled'
-        }
-        
-        if not transcript:
-            return info
-        
-        # Extract meeting holder (person leading the meeting)
-        transcript_lower = transcript.lower()
-        
-        # Common patterns for meeting holder identification
-        holder_patterns = [
-            'i am', 'my name is', 'this is', 'hello everyone, i\'m',
-            'good morning, i\'m', 'good afternoon, i\'m', 'hi, i\'m',
-            'welcome everyone, i\'m', 'thank you for joining, i\'m'
-        ]
-        
-        for pattern in holder_patterns:
-            if pattern in transcript_lower:
-                # Extract the name after the pattern
-                start_idx = transcript_lower.find(pattern) + len(pattern)
-                end_idx = transcript_lower.find(' ', start_idx + 1)
-                if end_idx > start_idx:
-                    holder_name = transcript[start_idx:end_idx].strip()
-                    if len(holder_name) > 2:  # Valid name length
-                        info['holder'] = holder_name.title()
-                        break
-        
-        # Look for common meeting phrases for agenda
-        if 'quarterly' in transcript_lower:
-            info['agenda'] = 'Quarterly review and planning'
-        elif 'strategy' in transcript_lower:
-            info['agenda'] = 'Strategic planning session'
-        elif 'performance' in transcript_lower:
-            info['agenda'] = 'Performance review and discussion'
-        elif 'project' in transcript_lower:
-            info['agenda'] = 'Project planning and updates'
-        elif 'budget' in transcript_lower:
-            info['agenda'] = 'Budget review and planning'
-        elif 'team' in transcript_lower:
-            info['agenda'] = 'Team meeting and updates'
-        
-        # Extract agenda items
-        agenda_items = []
-        lines = transcript.split('.')
-        for line in lines:
-            line = line.strip().lower()
-            if any(word in line for word in ['discuss', 'review', 'plan', 'update', 'present']):
-                agenda_items.append(line.capitalize())
-        
-        if agenda_items:
-            info['agenda'] = '; '.join(agenda_items[:2])  # Take first 2 items
-        
-        return info 
\ No newline at end of file
+        return poster_meeting_info(transcript) 
\ No newline at end of file
@@ -1,14 +1,15 @@
 import os
 import time
-import requests
 import json
 from typing import Dict, Optional
 from config import Config
+from .http_client import get_http_client
 
 class QuickReelAPI:
     def __init__(self):
         self.api_key = Config.QUICKREEL_API_KEY
         self.base_url = Config.QUICKREEL_API_URL
+        self.http = get_http_client('quickreel')
         
     def create_reel(self, video_url: str, duration: int, caption: str, platforms: list, webhook_url: str = None) -> Dict:
         """
@@ -63,7 +64,7 @@ class QuickReelAPI:
                 }
             }
             
-            response = requests.post(f"{self.base_url}/clip", headers=headers, json=data)
+            response = self.http.post(f"{self.base_url}/clip", headers=headers, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -93,7 +94,7 @@ class QuickReelAPI:
                 "x-api-key": self.api_key
             }
             
-            response = requests.get(f"{self.base_url}/projects/{project_id}", headers=headers)
+            response = self.http.get(f"{self.base_url}/projects/{project_id}", headers=headers)
             response.raise_for_status()
             
             result = response.json()
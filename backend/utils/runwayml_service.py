@@ -1,13 +1,15 @@
 import os
 import time
-import requests
 from typing import Dict, Optional
 from config import Config
+from .http_client import get_http_client
+from .meeting_extractor import poster_meeting_info
 
 class RunwayMLService:
     def __init__(self):
         self.api_key = Config.RUNWAYML_API_KEY
         self.base_url = Config.RUNWAYML_API_URL
+        self.http = get_http_client('runwayml')
         
     def generate_poster_image(self, transcript: str, meeting_details: Dict) -> Dict:
         """
@@ -36,7 +38,7 @@ class RunwayMLService:
                 "scheduler": "ddim"
             }
             
-            response = requests.post(f"{self.base_url}/generations", headers=headers, json=data)
+            response = self.http.post(f"{self.base_url}/generations", headers=headers, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -63,8 +65,8 @@ class RunwayMLService:
         date = meeting_details.get('date', 'Recent')
         duration = meeting_details.get('duration', 0)
         
-        # Extract meeting details from transcript
-        meeting_info = self._extract_meeting_info(transcript)
+        # Insights stored with the transcript; parse the raw transcript only if the caller has none
+        meeting_info = meeting_details.get('insights') or self._extract_meeting_info(transcript)
         
         prompt = f"""
         Create a clean, professional meeting poster with ONLY these essential elements:
@@ -94,64 +96,7 @@ class RunwayMLService:
         """
         Extract meeting information from transcript for poster generation
         """
-        info = {
-            'holder': 'Business Team',
-            'agenda': 'Business discussion and planning',
-            'topics': 'Strategic planning and team updates',
-            'participants': 'Team members and stakeholders',
-            'location': 'Conference Room / Virtual Meeting',
-            'timing': 'To be scheduled'
-        }
-        
-        # Extract meeting holder and topics from transcript
-        if transcript:
-            # Look for meeting holder (person leading the meeting)
-            transcript_lower = transcript.lower()
-            
-            # Common patterns for meeting holder identification
-            holder_patterns = [
-                'i am', 'my name is', 'this is', 'hello everyone, i\'m',
-                'good morning, i\'m', 'good afternoon, i\'m', 'hi, i\'m',
-                'welcome everyone, i\'m', 'thank you for joining, i\'m'
-            ]
-            
-            for pattern in holder_patterns:
-                if pattern in transcript_lower:
-                    # Extract the name after the pattern
-                    start_idx = transcript_lower.find(pattern) + len(pattern)
-                    end_idx = transcript_lower.find(' ', start_idx + 1)
-                    if end_idx > start_idx:
-                        holder_name = transcript[start_idx:end_idx].strip()
-                        if len(holder_name) > 2:  # Valid name length
-                            info['holder'] = holder_name.title()
-                            break
-            
-            # Look for common meeting phrases for agenda
-            if 'quarterly' in transcript_lower:
-                info['agenda'] = 'Quarterly review and planning'
-            elif 'strategy' in transcript_lower:
-                info['agenda'] = 'Strategic planning session'
-            elif 'performance' in transcript_lower:
-                info['agenda'] = 'Performance review and discussion'
-            elif 'project' in transcript_lower:
-                info['agenda'] = 'Project planning and updates'
-            elif 'budget' in transcript_lower:
-                info['agenda'] = 'Budget review and planning'
-            elif 'team' in transcript_lower:
-                info['agenda'] = 'Team meeting and updates'
-            
-            # Extract agenda items
-            agenda_items = []
-            lines = transcript.split('.')
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['discuss', 'review', 'plan', 'update', 'present']):
-                    agenda_items.append(line.capitalize())
-            
-            if agenda_items:
-                info['agenda'] = '; '.join(agenda_items[:2])  # Take first 2 items
-        
-        return info
+        return poster_meeting_info(transcript)
     
     def _mock_generate_poster(self, transcript: str, meeting_details: Dict) -> Dict:
         """
@@ -0,0 +1,390 @@
+"""
+Search index utility
+Inverted index over meeting transcripts, kept in its own SQLite file and
+updated as each transcript is saved. Postings carry term frequencies for BM25
+ranking; word positions and timestamps are stored separately (varint
+encoded) and only read for phrase matching and for the hits of top results
+"""
+import os
+import re
+import math
+import heapq
+import sqlite3
+import threading
+from operator import sub
+from itertools import accumulate, repeat
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from config import Config
+from .transcript_words import TranscriptWords
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc INTEGER PRIMARY KEY,
+    file_id TEXT NOT NULL UNIQUE,
+    title TEXT,
+    words_blob TEXT,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term_id, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc);
+CREATE TABLE IF NOT EXISTS positions (
+    term_id INTEGER NOT NULL,
+    doc INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (term_id, doc)
+) WITHOUT ROWID;
+"""
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*")
+PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# SQLite bound-parameter limit is 999 on older builds
+SQL_CHUNK = 500
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of a text"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def encode_varints(values: Iterable[int]) -> bytearray:
+    """Unsigned LEB128 encoding of non-negative integers"""
+    encoded = bytearray()
+    for value in values:
+        while value >= 0x80:
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        encoded.append(value)
+    return encoded
+
+def decode_varints(data: bytes) -> List[int]:
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+def _deltas(values: List[int]) -> List[int]:
+    return [values[0]] + [max(0, b - a) for a, b in zip(values, values[1:])]
+
+def encode_positions(positions: List[int], starts: List[int]) -> bytes:
+    """
+    Positions and their start times (ms), both ascending, as delta varints:
+    count and positions-section size, then the positions section, then the starts
+    """
+    position_bytes = encode_varints(_deltas(positions))
+    start_bytes = encode_varints(_deltas(starts))
+    return bytes(encode_varints([len(positions), len(position_bytes)]) + position_bytes + start_bytes)
+
+def _read_header(data: bytes) -> Tuple[int, int, int]:
+    """(count, positions-section size, offset of the positions section)"""
+    values = []
+    offset = 0
+    while len(values) < 2:
+        value = shift = 0
+        while data[offset] & 0x80:
+            value |= (data[offset] & 0x7F) << shift
+            shift += 7
+            offset += 1
+        values.append(value | (data[offset] << shift))
+        offset += 1
+    return values[0], values[1], offset
+
+def decode_positions(data: bytes) -> List[int]:
+    """Positions only (all phrase matching needs)"""
+    count, size, offset = _read_header(data)
+    section = data[offset:offset + size]
+    # One byte per delta (always the case for frequent terms): no varint decoding needed
+    deltas = section if count == size else decode_varints(section)
+    return list(accumulate(deltas))
+
+def decode_occurrences(data: bytes) -> Tuple[List[int], List[int]]:
+    """Positions and their start times"""
+    count, size, offset = _read_header(data)
+    return decode_positions(data), list(accumulate(decode_varints(data[offset + size:])))
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split a query into free terms and "quoted phrases"
+
+    Output:
+        Tuple: (terms, phrases) where each phrase is its token list
+    """
+    phrases = [tokens for tokens in (tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)) if tokens]
+    terms = tokenize(PHRASE_PATTERN.sub(' ', query))
+    return list(dict.fromkeys(terms)), phrases
+
+class SearchIndex:
+    def __init__(self, path: str = None):
+        self.path = path or Config.SEARCH_INDEX_PATH
+        # One connection per thread; sqlite3 connections must not cross threads
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.connection = connection
+        return connection
+
+    def index_transcript(self, file_id: str, words: TranscriptWords, title: str = None,
+                         words_blob: str = None):
+        """
+        Add (or replace) a meeting's transcript in the index
+
+        Input:
+            file_id (str): Task identifier
+            words (TranscriptWords): Transcript words
+            title (str): Display name for results (e.g. the uploaded filename)
+            words_blob (str): Blob id of the words, used to build result snippets
+        """
+        occurrences = defaultdict(lambda: ([], []))
+        position = 0
+        for index in range(len(words)):
+            start = words.starts[index]
+            for token in tokenize(words.text(index)):
+                positions, starts = occurrences[token]
+                positions.append(position)
+                starts.append(start)
+                position += 1
+
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._delete(connection, [file_id])
+            doc = connection.execute(
+                'INSERT INTO documents (file_id, title, words_blob, length) VALUES (?, ?, ?, ?)',
+                (file_id, title, words_blob, position)
+            ).lastrowid
+            term_ids = self._term_ids(connection, list(occurrences), create=True)
+            connection.executemany(
+                'INSERT INTO postings (term_id, doc, tf) VALUES (?, ?, ?)',
+                ((term_ids[term], doc, len(positions)) for term, (positions, _) in occurrences.items())
+            )
+            connection.executemany(
+                'INSERT INTO positions (term_id, doc, data) VALUES (?, ?, ?)',
+                ((term_ids[term], doc, encode_positions(positions, starts))
+                 for term, (positions, starts) in occurrences.items())
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def remove_documents(self, file_ids: List[str]):
+        """Drop meetings from the index (e.g. when their tasks are cleaned up)"""
+        if not file_ids:
+            return
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._delete(connection, file_ids)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def search(self, query: str, limit: int = None, hits_per_result: int = None) -> Dict:
+        """
+        Rank meetings for a query with BM25
+
+        Free terms are optional (any may match); "quoted phrases" must occur
+        verbatim and are scored as a unit.
+
+        Input:
+            query (str): Search text, e.g. budget "next quarter"
+            limit (int): Max results
+            hits_per_result (int): Max timestamped hits per result
+
+        Output:
+            Dict: total (matching meetings) and results [{file_id, title, words_blob,
+                  score, hits: [{match, position, start}]}] with start in milliseconds
+        """
+        limit = limit or Config.SEARCH_RESULTS_LIMIT
+        hits_per_result = hits_per_result or Config.SEARCH_HITS_PER_RESULT
+        terms, phrases = parse_query(query)
+        if not terms and not phrases:
+            return {'total': 0, 'results': []}
+
+        connection = self._connection()
+        document_count, total_length = connection.execute(
+            'SELECT COUNT(*), TOTAL(length) FROM documents'
+        ).fetchone()
+        if not document_count:
+            return {'total': 0, 'results': []}
+        average_length = total_length / document_count or 1
+
+        phrase_terms = {term for phrase in phrases for term in phrase}
+        term_ids = self._term_ids(connection, list(set(terms) | phrase_terms))
+        if any(term not in term_ids for term in phrase_terms):
+            return {'total': 0, 'results': []}
+
+        # Term frequencies per doc: one indexed range scan per term
+        frequencies = {
+            term: dict(connection.execute('SELECT doc, tf FROM postings WHERE term_id = ?', (term_id,)))
+            for term, term_id in term_ids.items()
+        }
+
+        # Phrases: intersect their terms' docs, then check positions are consecutive
+        phrase_matches = []
+        candidates = None
+        for phrase in phrases:
+            docs = set.intersection(*(set(frequencies[term]) for term in phrase))
+            matches = self._match_phrase(connection, phrase, term_ids, docs)
+            phrase_matches.append(matches)
+            candidates = set(matches) if candidates is None else candidates & set(matches)
+        if candidates is None:
+            candidates = set().union(*(frequencies[term] for term in terms if term in frequencies))
+        if not candidates:
+            return {'total': 0, 'results': []}
+
+        lengths = self._document_lengths(connection, candidates)
+        scorers = [(frequencies[term], len(frequencies[term])) for term in terms if term in frequencies]
+        scorers += [({doc: len(positions) for doc, positions in matches.items()}, len(matches)) for matches in phrase_matches]
+
+        def score(doc: int) -> float:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc] / average_length)
+            total = 0.0
+            for counts, document_frequency in scorers:
+                tf = counts.get(doc)
+                if tf:
+                    idf = math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+                    total += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            return total
+
+        top = heapq.nlargest(limit, ((score(doc), doc) for doc in candidates))
+        top_docs = [doc for _, doc in top]
+        documents = self._documents(connection, top_docs)
+        # Timestamps are only decoded for the results being returned
+        hit_terms = list(dict.fromkeys([term for term in terms if term in term_ids] + [phrase[0] for phrase in phrases]))
+        occurrences = {
+            key: decode_occurrences(data)
+            for key, data in self._positions(connection, hit_terms, term_ids, top_docs).items()
+        }
+
+        results = []
+        for doc_score, doc in top:
+            hits = []
+            for phrase, matches in zip(phrases, phrase_matches):
+                starts = dict(zip(*occurrences[(phrase[0], doc)])) if doc in matches else {}
+                hits += [{'match': ' '.join(phrase), 'position': position, 'start': starts[position]}
+                         for position in matches.get(doc, [])]
+            for term in terms:
+                positions, starts = occurrences.get((term, doc), ([], []))
+                hits += [{'match': term, 'position': position, 'start': start}
+                         for position, start in zip(positions, starts)]
+            hits.sort(key=lambda hit: (hit['start'], hit['position']))
+            results.append(dict(documents[doc], score=round(doc_score, 4), hits=hits[:hits_per_result]))
+
+        return {'total': len(candidates), 'results': results}
+
+    def get_metrics(self) -> Dict:
+        """Indexed meetings, distinct terms and words"""
+        connection = self._connection()
+        documents, words = connection.execute('SELECT COUNT(*), TOTAL(length) FROM documents').fetchone()
+        terms = connection.execute('SELECT COUNT(*) FROM terms').fetchone()[0]
+        return {'documents': documents, 'terms': terms, 'words': int(words)}
+
+    def _match_phrase(self, connection: sqlite3.Connection, phrase: List[str], term_ids: Dict[str, int],
+                      docs: set) -> Dict[int, List[int]]:
+        """Docs where the phrase occurs -> sorted positions of each occurrence"""
+        encoded = self._positions(connection, list(dict.fromkeys(phrase)), term_ids, list(docs))
+        matches = {}
+        for doc in docs:
+            found = set(decode_positions(encoded[(phrase[0], doc)]))
+            for offset, term in enumerate(phrase[1:], 1):
+                if not found:
+                    break
+                # Shift the term's positions back so a phrase start lines up with them
+                found.intersection_update(map(sub, decode_positions(encoded[(term, doc)]), repeat(offset)))
+            if found:
+                matches[doc] = sorted(found)
+        return matches
+
+    def _positions(self, connection: sqlite3.Connection, terms: List[str], term_ids: Dict[str, int],
+                   docs: List[int]) -> Dict[Tuple[str, int], bytes]:
+        """Encoded positions rows for (term, doc) pairs that exist"""
+        encoded = {}
+        for term in terms:
+            for chunk in self._chunks(docs):
+                rows = connection.execute(
+                    f"SELECT doc, data FROM positions WHERE term_id = ? AND doc IN ({','.join('?' * len(chunk))})",
+                    (term_ids[term], *chunk)
+                )
+                for doc, data in rows:
+                    encoded[(term, doc)] = data
+        return encoded
+
+    def _term_ids(self, connection: sqlite3.Connection, terms: List[str], create: bool = False) -> Dict[str, int]:
+        if create:
+            connection.executemany('INSERT OR IGNORE INTO terms (term) VALUES (?)', ((term,) for term in terms))
+        term_ids = {}
+        for chunk in self._chunks(terms):
+            term_ids.update(
+                (term, term_id) for term_id, term in connection.execute(
+                    f"SELECT id, term FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+                )
+            )
+        return term_ids
+
+    def _document_lengths(self, connection: sqlite3.Connection, docs: Iterable[int]) -> Dict[int, int]:
+        lengths = {}
+        for chunk in self._chunks(list(docs)):
+            lengths.update(connection.execute(
+                f"SELECT doc, length FROM documents WHERE doc IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return lengths
+
+    def _documents(self, connection: sqlite3.Connection, docs: List[int]) -> Dict[int, Dict]:
+        documents = {}
+        for chunk in self._chunks(docs):
+            for doc, file_id, title, words_blob in connection.execute(
+                f"SELECT doc, file_id, title, words_blob FROM documents WHERE doc IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                documents[doc] = {'file_id': file_id, 'title': title, 'words_blob': words_blob}
+        return documents
+
+    def _delete(self, connection: sqlite3.Connection, file_ids: List[str]):
+        for chunk in self._chunks(file_ids):
+            docs = [row[0] for row in connection.execute(
+                f"SELECT doc FROM documents WHERE file_id IN ({','.join('?' * len(chunk))})", chunk
+            )]
+            for doc in docs:
+                # positions is keyed by (term_id, doc); the doc's terms come from postings
+                connection.execute('DELETE FROM positions WHERE doc = ? AND term_id IN '
+                                   '(SELECT term_id FROM postings WHERE doc = ?)', (doc, doc))
+                connection.execute('DELETE FROM postings WHERE doc = ?', (doc,))
+                connection.execute('DELETE FROM documents WHERE doc = ?', (doc,))
+
+    def _chunks(self, values: List) -> Iterable[List]:
+        for start in range(0, len(values), SQL_CHUNK):
+            yield values[start:start + SQL_CHUNK]
+
+# Process-wide search index
+search_index = SearchIndex()
@@ -0,0 +1,140 @@
+"""
+Single-flight utility
+Collapses concurrent calls for the same key into one execution whose result
+every caller shares, plus helpers for composing Futures
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List
+
+def chain_future(future: Future, fn: Callable[[Any], Any]) -> Future:
+    """
+    Derive a Future resolved with fn(result) once `future` resolves
+
+    Input:
+        future (Future): Source future
+        fn (Callable): Applied to the source result (runs on the resolving thread)
+
+    Output:
+        Future: Resolves with fn's return value, or with the source's / fn's exception
+    """
+    chained = Future()
+
+    def resolve(source: Future):
+        try:
+            error = source.exception()
+            if error:
+                chained.set_exception(error)
+            else:
+                chained.set_result(fn(source.result()))
+        except Exception as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(resolve)
+    return chained
+
+def gather_futures(futures: List[Future]) -> Future:
+    """
+    Combine Futures into one that resolves with all of their results
+
+    Input:
+        futures (List[Future]): Futures to wait for
+
+    Output:
+        Future: Resolves with the results in order, or with the first exception raised
+    """
+    gathered = Future()
+    results = [None] * len(futures)
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def collect(index: int, source: Future):
+        error = source.exception()
+        with lock:
+            if gathered.done():
+                return
+            if error:
+                gathered.set_exception(error)
+                return
+            results[index] = source.result()
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        gathered.set_result(results)
+
+    if not futures:
+        gathered.set_result([])
+    for index, future in enumerate(futures):
+        future.add_done_callback(lambda source, index=index: collect(index, source))
+    return gathered
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) unless a call for `key` is already in flight
+
+        Input:
+            key (Hashable): Identity of the work
+            fn (Callable): Work to run
+
+        Output:
+            Any: The result (or raised exception) of the one call made for `key`
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def share(self, key: Hashable, start: Callable[[], Future]) -> Future:
+        """
+        Asynchronous variant of do(): start() returns a Future that every caller
+        for `key` shares until it resolves
+
+        Input:
+            key (Hashable): Identity of the work
+            start (Callable): Starts the work and returns its Future
+
+        Output:
+            Future: The in-flight Future for `key`
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future
+            future = self._calls[key] = Future()
+
+        def release(source: Future):
+            with self._lock:
+                self._calls.pop(key, None)
+            error = source.exception()
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(source.result())
+
+        try:
+            start().add_done_callback(release)
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_exception(e)
+        return future
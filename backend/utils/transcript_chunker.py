@@ -0,0 +1,129 @@
+"""
+Transcript chunker utility
+Splits a transcript too long for one model prompt into chunks within a token
+budget, cutting between speaker turns and preferring chapter starts, so each
+chunk can be summarized on its own
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional
+from .transcript_words import TranscriptWords
+
+# Rough size of a token in characters for English text (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def estimate_tokens(text: str) -> int:
+    """Approximate prompt tokens of a text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def chunk_transcript(transcript: str, words: Optional[TranscriptWords], chapters: List[Dict],
+                     max_tokens: int) -> List[Dict]:
+    """
+    Split a transcript into chunks of at most max_tokens (estimated)
+
+    Chunks end between speaker turns. Once a chunk is at least half full it is
+    also closed where a new chapter starts, so chunks follow the meeting's
+    topics. A single turn longer than the budget is cut between sentences.
+    Without word timings the plain text is split between sentences.
+
+    Input:
+        transcript (str): Transcript text
+        words (TranscriptWords): Word timings with speakers, if available
+        chapters (List[Dict]): Chapters with start (ms), if available
+        max_tokens (int): Token budget per chunk
+
+    Output:
+        List[Dict]: index, text, tokens and start / end (ms, None without word timings)
+    """
+    if words is not None and len(words):
+        units = _utterance_units(words, max_tokens)
+    else:
+        units = _sentence_units(transcript, max_tokens)
+
+    chapter_starts = sorted(chapter['start'] for chapter in chapters or [] if chapter.get('start') is not None)
+    chunks = []
+    current = []
+    current_tokens = 0
+    for unit in units:
+        full = current_tokens + unit['tokens'] > max_tokens
+        at_chapter = (current and current_tokens * 2 >= max_tokens
+                      and _chapter_index(chapter_starts, unit['start']) != _chapter_index(chapter_starts, current[-1]['start']))
+        if current and (full or at_chapter):
+            chunks.append(_chunk(len(chunks), current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit['tokens'] + 1
+    if current:
+        chunks.append(_chunk(len(chunks), current))
+    return chunks
+
+def _chapter_index(chapter_starts: List[int], position: Optional[int]) -> int:
+    return 0 if position is None else bisect_right(chapter_starts, position)
+
+def _chunk(index: int, units: List[Dict]) -> Dict:
+    text = '\n'.join(unit['text'] for unit in units)
+    return {
+        'index': index,
+        'text': text,
+        'tokens': estimate_tokens(text),
+        'start': units[0]['start'],
+        'end': units[-1]['end']
+    }
+
+def _utterance_units(words: TranscriptWords, max_tokens: int) -> List[Dict]:
+    """Speaker turns as 'A: ...' lines, long turns cut between sentences"""
+    units = []
+    first = 0
+    for index in range(1, len(words) + 1):
+        if index < len(words) and words.speaker_ids[index] == words.speaker_ids[first]:
+            continue
+        speaker = words.speaker(first)
+        prefix = f"{speaker}: " if speaker is not None else ''
+        for start, stop in _split_turn(words, first, index, max_tokens - estimate_tokens(prefix)):
+            units.append({
+                'text': prefix + ' '.join(words.text(position) for position in range(start, stop)),
+                'start': words.starts[start],
+                'end': words.ends[stop - 1]
+            })
+        first = index
+
+    for unit in units:
+        unit['tokens'] = estimate_tokens(unit['text'])
+    return units
+
+def _split_turn(words: TranscriptWords, first: int, stop: int, max_tokens: int) -> List[tuple]:
+    """Word ranges of one turn, each within the budget, cut after a sentence end where possible"""
+    ranges = []
+    start = first
+    size = 0
+    last_sentence_end = None
+    for index in range(first, stop):
+        text = words.text(index)
+        size += len(text) + 1
+        if size > max_tokens * CHARS_PER_TOKEN and index > start:
+            cut = last_sentence_end if last_sentence_end is not None else index
+            ranges.append((start, cut))
+            start = cut
+            size = sum(len(words.text(position)) + 1 for position in range(start, index + 1))
+            last_sentence_end = None
+        if text.endswith(('.', '!', '?')):
+            last_sentence_end = index + 1
+    ranges.append((start, stop))
+    return ranges
+
+def _sentence_units(transcript: str, max_tokens: int) -> List[Dict]:
+    """Sentences of plain text; an over-long sentence is cut between words"""
+    units = []
+    for sentence in SENTENCE_END.split(transcript or ''):
+        sentence = sentence.strip()
+        while sentence:
+            if estimate_tokens(sentence) <= max_tokens:
+                piece, sentence = sentence, ''
+            else:
+                limit = max_tokens * CHARS_PER_TOKEN
+                cut = sentence.rfind(' ', 0, limit)
+                cut = cut if cut > 0 else limit
+                piece, sentence = sentence[:cut], sentence[cut:].strip()
+            units.append({'text': piece, 'tokens': estimate_tokens(piece), 'start': None, 'end': None})
+    return units
@@ -0,0 +1,175 @@
+"""
+Transcript poller utility
+One background thread tracks every outstanding AssemblyAI transcript and checks
+each on its own schedule: the first check is scaled to the audio duration, later
+ones back off, and webhook notifications trigger an immediate check. Polling load
+and thread count therefore stay flat however many transcriptions are in flight.
+Finished transcripts are handed to a small worker pool, so slow completion work
+(formatting, caching, indexing) never delays checks on the others
+"""
+import time
+import heapq
+import random
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from config import Config
+
+# Provider statuses that end a transcript
+FINAL_STATUSES = {'completed', 'error'}
+
+class TranscriptPoller:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        # Min-heap of (due, sequence, transcript_id); entries whose due time no longer
+        # matches the pending entry were rescheduled and are skipped
+        self._heap = []
+        self._sequence = itertools.count()
+        self._pending: Dict[str, Dict] = {}
+        self._thread = None
+        # Resolves finished transcripts; their Future callbacks run here, off the poller thread
+        self._completions = ThreadPoolExecutor(max_workers=Config.TRANSCRIPT_COMPLETION_WORKERS,
+                                               thread_name_prefix='transcript-complete')
+
+    def track(self, transcript_id: str, fetch: Callable[[str], Dict], audio_duration: Optional[float] = None) -> Future:
+        """
+        Start tracking a submitted transcript
+
+        Input:
+            transcript_id (str): Provider transcript id
+            fetch (Callable): fetch(transcript_id) -> provider transcript JSON
+            audio_duration (float): Audio length in seconds, if known; scales the first check
+
+        Output:
+            Future: Resolves with the final transcript JSON (status 'completed' or 'error'),
+                    or raises TimeoutError after TRANSCRIPT_POLL_TIMEOUT
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._pending.get(transcript_id)
+            if entry:
+                return entry['future']
+            first_check = self._first_interval(audio_duration)
+            entry = self._pending[transcript_id] = {
+                'future': Future(),
+                'fetch': fetch,
+                'interval': first_check,
+                'deadline': now + Config.TRANSCRIPT_POLL_TIMEOUT,
+                'due': None,
+                'polls': 0
+            }
+            self._schedule(transcript_id, now + first_check)
+            self._ensure_thread()
+        self._wakeup.set()
+        return entry['future']
+
+    def notify(self, transcript_id: str) -> bool:
+        """
+        Check a transcript now (called when its webhook arrives)
+
+        Output:
+            bool: True if the transcript is being tracked
+        """
+        with self._lock:
+            if transcript_id not in self._pending:
+                return False
+            self._schedule(transcript_id, time.time())
+        self._wakeup.set()
+        return True
+
+    def get_metrics(self) -> Dict:
+        """Outstanding transcripts and polls made for them"""
+        with self._lock:
+            return {
+                'outstanding': len(self._pending),
+                'polls': sum(entry['polls'] for entry in self._pending.values())
+            }
+
+    def _max_interval(self) -> float:
+        # With webhooks configured polling is only a safety net
+        if Config.ASSEMBLYAI_WEBHOOK_URL:
+            return Config.TRANSCRIPT_POLL_WEBHOOK_INTERVAL
+        return Config.TRANSCRIPT_POLL_MAX_INTERVAL
+
+    def _first_interval(self, audio_duration: Optional[float]) -> float:
+        """Transcription takes a fraction of the audio length; don't ask before then"""
+        if not audio_duration:
+            return Config.TRANSCRIPT_POLL_MIN_INTERVAL
+        scaled = audio_duration * Config.TRANSCRIPT_POLL_DURATION_RATIO
+        return min(max(scaled, Config.TRANSCRIPT_POLL_MIN_INTERVAL), self._max_interval())
+
+    def _schedule(self, transcript_id: str, due: float):
+        """Queue the next check (caller holds the lock)"""
+        self._pending[transcript_id]['due'] = due
+        heapq.heappush(self._heap, (due, next(self._sequence), transcript_id))
+
+    def _ensure_thread(self):
+        """Start the poller thread on first use (caller holds the lock)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll_loop, name='transcript-poller')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _poll_loop(self):
+        while True:
+            self._wakeup.clear()
+            due_ids = []
+            with self._lock:
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, transcript_id = heapq.heappop(self._heap)
+                    entry = self._pending.get(transcript_id)
+                    if entry and entry['due'] == due:
+                        due_ids.append(transcript_id)
+                next_due = self._heap[0][0] if self._heap else None
+
+            for transcript_id in due_ids:
+                self._check(transcript_id)
+
+            if not due_ids:
+                self._wakeup.wait(None if next_due is None else max(0, next_due - time.time()))
+
+    def _check(self, transcript_id: str):
+        """Poll one transcript, then resolve it or schedule the next check"""
+        with self._lock:
+            entry = self._pending.get(transcript_id)
+            if not entry:
+                return
+            entry['polls'] += 1
+
+        try:
+            transcript = entry['fetch'](transcript_id)
+        except Exception as e:
+            print(f"Error polling transcript {transcript_id}: {e}")
+            transcript = None
+
+        now = time.time()
+        with self._lock:
+            if transcript and transcript.get('status') in FINAL_STATUSES:
+                self._pending.pop(transcript_id, None)
+                result, error = transcript, None
+            elif now > entry['deadline']:
+                self._pending.pop(transcript_id, None)
+                result, error = None, TimeoutError(f"Transcript {transcript_id} not finished after {Config.TRANSCRIPT_POLL_TIMEOUT}s")
+            else:
+                entry['interval'] = min(entry['interval'] * Config.TRANSCRIPT_POLL_BACKOFF, self._max_interval())
+                # Jitter keeps transcripts submitted together from being polled in lockstep
+                self._schedule(transcript_id, now + entry['interval'] * random.uniform(0.9, 1.1))
+                return
+
+        # Callbacks store and index the transcript and may track new ones; keep them off this thread
+        self._completions.submit(self._resolve, transcript_id, entry['future'], result, error)
+
+    def _resolve(self, transcript_id: str, future: Future, result: Optional[Dict], error: Optional[BaseException]):
+        try:
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except Exception as e:
+            print(f"Error completing transcript {transcript_id}: {e}")
+
+# Process-wide poller shared by every transcription
+transcript_poller = TranscriptPoller()
@@ -0,0 +1,196 @@
+"""
+Transcript segmenter utility
+Plans where to cut a long recording (at silences, with overlap) so the pieces
+can be transcribed in parallel, and stitches the per-segment transcripts back
+into one: word times shifted to the recording, overlap words de-duplicated and
+speaker labels carried across segment boundaries
+"""
+import math
+import string
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+# Overlap words from neighbouring segments whose starts are this close (ms) are the same word
+WORD_MATCH_TOLERANCE_MS = 500
+
+def plan_segments(duration: float, silences: List[Tuple[float, float]],
+                  segment_seconds: float = None, overlap: float = None,
+                  search_window: float = None) -> List[Dict]:
+    """
+    Choose segment boundaries for a recording
+
+    Each cut is placed in the middle of the silence nearest the evenly spaced
+    target, if one lies within the search window, so words are not split.
+    Segments then extend `overlap` seconds past each cut on both sides.
+
+    Input:
+        duration (float): Recording length in seconds
+        silences (List[Tuple]): Silent (start, end) ranges in seconds
+        segment_seconds (float): Target segment length
+        overlap (float): Seconds each segment extends past its cuts
+        search_window (float): Max distance from a target cut to a usable silence
+
+    Output:
+        List[Dict]: index, start and end (audio to transcribe) and keep_start / keep_end
+                    (the part of the recording this segment's words are used for)
+    """
+    segment_seconds = segment_seconds or Config.TRANSCRIPT_SEGMENT_SECONDS
+    overlap = Config.TRANSCRIPT_SEGMENT_OVERLAP if overlap is None else overlap
+    search_window = Config.TRANSCRIPT_SEGMENT_SEARCH_WINDOW if search_window is None else search_window
+
+    count = max(1, math.ceil(duration / segment_seconds))
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+
+    cuts = []
+    for k in range(1, count):
+        target = duration * k / count
+        nearest = min(midpoints, key=lambda point: abs(point - target), default=None)
+        cut = nearest if nearest is not None and abs(nearest - target) <= search_window else target
+        # Silences far apart can pull two cuts onto the same point
+        if not cuts or cut - cuts[-1] > 2 * overlap:
+            cuts.append(cut)
+
+    bounds = [0.0] + cuts + [duration]
+    return [
+        {
+            'index': i,
+            'start': max(0.0, bounds[i] - overlap),
+            'end': min(duration, bounds[i + 1] + overlap),
+            'keep_start': bounds[i],
+            'keep_end': bounds[i + 1]
+        }
+        for i in range(len(bounds) - 1)
+    ]
+
+def stitch_segments(segments: List[Dict], results: List[Dict]) -> Dict:
+    """
+    Merge per-segment transcripts into one transcript of the whole recording
+
+    Input:
+        segments (List[Dict]): Output of plan_segments
+        results (List[Dict]): AssemblyAIService.format_transcript result per segment
+
+    Output:
+        Dict: Same shape as a single transcription result (transcript, words,
+              speakers, chapters, confidence, audio_duration)
+    """
+    for result in results:
+        if not result.get('success'):
+            return {
+                'success': False,
+                'error': result.get('error', 'Segment transcription failed')
+            }
+
+    words = []
+    chapters = []
+    previous_overlap = []
+    used_labels = set()
+
+    for segment, result in zip(segments, results):
+        offset_ms = int(segment['start'] * 1000)
+        shifted = [
+            dict(word, start=word['start'] + offset_ms, end=word['end'] + offset_ms)
+            for word in result.get('words') or []
+        ]
+
+        keep_start_ms = segment['keep_start'] * 1000
+        keep_end_ms = segment['keep_end'] * 1000
+
+        # Carry speaker labels over from the previous segment using the words both heard
+        shared_end_ms = 2 * keep_start_ms - segment['start'] * 1000
+        label_map = _match_speakers(previous_overlap, [word for word in shifted if word['start'] < shared_end_ms], used_labels)
+        for word in shifted:
+            raw = word.get('speaker')
+            if raw is not None:
+                if raw not in label_map:
+                    label_map[raw] = _new_label(used_labels)
+                word['speaker'] = label_map[raw]
+
+        kept = [word for word in shifted if keep_start_ms <= word['start'] < keep_end_ms]
+        if words and kept and _same_word(words[-1], kept[0]):
+            kept = kept[1:]
+        words.extend(kept)
+
+        shared_start_ms = 2 * keep_end_ms - segment['end'] * 1000
+        previous_overlap = [word for word in shifted if word['start'] >= shared_start_ms]
+
+        for chapter in result.get('chapters') or []:
+            if 'start' in chapter and keep_start_ms <= chapter['start'] + offset_ms < keep_end_ms:
+                chapters.append(dict(chapter, start=chapter['start'] + offset_ms, end=chapter.get('end', 0) + offset_ms))
+
+    scored = [(len(result.get('words') or []), result.get('confidence') or 0) for result in results]
+    total_words = sum(count for count, _ in scored)
+    confidence = sum(count * value for count, value in scored) / total_words if total_words else 0
+
+    return {
+        'success': True,
+        'transcript': ' '.join(word['text'] for word in words),
+        'chapters': chapters,
+        'highlights': {},
+        'speakers': _utterances(words),
+        'entities': [],
+        'words': words,
+        'confidence': confidence,
+        'audio_duration': segments[-1]['end'] if segments else 0,
+        'segments': len(segments)
+    }
+
+def _normalize_word(text: str) -> str:
+    return text.lower().strip(string.punctuation)
+
+def _same_word(a: Dict, b: Dict) -> bool:
+    return (_normalize_word(a['text']) == _normalize_word(b['text'])
+            and abs(a['start'] - b['start']) <= WORD_MATCH_TOLERANCE_MS)
+
+def _match_speakers(previous: List[Dict], current: List[Dict], used_labels: set) -> Dict:
+    """
+    Map this segment's speaker labels onto the labels already assigned, by
+    voting over overlap words both segments transcribed
+
+    previous words already carry global labels; current words carry raw labels.
+    """
+    votes = Counter()
+    for word in current:
+        if word.get('speaker') is None:
+            continue
+        match = next((other for other in previous if _same_word(other, word)), None)
+        if match and match.get('speaker') is not None:
+            votes[(word['speaker'], match['speaker'])] += 1
+
+    label_map = {}
+    taken = set()
+    for (raw, known), _ in votes.most_common():
+        if raw not in label_map and known not in taken:
+            label_map[raw] = known
+            taken.add(known)
+    used_labels.update(label_map.values())
+    return label_map
+
+def _new_label(used_labels: set) -> str:
+    """Next unused speaker label: A..Z, then S27, S28, ..."""
+    for index in range(len(used_labels) + 1):
+        label = string.ascii_uppercase[index] if index < 26 else f"S{index + 1}"
+        if label not in used_labels:
+            used_labels.add(label)
+            return label
+
+def _utterances(words: List[Dict]) -> List[Dict]:
+    """Rebuild speaker turns from labelled words"""
+    utterances = []
+    for word in words:
+        speaker = word.get('speaker')
+        current: Optional[Dict] = utterances[-1] if utterances else None
+        if current and current['speaker'] == speaker:
+            current['text'] += ' ' + word['text']
+            current['end'] = word['end']
+            current['words'].append(word)
+        else:
+            utterances.append({
+                'speaker': speaker,
+                'text': word['text'],
+                'start': word['start'],
+                'end': word['end'],
+                'words': [word]
+            })
+    return utterances
@@ -1,55 +1,470 @@
 """
 Transcript service utility
-Handles transcript generation from video files using AssemblyAI
+Handles transcript generation from video files using AssemblyAI, caching
+results per media content and transcription options
 """
 import os
+import json
 import time
-from typing import Dict
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Union
+from config import Config
 from .assemblyai_service import AssemblyAIService
+from .file_manager import file_manager
+from .blob_store import blob_store
+from .single_flight import SingleFlight, chain_future
+from .media_store import media_store
+from .transcript_words import TranscriptWords
+from .search_index import search_index
+from .meeting_extractor import extract_meeting_details
+from .meeting_insights import build_insights, INSIGHTS_VERSION
+
+# AssemblyAI options used unless the caller overrides them
+DEFAULT_TRANSCRIPT_OPTIONS = {
+    'speaker_labels': True,
+    'auto_chapters': True,
+    'entity_detection': True,
+    'auto_highlights': True,
+    'language_code': None
+}
+
+# transcript_status values while a transcription job is queued or running
+TRANSCRIPT_ACTIVE_STATES = ('queued', 'processing')
 
 class TranscriptService:
     def __init__(self):
         self.assemblyai_service = AssemblyAIService()
+        self._flights = SingleFlight()
+        # words blob id -> decoded TranscriptWords, least recently used first
+        self._words_cache = OrderedDict()
+        self._words_lock = threading.Lock()
+    
+    def resolve_options(self, options: Dict = None) -> Dict:
+        """Merge caller options over the defaults, ignoring unknown keys"""
+        resolved = dict(DEFAULT_TRANSCRIPT_OPTIONS)
+        for key, value in (options or {}).items():
+            if key in resolved:
+                resolved[key] = value
+        return resolved
+    
+    def cache_key(self, options: Dict) -> str:
+        """Content-index artifact name for a transcript made with these options"""
+        canonical = json.dumps(options, sort_keys=True, separators=(',', ':'))
+        return f"transcript:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]}"
     
-    def generate_transcript(self, video_path: str) -> Dict:
+    def generate_transcript(self, video_path: str, content_hash: str = None, options: Dict = None,
+                            force_refresh: bool = False) -> Dict:
         """
-        Generate transcript from video file using AssemblyAI
+        Generate transcript from video file using AssemblyAI (blocks until it is ready)
         
         Input:
             video_path (str): Path to the video file
+            content_hash (str): sha256 of the media; enables the transcript cache
+            options (Dict): Transcription options (see DEFAULT_TRANSCRIPT_OPTIONS)
+            force_refresh (bool): Transcribe again even if a cached transcript exists
             
         Output:
             Dict: Transcript data including text, timestamps, and metadata
+                  ('cached' is True when it came from the cache)
         """
         try:
-            if not os.path.exists(video_path):
-                return {
-                    'success': False,
-                    'error': f'Video file not found: {video_path}'
-                }
+            return self.to_response(self.transcribe_async(video_path, content_hash, options, force_refresh).result())
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def transcribe_async(self, video_path: str, content_hash: str = None, options: Dict = None,
+                         force_refresh: bool = False, transcript_id: Union[str, Dict] = None,
+                         on_submitted: Callable[[Union[str, Dict]], None] = None) -> Future:
+        """
+        Start a transcription without waiting for it
+        
+        Input:
+            Same as generate_transcript, plus:
+            transcript_id (str | Dict): Provider transcript (or segment plan) to resume instead of submitting
+            on_submitted (Callable): Called with the provider transcript id (or segment plan) once known
             
-            # Generate transcript using AssemblyAI service
-            transcript_result = self.assemblyai_service.transcribe_video(video_path)
+        Output:
+            Future: Resolves to a private copy of the generate_transcript result, with
+                    'words' as TranscriptWords (see to_response for the API shape)
+        """
+        if not os.path.exists(video_path):
+            return self._resolved({
+                'success': False,
+                'error': f'Video file not found: {video_path}'
+            })
+        
+        options = self.resolve_options(options)
+        if not content_hash:
+            return self._transcribe_async(video_path, options, transcript_id, on_submitted)
+        
+        cache_key = self.cache_key(options)
+        if not force_refresh:
+            cached = self._load_cached(content_hash, cache_key)
+            if cached:
+                return self._resolved(cached)
+        
+        # Concurrent requests for the same content and options share one upstream transcription
+        shared = self._flights.share(
+            (content_hash, cache_key),
+            lambda: self._transcribe_and_cache(video_path, content_hash, cache_key, options, force_refresh,
+                                               transcript_id, on_submitted)
+        )
+        return chain_future(shared, dict)
+    
+    def get_cached_transcript(self, content_hash: str, options: Dict = None) -> Optional[Dict]:
+        """
+        Look up a cached transcript without transcribing
+        
+        Input:
+            content_hash (str): sha256 of the media
+            options (Dict): Transcription options
             
-            if transcript_result.get('success'):
-                return {
-                    'success': True,
-                    'transcript': transcript_result.get('transcript', ''),
-                    'audio_duration': transcript_result.get('audio_duration', 0),
-                    'confidence': transcript_result.get('confidence', 0),
-                    'words': transcript_result.get('words', []),
-                    'generated_at': time.time()
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': transcript_result.get('error', 'Unknown error')
-                }
-                
+        Output:
+            Optional[Dict]: Cached transcript ('words' as TranscriptWords), or None
+        """
+        if not content_hash:
+            return None
+        return self._load_cached(content_hash, self.cache_key(self.resolve_options(options)))
+    
+    def save_to_task(self, file_id: str, transcript: Dict):
+        """
+        Store a finished transcript on a task and mark its transcription completed
+        
+        Input:
+            file_id (str): Task identifier
+            transcript (Dict): Successful transcript result
+        """
+        transcript = dict(transcript)
+        transcript.pop('cached', None)
+        packed = self._pack(transcript)
+        reference = file_manager.save_artifact(file_id, 'transcript', packed,
+                                               ('audio_duration', 'confidence', 'generated_at', 'words_blob', 'word_count'))
+        if not reference:
+            return
+        file_manager.update_task_data(file_id, {'transcript_status': 'completed', 'transcript_provider_id': None})
+        task_data = file_manager.get_task_data(file_id) or {}
+        
+        try:
+            self._save_insights(file_id, task_data, packed)
+        except Exception as e:
+            # Generators rebuild missing insights on demand; the transcript itself is saved
+            print(f"Error computing insights for {file_id}: {e}")
+        
+        try:
+            search_index.index_transcript(file_id, self.load_words(packed), task_data.get('filename'), packed['words_blob'])
         except Exception as e:
+            # Search is secondary; the transcript itself is saved
+            print(f"Error indexing transcript {file_id}: {e}")
+    
+    def get_task_insights(self, file_id: str, task_data: Dict) -> Optional[Dict]:
+        """
+        Meeting insights of a task's transcript (see meeting_insights.build_insights)
+        
+        Insights are computed when the transcript is stored; they are only rebuilt here
+        if the transcript has changed since, or was stored before insights existed.
+        
+        Input:
+            file_id (str): Task identifier
+            task_data (Dict): Task record
+            
+        Output:
+            Optional[Dict]: Insights, or None if the task has no transcript
+        """
+        transcript_reference = task_data.get('transcript')
+        if not transcript_reference:
+            return None
+        
+        if self._insights_current(task_data.get('insights'), transcript_reference):
+            insights = file_manager.load_artifact(task_data, 'insights')
+            if insights:
+                return insights
+        
+        transcript = file_manager.load_artifact(task_data, 'transcript')
+        if not transcript:
+            return None
+        return self._save_insights(file_id, task_data, transcript)
+    
+    def to_response(self, transcript: Dict) -> Dict:
+        """
+        Copy of a transcript with its words expanded to the dicts the API returns
+        
+        Input:
+            transcript (Dict): Transcript holding TranscriptWords (or already plain words)
+            
+        Output:
+            Dict: Transcript with 'words' as a list of word dicts
+        """
+        response = dict(transcript)
+        if isinstance(response.get('words'), TranscriptWords):
+            response['words'] = response['words'].to_dicts()
+        return response
+    
+    def load_words(self, transcript: Dict) -> TranscriptWords:
+        """
+        Word timings of a stored transcript artifact
+        
+        Input:
+            transcript (Dict): Transcript payload as stored (see file_manager.load_artifact)
+            
+        Output:
+            TranscriptWords: Columnar word timings (empty if the transcript has none)
+        """
+        words = transcript.get('words')
+        if isinstance(words, TranscriptWords):
+            return words
+        if transcript.get('words_blob'):
+            return self._words_for_blob(transcript['words_blob'])
+        # Transcripts stored before the columnar format carry the word dicts inline
+        return TranscriptWords.from_dicts(words or [])
+    
+    def run_transcript_job(self, file_id: str, options: Dict = None, force_refresh: bool = False) -> Optional[Future]:
+        """
+        Durable job handler: transcribe a task's recording and store the result on the task
+        
+        The handler returns once the recording is submitted; the job completes when the
+        returned Future resolves. A re-run after a restart resumes the provider transcript
+        recorded on the task instead of submitting (and paying for) it again.
+        
+        Input:
+            file_id (str): Task identifier
+            options (Dict): Transcription options
+            force_refresh (bool): Bypass the transcript cache
+        """
+        task_data = file_manager.get_task_data(file_id)
+        if not task_data:
+            return None
+        
+        file_manager.update_task_data(file_id, {'transcript_status': 'processing', 'transcript_error': None})
+        video_path = task_data.get('file_path') or ''
+        
+        # Uploads from before content addressing get their hash on first use
+        content_hash = task_data.get('content_hash')
+        if not content_hash and os.path.exists(video_path):
+            content_hash = media_store.hash_file(video_path)
+            file_manager.update_task_data(file_id, {'content_hash': content_hash})
+        
+        future = self.transcribe_async(
+            video_path, content_hash, options, force_refresh,
+            transcript_id=task_data.get('transcript_provider_id'),
+            on_submitted=lambda transcript_id: file_manager.update_task_data(
+                file_id, {'transcript_provider_id': transcript_id}
+            )
+        )
+        return chain_future(future, lambda transcript_result: self._complete_job(file_id, transcript_result))
+    
+    def get_task_words(self, task_data: Dict) -> Optional[TranscriptWords]:
+        """
+        Word timings of a task's transcript
+        
+        Uses the words blob referenced from the task record, so the transcript
+        artifact itself is only loaded for transcripts saved before that reference.
+        
+        Input:
+            task_data (Dict): Task record
+            
+        Output:
+            Optional[TranscriptWords]: Words, or None if the task has no transcript
+        """
+        reference = task_data.get('transcript')
+        if not reference:
+            return None
+        if reference.get('words_blob'):
+            return self._words_for_blob(reference['words_blob'])
+        transcript = file_manager.load_artifact(task_data, 'transcript')
+        return self.load_words(transcript) if transcript else None
+    
+    def get_window(self, words: TranscriptWords, start_ms: int, end_ms: int) -> Dict:
+        """
+        What was said in a time window
+        
+        Input:
+            words (TranscriptWords): Transcript words
+            start_ms (int): Window start in milliseconds
+            end_ms (int): Window end in milliseconds (exclusive)
+            
+        Output:
+            Dict: words overlapping the window, utterances (whole speaker turns
+                  overlapping it) and the speakers heard
+        """
+        indexes = words.index_range(start_ms, end_ms)
+        window = words.slice_time(start_ms, end_ms)
+        
+        utterances = []
+        if indexes:
+            # Widen to the enclosing speaker turns so utterances aren't cut mid-sentence
+            first, last = indexes.start, indexes.stop - 1
+            while first > 0 and words.speaker_ids[first - 1] == words.speaker_ids[first]:
+                first -= 1
+            while last + 1 < len(words) and words.speaker_ids[last + 1] == words.speaker_ids[last]:
+                last += 1
+            for index in range(first, last + 1):
+                if utterances and words.speaker_ids[index] == words.speaker_ids[index - 1]:
+                    utterance = utterances[-1]
+                    utterance['text'] += ' ' + words.text(index)
+                    utterance['end'] = words.ends[index]
+                else:
+                    utterances.append({
+                        'speaker': words.speaker(index),
+                        'text': words.text(index),
+                        'start': words.starts[index],
+                        'end': words.ends[index]
+                    })
+        
+        speakers = []
+        for utterance in utterances:
+            if utterance['speaker'] is not None and utterance['speaker'] not in speakers:
+                speakers.append(utterance['speaker'])
+        
+        return {
+            'words': window.to_dicts(),
+            'utterances': utterances,
+            'speakers': speakers
+        }
+    
+    def _save_insights(self, file_id: str, task_data: Dict, transcript: Dict) -> Dict:
+        """Build and store the insights of a task's transcript, reusing those of identical content"""
+        transcript_reference = task_data.get('transcript') or {}
+        content_hash = task_data.get('content_hash')
+        
+        # Another upload of the same recording may already have insights for this exact transcript
+        content = file_manager.get_content_data(content_hash)
+        known = content and content.get('artifacts', {}).get('insights')
+        if self._insights_current(known, transcript_reference):
+            insights = blob_store.get(known['blob_id'])
+            if insights and file_manager.update_task_data(file_id, {'insights': known}):
+                return insights
+        
+        insights = build_insights(transcript, self.load_words(transcript))
+        insights['source'] = transcript_reference.get('blob_id')
+        file_manager.save_artifact(file_id, 'insights', insights,
+                                   ('version', 'source', 'meeting_type', 'generated_at'), content_hash)
+        return insights
+    
+    def _insights_current(self, insights_reference: Optional[Dict], transcript_reference: Dict) -> bool:
+        """Whether stored insights were derived from this transcript by the current derivation"""
+        # Blob ids are content hashes, so a re-transcription (even of the same recording) changes the id
+        return bool(insights_reference
+                    and transcript_reference.get('blob_id')
+                    and insights_reference.get('source') == transcript_reference.get('blob_id')
+                    and insights_reference.get('version') == INSIGHTS_VERSION)
+    
+    def _words_for_blob(self, blob_id: str) -> TranscriptWords:
+        """Decode a words blob, keeping recently used transcripts in memory"""
+        with self._words_lock:
+            words = self._words_cache.get(blob_id)
+            if words is not None:
+                self._words_cache.move_to_end(blob_id)
+                return words
+        
+        data = blob_store.get_bytes(blob_id)
+        words = TranscriptWords.from_bytes(data) if data else TranscriptWords()
+        with self._words_lock:
+            self._words_cache[blob_id] = words
+            while len(self._words_cache) > Config.TRANSCRIPT_WORDS_CACHE_SIZE:
+                self._words_cache.popitem(last=False)
+        return words
+    
+    def _complete_job(self, file_id: str, transcript_result: Dict):
+        """Store a finished transcription on its task"""
+        if not transcript_result.get('success'):
+            error = transcript_result.get('error', 'Unknown error')
+            self.mark_failed(file_id, error, keep_submission=bool(transcript_result.get('resumable')))
+            raise RuntimeError(error)
+        self.save_to_task(file_id, transcript_result)
+    
+    def mark_failed(self, file_id: str, error: str, keep_submission: bool = False):
+        """
+        Record a failed transcription on the task
+        
+        keep_submission leaves partially submitted segments on the task, so the
+        next attempt only submits the rest.
+        """
+        updates = {'transcript_status': 'failed', 'transcript_error': error}
+        if not keep_submission:
+            updates['transcript_provider_id'] = None
+        file_manager.update_task_data(file_id, updates)
+    
+    def _resolved(self, result: Dict) -> Future:
+        future = Future()
+        future.set_result(result)
+        return future
+    
+    def _load_cached(self, content_hash: str, cache_key: str) -> Optional[Dict]:
+        content = file_manager.get_content_data(content_hash)
+        reference = content and content.get('artifacts', {}).get(cache_key)
+        transcript = reference and blob_store.get(reference['blob_id'])
+        if not transcript:
+            return None
+        transcript = self._unpack(transcript)
+        transcript['cached'] = True
+        return transcript
+    
+    def _pack(self, transcript: Dict) -> Dict:
+        """Storage form: words go to their own binary blob, referenced by id"""
+        packed = dict(transcript)
+        words = self.load_words(packed)
+        packed.pop('words', None)
+        packed['words_blob'] = blob_store.put_bytes(words.to_bytes())
+        packed['word_count'] = len(words)
+        return packed
+    
+    def _unpack(self, payload: Dict) -> Dict:
+        """In-memory form of a stored transcript: words as TranscriptWords"""
+        transcript = dict(payload)
+        transcript['words'] = self.load_words(payload)
+        transcript.pop('words_blob', None)
+        transcript.pop('word_count', None)
+        return transcript
+    
+    def _transcribe_and_cache(self, video_path: str, content_hash: str, cache_key: str, options: Dict,
+                              force_refresh: bool, transcript_id: Union[str, Dict] = None,
+                              on_submitted: Callable[[Union[str, Dict]], None] = None) -> Future:
+        # A flight that finished just before this one started may have filled the cache
+        if not force_refresh:
+            cached = self._load_cached(content_hash, cache_key)
+            if cached:
+                return self._resolved(cached)
+        
+        def cache(transcript: Dict) -> Dict:
+            if transcript.get('success'):
+                packed = self._pack(transcript)
+                # words_blob rides along so cleanup knows the words blob is still in use
+                reference = {'blob_id': blob_store.put(packed), 'words_blob': packed['words_blob']}
+                file_manager.update_content_data(content_hash, {}, {cache_key: reference})
+            return transcript
+        
+        return chain_future(self._transcribe_async(video_path, options, transcript_id, on_submitted), cache)
+    
+    def _transcribe_async(self, video_path: str, options: Dict, transcript_id: Union[str, Dict] = None,
+                          on_submitted: Callable[[Union[str, Dict]], None] = None) -> Future:
+        """Run the upstream transcription and normalize its result"""
+        return chain_future(
+            self.assemblyai_service.transcribe_video_async(video_path, options, transcript_id, on_submitted),
+            self._normalize
+        )
+    
+    def _normalize(self, transcript_result: Dict) -> Dict:
+        if transcript_result.get('success'):
+            return {
+                'success': True,
+                'transcript': transcript_result.get('transcript', ''),
+                'audio_duration': transcript_result.get('audio_duration', 0),
+                'confidence': transcript_result.get('confidence', 0),
+                'chapters': transcript_result.get('chapters') or [],
+                'highlights': transcript_result.get('highlights') or {},
+                'words': TranscriptWords.from_dicts(transcript_result.get('words') or []),
+                'generated_at': time.time()
+            }
+        else:
             return {
                 'success': False,
-                'error': str(e)
+                'error': transcript_result.get('error', 'Unknown error')
             }
     
     def extract_meeting_info(self, transcript: str) -> Dict:
@@ -74,42 +489,11 @@ class TranscriptService:
             if not transcript:
                 return info
             
-            # Extract participants (simple heuristic)
-            lines = transcript.split('.')
-            for line in lines:
-                line = line.strip().lower()
-                if any(word in line for word in ['i am', 'my name is', 'this is']):
-                    # Extract name after these phrases
-                    words = line.split()
-                    for i, word in enumerate(words):
-                        if word in ['am', 'is'] and i + 1 < len(words):
-                            name = words[i + 1].title()
-                            if name not in info['participants']:
-                                info['participants'].append(name)
-            
-            # Extract topics
-            topic_keywords = ['discuss', 'review', 'plan', 'update', 'present', 'meeting']
-            for line in lines:
-                line = line.strip().lower()
-                if any(keyword in line for keyword in topic_keywords):
-                    info['topics'].append(line.capitalize())
-            
-            # Determine meeting type
-            if any(word in transcript.lower() for word in ['quarterly', 'quarter']):
-                info['meeting_type'] = 'quarterly_review'
-            elif any(word in transcript.lower() for word in ['strategy', 'strategic']):
-                info['meeting_type'] = 'strategic_planning'
-            elif any(word in transcript.lower() for word in ['performance', 'review']):
-                info['meeting_type'] = 'performance_review'
-            elif any(word in transcript.lower() for word in ['project', 'planning']):
-                info['meeting_type'] = 'project_planning'
-            
-            # Extract key points (simple approach)
-            sentences = transcript.split('.')
-            for sentence in sentences:
-                sentence = sentence.strip()
-                if len(sentence) > 20 and any(word in sentence.lower() for word in ['important', 'key', 'critical', 'decision']):
-                    info['key_points'].append(sentence)
+            details = extract_meeting_details(transcript)
+            info['participants'] = details['participants']
+            info['topics'] = details['topics']
+            info['meeting_type'] = details['meeting_type']
+            info['key_points'] = details['key_points']
             
             return info
             
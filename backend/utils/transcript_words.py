@@ -0,0 +1,194 @@
+"""
+Transcript words utility
+Columnar, compact representation of transcript word timings: parallel typed
+arrays for start, end, confidence, speaker and word ids instead of one dict
+per word, with a binary encoding for storage and cheap slicing by time
+"""
+import sys
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+# Binary layout: header, vocabulary, speaker labels, then the five columns
+FORMAT_MAGIC = b'TWC1'
+HEADER = struct.Struct('<4sIIIII')  # magic, word count, vocabulary count / bytes, speaker count / bytes
+NO_SPEAKER = -1
+
+def _column(typecode: str, values: Iterable = ()) -> array:
+    return array(typecode, values)
+
+def _split_table(data: bytes, count: int) -> List[str]:
+    """NUL-separated labels of a vocabulary or speaker table holding count entries"""
+    entries = data.decode('utf-8').split('\0') if count else []
+    if len(entries) != count:
+        raise ValueError('Corrupt transcript words table')
+    return entries
+
+class TranscriptWords:
+    """
+    Word timings of one transcript, stored column-wise
+
+    starts / ends are milliseconds (int32), confidences float32, and texts and
+    speakers are interned: each word holds an index into `vocabulary` / `speakers`.
+    Words are kept in start order so time ranges can be found by bisection.
+    """
+
+    def __init__(self, starts: array = None, ends: array = None, confidences: array = None,
+                 speaker_ids: array = None, token_ids: array = None,
+                 vocabulary: List[str] = None, speakers: List[str] = None):
+        self.starts = starts if starts is not None else _column('i')
+        self.ends = ends if ends is not None else _column('i')
+        self.confidences = confidences if confidences is not None else _column('f')
+        self.speaker_ids = speaker_ids if speaker_ids is not None else _column('h')
+        self.token_ids = token_ids if token_ids is not None else _column('i')
+        self.vocabulary = vocabulary if vocabulary is not None else []
+        self.speakers = speakers if speakers is not None else []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_dicts(cls, words: List[Dict]) -> 'TranscriptWords':
+        """
+        Build from AssemblyAI-style word dicts
+
+        Input:
+            words (List[Dict]): [{'text', 'start', 'end', 'confidence', 'speaker'}, ...]
+
+        Output:
+            TranscriptWords: Columnar copy (sorted by start)
+        """
+        if any(words[i].get('start', 0) > words[i + 1].get('start', 0) for i in range(len(words) - 1)):
+            words = sorted(words, key=lambda word: word.get('start', 0))
+
+        columns = cls()
+        token_index: Dict[str, int] = {}
+        speaker_index: Dict[str, int] = {}
+        for word in words:
+            text = word.get('text', '')
+            token = token_index.get(text)
+            if token is None:
+                token = token_index[text] = len(columns.vocabulary)
+                columns.vocabulary.append(text)
+
+            speaker = word.get('speaker')
+            if speaker is None:
+                speaker_id = NO_SPEAKER
+            else:
+                speaker_id = speaker_index.get(speaker)
+                if speaker_id is None:
+                    speaker_id = speaker_index[speaker] = len(columns.speakers)
+                    columns.speakers.append(speaker)
+
+            columns.starts.append(int(word.get('start', 0)))
+            columns.ends.append(int(word.get('end', 0)))
+            columns.confidences.append(float(word.get('confidence') or 0))
+            columns.speaker_ids.append(speaker_id)
+            columns.token_ids.append(token)
+        return columns
+
+    def text(self, index: int) -> str:
+        """Text of one word"""
+        return self.vocabulary[self.token_ids[index]]
+
+    def speaker(self, index: int) -> Optional[str]:
+        """Speaker label of one word, or None"""
+        speaker_id = self.speaker_ids[index]
+        return None if speaker_id == NO_SPEAKER else self.speakers[speaker_id]
+
+    def to_dicts(self) -> List[Dict]:
+        """Expand back to the word dicts the API returns"""
+        words = []
+        for index in range(len(self)):
+            word = {
+                'text': self.text(index),
+                'start': self.starts[index],
+                'end': self.ends[index],
+                # float32 storage; round so the JSON doesn't show float noise
+                'confidence': round(self.confidences[index], 4)
+            }
+            speaker = self.speaker(index)
+            if speaker is not None:
+                word['speaker'] = speaker
+            words.append(word)
+        return words
+
+    def index_range(self, start_ms: int, end_ms: int) -> range:
+        """
+        Indexes of the words overlapping [start_ms, end_ms)
+
+        A word that started before start_ms but is still being spoken is included.
+        """
+        first = bisect_left(self.starts, start_ms)
+        if first > 0 and self.ends[first - 1] > start_ms:
+            first -= 1
+        last = bisect_left(self.starts, end_ms, first)
+        return range(first, max(first, last))
+
+    def slice_time(self, start_ms: int, end_ms: int) -> 'TranscriptWords':
+        """
+        Words overlapping [start_ms, end_ms) as a new TranscriptWords
+
+        The columns are copied (contiguous array slices); the vocabulary and
+        speaker tables are shared.
+        """
+        indexes = self.index_range(start_ms, end_ms)
+        window = slice(indexes.start, indexes.stop)
+        return TranscriptWords(
+            self.starts[window], self.ends[window], self.confidences[window],
+            self.speaker_ids[window], self.token_ids[window],
+            self.vocabulary, self.speakers
+        )
+
+    def to_bytes(self) -> bytes:
+        """Encode as the compact little-endian binary format"""
+        vocabulary = '\0'.join(self.vocabulary).encode('utf-8')
+        speakers = '\0'.join(self.speakers).encode('utf-8')
+        parts = [
+            HEADER.pack(FORMAT_MAGIC, len(self), len(self.vocabulary), len(vocabulary), len(self.speakers), len(speakers)),
+            vocabulary,
+            speakers
+        ]
+        for column in (self.starts, self.ends, self.confidences, self.speaker_ids, self.token_ids):
+            if sys.byteorder == 'big':
+                column = _column(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TranscriptWords':
+        """
+        Decode the binary format written by to_bytes
+
+        Raises:
+            ValueError: If the data is not a transcript words encoding
+        """
+        if len(data) < HEADER.size:
+            raise ValueError('Truncated transcript words data')
+        magic, count, vocabulary_count, vocabulary_size, speaker_count, speakers_size = HEADER.unpack_from(data)
+        if magic != FORMAT_MAGIC:
+            raise ValueError('Not transcript words data')
+
+        offset = HEADER.size
+        vocabulary = data[offset:offset + vocabulary_size]
+        offset += vocabulary_size
+        speakers = data[offset:offset + speakers_size]
+        offset += speakers_size
+
+        columns = []
+        for typecode in ('i', 'i', 'f', 'h', 'i'):
+            column = _column(typecode)
+            size = column.itemsize * count
+            column.frombytes(data[offset:offset + size])
+            if len(column) != count:
+                raise ValueError('Truncated transcript words data')
+            if sys.byteorder == 'big':
+                column.byteswap()
+            columns.append(column)
+            offset += size
+
+        return cls(*columns,
+                   vocabulary=_split_table(vocabulary, vocabulary_count),
+                   speakers=_split_table(speakers, speaker_count))
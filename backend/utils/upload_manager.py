@@ -0,0 +1,233 @@
+"""
+Upload manager utility
+Resumable chunked uploads: init, append chunks at the acknowledged offset
+while hashing incrementally, and finalize into the uploads folder
+"""
+import os
+import json
+import uuid
+import time
+import hashlib
+import threading
+from datetime import datetime
+from typing import BinaryIO, Dict, Optional
+from werkzeug.utils import secure_filename
+from config import Config
+from .media_store import media_store
+
+# Bytes read from the request stream per write
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+class UploadManager:
+    def __init__(self, upload_folder: str = None):
+        self.upload_folder = upload_folder or Config.UPLOAD_FOLDER
+        self.partial_folder = os.path.join(self.upload_folder, 'partial')
+        os.makedirs(self.partial_folder, exist_ok=True)
+        self._lock = threading.Lock()
+        # upload_id -> (lock, sha256 state, offset the state covers)
+        self._sessions = {}
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.partial_folder, f"{upload_id}.json")
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.partial_folder, f"{upload_id}.part")
+
+    def _session(self, upload_id: str) -> Dict:
+        """Per-upload lock and running hash, kept in memory for the life of the upload"""
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                session = self._sessions[upload_id] = {
+                    'lock': threading.Lock(),
+                    'hasher': hashlib.sha256(),
+                    'hashed_offset': 0
+                }
+            return session
+
+    def _sync_hasher(self, upload_id: str, session: Dict, offset: int):
+        """Rebuild the running hash from disk if it doesn't cover exactly `offset` bytes (e.g. after a restart)"""
+        if session['hashed_offset'] == offset:
+            return
+        hasher = hashlib.sha256()
+        with open(self._part_path(upload_id), 'rb') as f:
+            remaining = offset
+            while remaining:
+                block = f.read(min(STREAM_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+        session['hasher'] = hasher
+        session['hashed_offset'] = offset
+
+    def init_upload(self, filename: str, total_size: Optional[int] = None) -> Dict:
+        """
+        Start a resumable upload
+
+        Input:
+            filename (str): Original file name
+            total_size (int): Expected size in bytes, if known
+
+        Output:
+            Dict: upload_id, offset (0) and recommended chunk_size
+        """
+        upload_id = str(uuid.uuid4())
+        meta = {
+            'upload_id': upload_id,
+            'filename': secure_filename(filename),
+            'total_size': total_size,
+            'created_at': datetime.now().isoformat()
+        }
+        with open(self._meta_path(upload_id), 'w') as f:
+            json.dump(meta, f)
+        open(self._part_path(upload_id), 'wb').close()
+
+        return {'success': True, 'upload_id': upload_id, 'offset': 0, 'chunk_size': Config.UPLOAD_CHUNK_SIZE}
+
+    def get_upload(self, upload_id: str) -> Optional[Dict]:
+        """
+        Get upload metadata and the last acknowledged offset
+
+        Output:
+            Optional[Dict]: Metadata with 'offset', or None for an unknown upload
+        """
+        try:
+            with open(self._meta_path(upload_id), 'r') as f:
+                meta = json.load(f)
+            meta['offset'] = os.path.getsize(self._part_path(upload_id))
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta
+
+    def write_chunk(self, upload_id: str, offset: int, stream: BinaryIO) -> Dict:
+        """
+        Append a chunk streamed from the request body
+
+        Input:
+            upload_id (str): Upload identifier
+            offset (int): Byte offset the chunk starts at; must equal the acknowledged offset
+            stream (BinaryIO): Request body stream
+
+        Output:
+            Dict: success and the new acknowledged offset; on a mismatch, success False
+                  with the offset the client should resume from
+        """
+        meta = self.get_upload(upload_id)
+        if not meta:
+            return {'success': False, 'error': 'Upload not found', 'not_found': True}
+
+        session = self._session(upload_id)
+        with session['lock']:
+            current = os.path.getsize(self._part_path(upload_id))
+            if offset != current:
+                return {'success': False, 'error': f'Expected offset {current}', 'offset': current}
+
+            self._sync_hasher(upload_id, session, current)
+            total_size = meta.get('total_size')
+            # Uploads that declared no size are still capped
+            limit = total_size if total_size is not None else Config.MAX_UPLOAD_SIZE
+            written = 0
+            with open(self._part_path(upload_id), 'ab') as f:
+                while True:
+                    block = stream.read(STREAM_BLOCK_SIZE)
+                    if not block:
+                        break
+                    if current + written + len(block) > limit:
+                        return {
+                            'success': False,
+                            'error': (f'Chunk exceeds declared size {total_size}' if total_size is not None
+                                      else f'Upload exceeds maximum size {Config.MAX_UPLOAD_SIZE}'),
+                            'offset': current + written
+                        }
+                    f.write(block)
+                    session['hasher'].update(block)
+                    written += len(block)
+                    session['hashed_offset'] = current + written
+                f.flush()
+                os.fsync(f.fileno())
+
+        return {'success': True, 'offset': current + written}
+
+    def finalize_upload(self, upload_id: str, expected_sha256: str = None) -> Dict:
+        """
+        Complete an upload and move it into the content-addressed media store
+
+        Input:
+            upload_id (str): Upload identifier
+            expected_sha256 (str): Optional client-side checksum to verify
+
+        Output:
+            Dict: success, filename, file_path, size, sha256 of the content and
+                  existed (True if identical content was already stored)
+        """
+        meta = self.get_upload(upload_id)
+        if not meta:
+            return {'success': False, 'error': 'Upload not found', 'not_found': True}
+
+        session = self._session(upload_id)
+        with session['lock']:
+            offset = os.path.getsize(self._part_path(upload_id))
+            if meta.get('total_size') is not None and offset != meta['total_size']:
+                return {'success': False, 'error': f"Upload incomplete: {offset}/{meta['total_size']} bytes", 'offset': offset}
+
+            self._sync_hasher(upload_id, session, offset)
+            sha256 = session['hasher'].hexdigest()
+            if expected_sha256 and expected_sha256.lower() != sha256:
+                return {'success': False, 'error': 'Checksum mismatch', 'sha256': sha256}
+
+            extension = os.path.splitext(meta['filename'])[1]
+            stored = media_store.put_file(self._part_path(upload_id), sha256, extension)
+            os.remove(self._meta_path(upload_id))
+
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+
+        return {
+            'success': True,
+            'filename': meta['filename'],
+            'file_path': stored['file_path'],
+            'size': offset,
+            'sha256': sha256,
+            'existed': stored['existed']
+        }
+
+    def expire_stale_uploads(self, max_age: float = None) -> int:
+        """
+        Delete partial uploads that have not received data for max_age seconds
+
+        Input:
+            max_age (float): Idle time in seconds (defaults to UPLOAD_PARTIAL_MAX_AGE)
+
+        Output:
+            int: Number of uploads removed
+        """
+        cutoff = time.time() - (Config.UPLOAD_PARTIAL_MAX_AGE if max_age is None else max_age)
+        upload_ids = {os.path.splitext(name)[0] for name in os.listdir(self.partial_folder)
+                      if name.endswith(('.json', '.part'))}
+
+        removed = 0
+        for upload_id in upload_ids:
+            session = self._session(upload_id)
+            # An upload being written right now is not stale
+            if not session['lock'].acquire(blocking=False):
+                continue
+            try:
+                paths = [self._part_path(upload_id), self._meta_path(upload_id)]
+                mtimes = [os.path.getmtime(path) for path in paths if os.path.exists(path)]
+                if not mtimes or max(mtimes) >= cutoff:
+                    continue
+                for path in paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+                removed += 1
+            except Exception as e:
+                print(f"Error expiring upload {upload_id}: {e}")
+            finally:
+                with self._lock:
+                    self._sessions.pop(upload_id, None)
+                session['lock'].release()
+        return removed
+
+# Process-wide upload manager
+upload_manager = UploadManager()
@@ -3,16 +3,21 @@ Video processing utility
 Handles video processing and reel generation logic
 """
 import os
-import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict
-from .file_manager import FileManager
+from config import Config
+from .file_manager import file_manager
+from .media_probe import probe_media
 from .reel_service import ReelService
 
+# Caps provider calls for reels across every task in this process
+reel_slots = threading.BoundedSemaphore(Config.REEL_CONCURRENCY_GLOBAL)
+
 class VideoProcessor:
     def __init__(self):
-        self.file_manager = FileManager()
+        self.file_manager = file_manager
         self.reel_service = ReelService()
     
     def process_video_thread(self, file_id: str, configs: List[Dict]) -> None:
@@ -41,80 +46,55 @@ class VideoProcessor:
             if not video_path or not os.path.exists(video_path):
                 raise Exception(f"Video file not found: {video_path}")
             
-            # Initialize reels array
-            reels = []
+            # Reels finished by an earlier attempt (before a crash or restart) are kept
+            # rather than paid for again; anything else is regenerated
+            previous = {
+                reel.get('id'): reel for reel in task_data.get('reels', [])
+                if reel.get('status') == 'completed'
+            }
             total_configs = len(configs)
-            
+            reels = []
             for i, config in enumerate(configs):
-                try:
-                    # Update progress for each reel
-                    progress = int((i / total_configs) * 80) + 10
+                reel_id = f"reel_{file_id}_{i+1}"
+                reels.append(previous.get(reel_id) or self._reel_entry(reel_id, config, 'pending', 0, 'Waiting...'))
+            pending = [i for i, reel in enumerate(reels) if reel['status'] != 'completed']
+            
+            # Reels are independent provider calls: submit them concurrently, capped per task
+            # and across all tasks, and track each reel's progress separately
+            reels_lock = threading.Lock()
+            
+            def publish_progress():
+                # Held while writing so a slower thread can't persist an older snapshot last
+                with reels_lock:
+                    done = sum(1 for reel in reels if reel['status'] in ('completed', 'failed'))
+                    self.file_manager.update_task_data(file_id, {'reels': reels})
                     self.file_manager.update_task_status(
-                        file_id, 
-                        'processing', 
-                        progress, 
-                        f'Generating reel {i+1}/{total_configs}...'
+                        file_id,
+                        'processing',
+                        int((done / total_configs) * 80) + 10,
+                        f'Generated {done}/{total_configs} reels...'
                     )
-                    
-                    # Generate reel using ReelService
-                    reel_result = self.reel_service.create_reel(
-                        video_url=f"http://localhost:5000/uploads/{task_data.get('filename', 'video.mp4')}",
-                        duration=config.get('duration', 30),
-                        caption=config.get('caption', ''),
-                        platforms=config.get('platforms', ['instagram']),
-                        webhook_url="http://localhost:5000/api/webhook"
-                    )
-                    
-                    if not reel_result.get('success'):
-                        raise Exception(f"Reel generation failed: {reel_result.get('error', 'Unknown error')}")
-                    
-                    # Store project_id for status checking
-                    project_id = reel_result.get('project_id')
-                    if project_id:
-                        task_data['project_id'] = project_id
-                        self.file_manager.save_task_data(file_id, task_data)
-                    
-                    # Create reel data
-                    reel_data = {
-                        'id': f"reel_{file_id}_{i+1}",
-                        'duration': config.get('duration', 30),
-                        'style': config.get('style', 'professional'),
-                        'caption': config.get('caption', ''),
-                        'platforms': config.get('platforms', []),
-                        'url': reel_result.get('video_url'),
-                        'thumbnail': reel_result.get('thumbnail_url'),
-                        'file_path': reel_result.get('video_url'),
-                        'status': 'completed',
-                        'progress': 100,
-                        'message': 'Reel generated successfully'
-                    }
-                    
-                    reels.append(reel_data)
-                    
-                    # Simulate processing time
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    # Add failed reel to list
-                    reel_data = {
-                        'id': f"reel_{file_id}_{i+1}",
-                        'duration': config.get('duration', 30),
-                        'style': config.get('style', 'professional'),
-                        'caption': config.get('caption', ''),
-                        'platforms': config.get('platforms', []),
-                        'status': 'failed',
-                        'progress': 0,
-                        'message': f'Error: {str(e)}'
-                    }
-                    reels.append(reel_data)
             
-            # Update task data with reels information
-            task_data['reels'] = reels
-            task_data['status'] = 'completed'
-            task_data['completed_at'] = datetime.now().isoformat()
+            def run_reel(i):
+                with reels_lock:
+                    reels[i].update(status='processing', progress=10, message='Generating reel...')
+                reel_data = self._generate_reel(file_id, task_data, reels[i]['id'], configs[i])
+                with reels_lock:
+                    reels[i] = reel_data
+                publish_progress()
             
-            # Save updated task data
-            self.file_manager.save_task_data(file_id, task_data)
+            if pending:
+                publish_progress()
+                workers = max(1, min(Config.REEL_CONCURRENCY_PER_TASK, len(pending)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'reels-{file_id[:8]}') as pool:
+                    list(pool.map(run_reel, pending))
+            
+            # Update task data with reels information
+            self.file_manager.update_task_data(file_id, {
+                'reels': reels,
+                'status': 'completed',
+                'completed_at': datetime.now().isoformat()
+            })
             
             # Update final status
             self.file_manager.update_task_status(file_id, 'completed', 100, 'All reels generated successfully!')
@@ -127,6 +107,63 @@ class VideoProcessor:
             self.file_manager.update_task_status(file_id, 'error', 0, f'Error: {str(e)}')
             print(f"Error processing video: {str(e)}")
     
+    def _reel_entry(self, reel_id: str, config: Dict, status: str, progress: int, message: str) -> Dict:
+        """Build the reel record stored on the task"""
+        return {
+            'id': reel_id,
+            'duration': config.get('duration', 30),
+            'style': config.get('style', 'professional'),
+            'caption': config.get('caption', ''),
+            'platforms': config.get('platforms', []),
+            'status': status,
+            'progress': progress,
+            'message': message
+        }
+    
+    def _generate_reel(self, file_id: str, task_data: Dict, reel_id: str, config: Dict) -> Dict:
+        """
+        Generate a single reel, holding a slot of the global reel concurrency cap
+        
+        Input:
+            file_id (str): Task the reel belongs to
+            task_data (Dict): Task data snapshot
+            reel_id (str): Reel identifier
+            config (Dict): Reel configuration
+            
+        Output:
+            Dict: Completed or failed reel record
+        """
+        try:
+            with reel_slots:
+                # Generate reel using ReelService
+                reel_result = self.reel_service.create_reel(
+                    video_url=f"http://localhost:5000/uploads/{task_data.get('filename', 'video.mp4')}",
+                    duration=config.get('duration', 30),
+                    caption=config.get('caption', ''),
+                    platforms=config.get('platforms', ['instagram']),
+                    webhook_url="http://localhost:5000/api/webhook"
+                )
+            
+            if not reel_result.get('success'):
+                raise Exception(f"Reel generation failed: {reel_result.get('error', 'Unknown error')}")
+            
+            # Store project_id for status checking
+            project_id = reel_result.get('project_id')
+            if project_id:
+                self.file_manager.update_task_data(file_id, {'project_id': project_id})
+            
+            reel_data = self._reel_entry(reel_id, config, 'completed', 100, 'Reel generated successfully')
+            reel_data.update({
+                'project_id': project_id,
+                'url': reel_result.get('video_url'),
+                'thumbnail': reel_result.get('thumbnail_url'),
+                'file_path': reel_result.get('video_url')
+            })
+            return reel_data
+            
+        except Exception as e:
+            return self._reel_entry(reel_id, config, 'failed', 0, f'Error: {str(e)}')
+    
     def get_video_info(self, file_path: str) -> Dict:
         """
         Get video information from file
@@ -138,12 +175,14 @@ class VideoProcessor:
             Dict: Video information including duration, resolution, etc.
         """
         try:
-            # This would typically use ffmpeg or similar to get video info
-            # For now, return basic info
+            probe = probe_media(file_path) or {}
+            width, height = probe.get('width'), probe.get('height')
             return {
-                'duration': 0,
-                'resolution': 'Unknown',
-                'format': 'Unknown',
+                'duration': (probe.get('duration_ms') or 0) / 1000,
+                'resolution': f"{width}x{height}" if width and height else 'Unknown',
+                'format': probe.get('container', 'Unknown'),
+                'video_codec': probe.get('video_codec'),
+                'audio_tracks': probe.get('audio_tracks', []),
                 'size': os.path.getsize(file_path) if os.path.exists(file_path) else 0
             }
         except Exception as e:
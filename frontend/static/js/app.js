@@ -778,19 +778,38 @@ class SmartMeetingAI {
     }, 3000);
   }
 
+  async ensureTranscript(fileId) {
+    const transcriptRes = await fetch("/api/generate-transcript", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ file_id: fileId }),
+    });
+    const transcriptData = await transcriptRes.json();
+    if (!transcriptData.success) throw new Error(transcriptData.message);
+    if (transcriptRes.status !== 202) return;
+
+    // Transcription runs as a background job; wait for it via the status endpoint
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+      const response = await fetch(`/api/status/${fileId}`);
+      if (!response.ok) {
+        throw new Error(`Status check failed: ${response.status}`);
+      }
+      const result = await response.json();
+      if (result.transcript_status === "completed") return;
+      if (result.transcript_status === "failed") {
+        throw new Error(result.transcript_error || "Transcription failed");
+      }
+    }
+  }
+
   async handleGeneratePoster() {
     const fileId = this.posterBlogFileId;
     if (!fileId) return;
     this.showLoading(true);
     try {
-      // Always generate transcript first (idempotent)
-      const transcriptRes = await fetch("/api/generate-transcript", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ file_id: fileId }),
-      });
-      const transcriptData = await transcriptRes.json();
-      if (!transcriptData.success) throw new Error(transcriptData.message);
+      // Always make sure the transcript exists first (cached after the first run)
+      await this.ensureTranscript(fileId);
 
       // Now generate poster
       const posterRes = await fetch("/api/generate-poster", {
@@ -816,14 +835,8 @@ class SmartMeetingAI {
     if (!fileId) return;
     this.showLoading(true);
     try {
-      // Always generate transcript first (idempotent)
-      const transcriptRes = await fetch("/api/generate-transcript", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ file_id: fileId }),
-      });
-      const transcriptData = await transcriptRes.json();
-      if (!transcriptData.success) throw new Error(transcriptData.message);
+      // Always make sure the transcript exists first (cached after the first run)
+      await this.ensureTranscript(fileId);
 
       // Now generate blog
       const blogRes = await fetch("/api/generate-blog", {